@@ -1,39 +1,65 @@
-from client import HephoraClient
 from writer import RstWriter
 from pathlib import Path
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
+import argparse
+import sys
 
+# The node cache and diagram renderers are shared by all generators and live in tools/hephora_common
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
 
-def main() -> None:
+from hephora_common.cache import NodeCache  # noqa: E402
+from hephora_common.diagram import SvgRenderer, block_diagram  # noqa: E402
+from hephora_common.mermaid import MermaidRenderer  # noqa: E402
+from hephora_common.source import add_source_args, open_cache  # noqa: E402
+
+# Only components and interfaces themselves are drawn, so their references are not followed
+PROFILE_ROOTS = ["sw_component", "sw_interface"]
+PROFILE_REFERENCE_HOPS = 0
+
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    """Add the block diagram options (also offered by tools/generate.py)."""
+    parser.add_argument(
+        "--svg", action="store_true",
+        help="Render block_diagram.mmd to .svg as well (see --svg-renderer)",
+    )
+    parser.add_argument(
+        "--svg-renderer", choices=("mermaid", "native"), default="mermaid",
+        help="mermaid: render the .mmd afterwards, if it changed, with mmdc or Docker mermaid-cli; native: lay "
+             "the diagram out and write the .svg directly, in-process, without Chromium (default: %(default)s)",
+    )
+
+
+def run(args: argparse.Namespace, client: NodeCache) -> int:
+    """Write the block diagrams, reading the model through ``client``.
+
+    Returns the exit status: 2 when ``--svg`` needs mmdc or Docker and neither is usable, 3 when
+    some diagrams failed to render (as the mermaid renderer's own entry point).
+    """
     # Standard docs path
     out_dir = Path("tools/block_diagram_generator/out")
 
-    client = HephoraClient("http://http_server:8080")
     writer = RstWriter(Path("tools/block_diagram_generator/templates"))
+    client.load(PROFILE_ROOTS, PROFILE_REFERENCE_HOPS)
 
     # Fetch software components from Hephora
-    components = client.list_nodes("sw_component")
+    components = client.list_nodes("sw_component", full=True)
     component_dicts: List[Dict[str, Any]] = []
-    for component in components:
-        component_id = component["id"]
-        component_details = client.get_node("sw_component", component_id)
+    for component_details in components:
         component_dicts.append({
-            "label": component_details.get("label"),
-            "id": component_id,
+            "label": component_details.label,
+            "id": component_details.id,
         })
 
     #Fetch interfaces from Hephora
-    interfaces = client.list_nodes("sw_interface")
+    interfaces = client.list_nodes("sw_interface", full=True)
     interface_dicts: List[Dict[str, Any]] = []
-    for interface in interfaces:
-        interface_id = interface["id"]
-        interface_details = client.get_node("sw_interface", interface_id)
-        i_fields = interface_details.get("fields", {})
+    for interface_details in interfaces:
         interface_dicts.append({
-            "label": interface_details.get("label"),
-            "id": interface_id,
-            "provided_by": i_fields.get("provided_by"),
-            "required_by": i_fields.get("required_by"),
+            "label": interface_details.label,
+            "id": interface_details.id,
+            "provided_by": interface_details.provided_by,
+            "required_by": interface_details.required_by,
         })
 
     writer.write(
@@ -54,5 +80,35 @@ def main() -> None:
         out_dir / "block_diagram.mmd",
     )
 
+    summary = writer.summary()
+    status = 0
+    if args.svg and args.svg_renderer == "native":
+        svg = SvgRenderer()
+        svg.write(block_diagram(component_dicts, interface_dicts), out_dir / "block_diagram.svg")
+        summary += f", {svg.summary()}"
+    elif args.svg:
+        renderer = MermaidRenderer()
+        try:
+            renderer.render_dir(out_dir)
+        except RuntimeError as exc:
+            # No usable mmdc or Docker: the sources are written, only the SVGs are missing
+            print(f"block_diagram_generator: {exc}", file=sys.stderr)
+            return 2
+        if renderer.report():
+            print(renderer.report())
+        summary += f", {renderer.summary()}"
+        if renderer.failed:
+            status = 3
+    print(f"block_diagram_generator: {summary}")
+    return status
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Generate the component/interface block diagram")
+    add_source_args(parser)
+    add_arguments(parser)
+    args = parser.parse_args(argv)
+    sys.exit(run(args, open_cache(args)))
+
 if __name__ == "__main__":
     main()
\ No newline at end of file
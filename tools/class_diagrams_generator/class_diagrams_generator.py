@@ -1,139 +1,42 @@
-from client import HephoraClient
+from resolver import UNIT_CHILD_PROFILES, UnitGraph, UnitResolver
 from writer import RstWriter
 from pathlib import Path
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
+import argparse
+import sys
 
+# The node cache, graph index and diagram renderers are shared by all generators and live in tools/hephora_common
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
 
-def main() -> None:
-    # Standard docs path
-    out_dir = Path("tools/class_diagrams_generator/out")
-
-    client = HephoraClient("http://http_server:8080")
-    writer = RstWriter(Path("tools/class_diagrams_generator/templates"))
-
-    # Fetch all sw_units
-    sw_us = client.list_nodes("sw_unit")
-    for sw_u in sw_us:
-        main_class: Dict[str, Any] = []
-        classes: List[Dict[str, Any]] = []
-        sw_u_details = client.get_node("sw_unit", sw_u["id"])
-        # Fetch attributes that belong to this sw_unit (if any)
-        try:
-            sw_u_children = client.list_children("sw_unit", sw_u["id"])
-        except Exception:
-            sw_u_children = []
-
-        raw_attrs  = []
-        raw_methods = []
-        raw_relationships = []
-        for c in sw_u_children:
-            if c["profile"] == "sw_unit_attribute":
-                raw_attrs.append(client.get_node("sw_unit_attribute", c["id"]))
-            elif c["profile"] == "sw_unit_method":
-                raw_methods.append(client.get_node("sw_unit_method", c["id"]))
-            elif c["profile"] == "sw_unit_relationship":
-                raw_relationships.append(client.get_node("sw_unit_relationship", c["id"]))
-
-        # Gather attributes
-        attrs: List[Dict[str, Any]] = []
-        for a in raw_attrs:
-            # Try to resolve data type label if data_type is present
-            type_label = None
-            data_type_id = a.get("fields").get("data_type")
-            if data_type_id:
-                try:
-                    dt = client.get_node("sw_unit_data_type", data_type_id)
-                    type_label = dt.get("label")
-                except Exception:
-                    type_label = data_type_id
-
-            attrs.append(
-                {
-                    "name": a.get("label"),
-                    "type": type_label,
-                    "scope": a.get("fields").get("scope"),
-                    "multiplicity": a.get("fields").get("multiplicity"),
-                }
-            )
-
-        #Gather methods
-        meths : List[Dict[str, Any]] = []
-        for m in raw_methods:
-            return_type_label = None
-            try:
-                return_type_id = m.get("fields").get("return").get("data_type")
-            except Exception:
-                return_type_id = None
-            if return_type_id:
-                try:
-                    rt = client.get_node("sw_unit_data_type", return_type_id)
-                    return_type_label = rt.get("label")
-                except Exception:
-                    return_type_label = return_type_id
-            else:
-                try:
-                    return_type_id = m.get("fields").get("return").get("unit_ref")
-                except Exception:
-                    return_type_id = None
-                if return_type_id:
-                    try:
-                        rt = client.get_node("sw_unit", return_type_id)
-                        return_type_label = rt.get("label")
-                    except Exception:
-                        return_type_label = return_type_id
-
-            if return_type_label == None:
-                return_type_label = ""
+from hephora_common.cache import NodeCache  # noqa: E402
+from hephora_common.diagram import SvgRenderer, class_diagram  # noqa: E402
+from hephora_common.graph import GraphIndex  # noqa: E402
+from hephora_common.mermaid import MermaidRenderer  # noqa: E402
+from hephora_common.source import add_source_args, open_cache  # noqa: E402
 
+# Units, with their children and what those refer to (data types, components, ...), planned from the schemas
+PROFILE_ROOTS = ["sw_unit"]
+PROFILE_REFERENCE_HOPS = 1
 
-            # Get parameters type and name (may be multiple)
-            params: List[Dict[str, Any]] = []
-            try:
-                raw_params = m.get("fields", {}).get("parameters", []) or []
-            except Exception:
-                raw_params = []
 
-            for p in raw_params:
-                # resolve parameter type (data_type or unit_ref)
-                p_type_label = None
-                data_type_id = p.get("data_type")
-                if data_type_id:
-                    try:
-                        dt = client.get_node("sw_unit_data_type", data_type_id)
-                        p_type_label = dt.get("label")
-                    except Exception:
-                        p_type_label = data_type_id
-                else:
-                    unit_ref_id = p.get("unit_ref")
-                    if unit_ref_id:
-                        try:
-                            ur = client.get_node("sw_unit", unit_ref_id)
-                            p_type_label = ur.get("label")
-                        except Exception:
-                            p_type_label = unit_ref_id
+def write_diagram(writer: RstWriter, svg: Optional[SvgRenderer], template_name: str, context: Dict[str, Any],
+                  out_path: Path) -> None:
+    """Write a diagram's .mmd and, with ``svg``, the .svg laid out from the same context next to it."""
+    writer.write(template_name, context, out_path)
+    if svg is not None:
+        classes = [context["main_class"], *context["classes"]] if "main_class" in context else context["classes"]
+        svg.write(class_diagram(classes, context["relationships"]), out_path.with_suffix(".svg"))
 
-                params.append(
-                    {
-                        "name": p.get("name"),
-                        "type": p_type_label,
-                    }
-                )
 
-            meths.append(
-                {
-                    "name": m.get("label"),
-                    "scope": m.get("fields").get("scope"),
-                    "return_type": return_type_label,
-                    "parameters": params,
-                }
-            )
-
-        main_class = {
-                "label": sw_u_details.get("label"),
-                "id": sw_u["id"],
-                "attributes": attrs,
-                "methods": meths,
-            }
+def write_unit_diagrams(client: NodeCache, resolver: UnitResolver, writer: RstWriter, out_dir: Path,
+                        svg: Optional[SvgRenderer] = None) -> None:
+    """Write one diagram per sw_unit with the units it has relationships to."""
+    # Fetch all sw_units
+    sw_us = client.list_nodes("sw_unit", full=True)
+    for sw_u_details in sw_us:
+        main_class = resolver.unit(sw_u_details.id, sw_u_details)
+        classes: List[Dict[str, Any]] = []
+        raw_relationships = resolver.children(sw_u_details.id).get("sw_unit_relationship", [])
 
         dependencies: List[Dict[str, Any]] = []
         associations: List[Dict[str, Any]] = []
@@ -141,146 +44,24 @@ def main() -> None:
         compositions: List[Dict[str, Any]] = []
         realizations: List[Dict[str, Any]] = []
         generalizations: List[Dict[str, Any]] = []
+        relationships: List[Dict[str, Any]] = []
         #Gather relationships
         for r in raw_relationships:
-            fields = r.get("fields", {})
-            # Get related class (target may be missing)
-            target_id = fields.get("target")
-            r_class = None
+            # Related class with its attributes and methods (target may be missing)
+            target_id = r.target
             if target_id:
-                try:
-                    r_class = client.get_node("sw_unit", target_id)
-                except Exception:
-                    r_class = {"label": target_id, "id": target_id}
-
-            # Gather attributes and methods from the related class
-            rel_attrs: List[Dict[str, Any]] = []
-            rel_methods: List[Dict[str, Any]] = []
-            if r_class and r_class.get("id"):
-                try:
-                    rel_children = client.list_children("sw_unit", r_class.get("id"))
-                except Exception:
-                    rel_children = []
-
-                for rc in rel_children:
-                    # Attributes
-                    if rc.get("profile") == "sw_unit_attribute":
-                        try:
-                            a = client.get_node("sw_unit_attribute", rc.get("id"))
-                        except Exception:
-                            a = None
-                        if a:
-                            # resolve data type label if present
-                            type_label = None
-                            data_type_id = a.get("fields", {}).get("data_type")
-                            if data_type_id:
-                                try:
-                                    dt = client.get_node("sw_unit_data_type", data_type_id)
-                                    type_label = dt.get("label")
-                                except Exception:
-                                    type_label = data_type_id
-
-                            rel_attrs.append(
-                                {
-                                    "name": a.get("label"),
-                                    "type": type_label,
-                                    "scope": a.get("fields", {}).get("scope"),
-                                    "multiplicity": a.get("fields", {}).get("multiplicity"),
-                                }
-                            )
-
-                    # Methods
-                    elif rc.get("profile") == "sw_unit_method":
-                        try:
-                            m = client.get_node("sw_unit_method", rc.get("id"))
-                        except Exception:
-                            m = None
-                        if m:
-                            return_type_label = None
-                            try:
-                                return_type_id = m.get("fields", {}).get("return", {}).get("data_type")
-                            except Exception:
-                                return_type_id = None
-                            if return_type_id:
-                                try:
-                                    rt = client.get_node("sw_unit_data_type", return_type_id)
-                                    return_type_label = rt.get("label")
-                                except Exception:
-                                    return_type_label = return_type_id
-                            else:
-                                try:
-                                    return_type_id = m.get("fields", {}).get("return", {}).get("unit_ref")
-                                except Exception:
-                                    return_type_id = None
-                                if return_type_id:
-                                    try:
-                                        rt = client.get_node("sw_unit", return_type_id)
-                                        return_type_label = rt.get("label")
-                                    except Exception:
-                                        return_type_label = return_type_id
-
-                            if return_type_label is None:
-                                return_type_label = ""
-
-                            # Get parameters type and name (may be multiple)
-                            params: List[Dict[str, Any]] = []
-                            try:
-                                raw_params = m.get("fields", {}).get("parameters", []) or []
-                            except Exception:
-                                raw_params = []
-
-                            for p in raw_params:
-                                p_type_label = None
-                                data_type_id = p.get("data_type")
-                                if data_type_id:
-                                    try:
-                                        dt = client.get_node("sw_unit_data_type", data_type_id)
-                                        p_type_label = dt.get("label")
-                                    except Exception:
-                                        p_type_label = data_type_id
-                                else:
-                                    unit_ref_id = p.get("unit_ref")
-                                    if unit_ref_id:
-                                        try:
-                                            ur = client.get_node("sw_unit", unit_ref_id)
-                                            p_type_label = ur.get("label")
-                                        except Exception:
-                                            p_type_label = unit_ref_id
-
-                                params.append(
-                                    {
-                                        "name": p.get("name"),
-                                        "type": p_type_label,
-                                    }
-                                )
-
-                            rel_methods.append(
-                                {
-                                    "name": m.get("label"),
-                                    "scope": m.get("fields", {}).get("scope"),
-                                    "return_type": return_type_label,
-                                    "parameters": params,
-                                }
-                            )
-
-            # Append to classes if we have a related class
-            if r_class:
-                classes.append(
-                    {
-                        "label": r_class.get("label"),
-                        "id": r_class.get("id"),
-                        "attributes": rel_attrs,
-                        "methods": rel_methods,
-                    }
-                )
+                classes.append(resolver.unit(target_id))
 
             # Prepare common multiplicities (may be missing)
-            origin_mult = fields.get("source_multiplicity", "")
-            target_mult = fields.get("target_multiplicity", "")
-            rel_type = fields.get("type", "")
+            origin_mult = r.field("source_multiplicity", "")
+            target_mult = r.field("target_multiplicity", "")
+            rel_type = r.field("type", "")
 
             # Get dependency type and append safely
             entry = {"id": target_id, "origin_multiplicity": origin_mult, "target_multiplicity": target_mult}
+            if target_id:
+                relationships.append({"source": sw_u_details.id, "target": target_id, "type": rel_type,
+                                      "origin_multiplicity": origin_mult, "target_multiplicity": target_mult})
 
             if rel_type == "association":
                 associations.append(entry)
@@ -295,7 +76,9 @@ def main() -> None:
             elif rel_type == "generalization":
                 generalizations.append(entry)
 
-        writer.write(
+        write_diagram(
+            writer,
+            svg,
             "class_diagram.mmd.j2",
             {
                 "main_class": main_class,
@@ -306,9 +89,131 @@ def main() -> None:
                 "compositions": compositions,
                 "realizations": realizations,
                 "generalizations": generalizations,
+                "relationships": relationships,
             },
-            out_dir / f"{sw_u_details.get('label')}-{sw_u['id']}.mmd",
+            out_dir / f"{sw_u_details.label}-{sw_u_details.id}.mmd",
+        )
+
+
+def unit_index(client: NodeCache) -> GraphIndex:
+    """Parent/child and reference lookups over the units and their children, from the loaded nodes.
+
+    A profile that cannot be listed is reported and left out: its units, or their children of
+    that kind, are missing from the diagrams instead of failing the run.
+    """
+    graph = GraphIndex.from_schemas(Path("schemas"))
+    for profile in ("sw_unit",) + UNIT_CHILD_PROFILES:
+        try:
+            graph.add(profile, client.list_nodes(profile, full=True))
+        except Exception as exc:
+            print(f"class_diagrams_generator: could not list {profile} nodes, skipped: {exc}", file=sys.stderr)
+    return graph
+
+
+def write_model_diagrams(client: NodeCache, resolver: UnitResolver, writer: RstWriter, out_dir: Path, hops: int,
+                         svg: Optional[SvgRenderer] = None) -> None:
+    """Write the whole-model, per-component and per-unit neighbourhood diagrams from one unit graph."""
+    graph = resolver.graph
+    units = client.list_nodes("sw_unit", full=True)
+    unit_graph = UnitGraph(units, resolver)
+
+    write_diagram(writer, svg, "model_diagram.mmd.j2", unit_graph.diagram(unit_graph.units), out_dir / "model.mmd")
+
+    for comp in client.list_nodes("sw_component", full=True):
+        members = [u.id for u in graph.referrers(comp.id, "sw_unit", "sw_component_refs")]
+        if not members:
+            continue
+        write_diagram(
+            writer,
+            svg,
+            "model_diagram.mmd.j2",
+            unit_graph.diagram(members),
+            out_dir / f"component-{comp.label}-{comp.id}.mmd",
         )
 
+    if hops > 0:
+        for u in units:
+            write_diagram(
+                writer,
+                svg,
+                "model_diagram.mmd.j2",
+                unit_graph.diagram(unit_graph.neighborhood(u.id, hops)),
+                out_dir / f"neighborhood-{u.label}-{u.id}.mmd",
+            )
+
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    """Add the class diagram options (also offered by tools/generate.py)."""
+    parser.add_argument(
+        "--mode", choices=("units", "model"), default="units",
+        help="units: one diagram per sw_unit with its direct relationships; model: one diagram of the "
+             "whole model, one per sw_component and one neighbourhood diagram per sw_unit",
+    )
+    parser.add_argument(
+        "--hops", type=int, default=1,
+        help="Relationship hops included in the neighbourhood diagrams of --mode model (0 disables them)",
+    )
+    parser.add_argument(
+        "--svg", action="store_true",
+        help="Render the diagrams to .svg as well (see --svg-renderer)",
+    )
+    parser.add_argument(
+        "--svg-renderer", choices=("mermaid", "native"), default="mermaid",
+        help="mermaid: render the changed .mmd files afterwards with mmdc or Docker mermaid-cli; native: lay "
+             "the diagrams out and write the .svg directly as they are generated, in-process, without "
+             "Chromium (default: %(default)s)",
+    )
+
+
+def run(args: argparse.Namespace, client: NodeCache) -> int:
+    """Write the class diagrams, reading the model through ``client``.
+
+    Returns the exit status: 2 when ``--svg`` needs mmdc or Docker and neither is usable, 3 when
+    some diagrams failed to render (as the mermaid renderer's own entry point).
+    """
+    # Standard docs path
+    out_dir = Path("tools/class_diagrams_generator/out")
+
+    client.load(PROFILE_ROOTS, PROFILE_REFERENCE_HOPS)
+    # Children come from the index over the loaded nodes, not from one request per unit
+    resolver = UnitResolver(client, unit_index(client))
+    writer = RstWriter(Path("tools/class_diagrams_generator/templates"))
+
+    # The native renderer works from the in-memory diagrams, so it runs while they are written
+    svg = SvgRenderer() if args.svg and args.svg_renderer == "native" else None
+    if args.mode == "model":
+        write_model_diagrams(client, resolver, writer, out_dir, args.hops, svg)
+    else:
+        write_unit_diagrams(client, resolver, writer, out_dir, svg)
+
+    summary = writer.summary()
+    status = 0
+    if svg is not None:
+        summary += f", {svg.summary()}"
+    elif args.svg:
+        renderer = MermaidRenderer()
+        try:
+            renderer.render_dir(out_dir)
+        except RuntimeError as exc:
+            # No usable mmdc or Docker: the sources are written, only the SVGs are missing
+            print(f"class_diagrams_generator: {exc}", file=sys.stderr)
+            return 2
+        if renderer.report():
+            print(renderer.report())
+        summary += f", {renderer.summary()}"
+        if renderer.failed:
+            status = 3
+    print(f"class_diagrams_generator: {summary}")
+    return status
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Generate Mermaid class diagrams for every sw_unit")
+    add_source_args(parser)
+    add_arguments(parser)
+    args = parser.parse_args(argv)
+    # Units and data types are shared by many diagrams: fetch each once and resolve each unit once
+    sys.exit(run(args, open_cache(args)))
+
 if __name__ == "__main__":
     main()
\ No newline at end of file
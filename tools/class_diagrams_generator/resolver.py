@@ -0,0 +1,188 @@
+from __future__ import annotations
+from collections import deque
+from typing import Any, Dict, Iterable, List, Optional
+
+from client import node_id
+
+# Child profiles of sw_unit that make up its class-diagram view
+UNIT_CHILD_PROFILES = ("sw_unit_attribute", "sw_unit_method", "sw_unit_relationship")
+
+
+class UnitResolver:
+    """Builds the class-diagram view of ``sw_unit`` nodes, once per unit.
+
+    A resolved unit is ``{label, id, attributes, methods}`` with attribute, return and parameter
+    types replaced by the labels of the ``sw_unit_data_type``/``sw_unit`` they point at. Units and
+    type labels are memoized by id, so a unit related to many others is fetched and resolved a
+    single time per run. Lookups that fail fall back to the raw id, as a label.
+
+    With a :class:`GraphIndex` holding the unit child profiles, children are read from the index
+    instead of being listed per unit. ``client`` must return schema-typed nodes (a
+    :class:`NodeCache` with a model), whose fields are read as attributes.
+    """
+
+    def __init__(self, client: Any, graph: Any = None):
+        self.client = client
+        self.graph = graph
+        self._units: Dict[str, Dict[str, Any]] = {}
+        self._children: Dict[str, Dict[str, List[Dict[str, Any]]]] = {}
+        self._labels: Dict[tuple, str] = {}
+
+    def unit(self, unit_id: str, node: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Resolved view of unit ``unit_id``; ``node`` saves the fetch when the body is already loaded."""
+        if unit_id not in self._units:
+            self._units[unit_id] = self._resolve(unit_id, node)
+        return self._units[unit_id]
+
+    def children(self, unit_id: str) -> Dict[str, List[Dict[str, Any]]]:
+        """Full child nodes of a unit grouped by profile, in listing order."""
+        if unit_id in self._children:
+            return self._children[unit_id]
+        if self.graph is not None:
+            self._children[unit_id] = {
+                profile: self.graph.children(unit_id, profile) for profile in UNIT_CHILD_PROFILES
+            }
+            return self._children[unit_id]
+        try:
+            listed = self.client.list_children("sw_unit", unit_id)
+        except Exception:
+            listed = []
+        child_ids: Dict[str, List[str]] = {}
+        for c in listed:
+            child_ids.setdefault(c.get("profile"), []).append(c.get("id"))
+        self._children[unit_id] = {profile: self._fetch(profile, ids) for profile, ids in child_ids.items()}
+        return self._children[unit_id]
+
+    def label(self, profile: str, ref_id: str) -> str:
+        key = (profile, ref_id)
+        if key not in self._labels:
+            try:
+                self._labels[key] = self.client.get_node(profile, ref_id).label
+            except Exception:
+                self._labels[key] = ref_id
+        return self._labels[key]
+
+    def _fetch(self, profile: str, ids: List[str]) -> List[Dict[str, Any]]:
+        try:
+            return self.client.get_nodes(profile, ids)
+        except Exception:
+            # Skip the children that cannot be fetched instead of dropping them all
+            nodes = []
+            for i in ids:
+                try:
+                    nodes.append(self.client.get_node(profile, i))
+                except Exception:
+                    continue
+            return nodes
+
+    def _type_label(self, ref: Dict[str, Any]) -> Optional[str]:
+        # A type is either a data type or another unit; data types win when both are set
+        if ref.get("data_type"):
+            return self.label("sw_unit_data_type", ref["data_type"])
+        if ref.get("unit_ref"):
+            return self.label("sw_unit", ref["unit_ref"])
+        return None
+
+    def _resolve(self, unit_id: str, node: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        if node is None:
+            try:
+                node = self.client.get_node("sw_unit", unit_id)
+            except Exception:
+                node = {"label": unit_id, "id": unit_id}
+        children = self.children(node_id(node) or unit_id)
+
+        attrs: List[Dict[str, Any]] = []
+        for a in children.get("sw_unit_attribute", []):
+            attrs.append(
+                {
+                    "name": a.label,
+                    "type": self.label("sw_unit_data_type", a.data_type) if a.data_type else None,
+                    "scope": a.scope,
+                    "multiplicity": a.multiplicity,
+                }
+            )
+
+        meths: List[Dict[str, Any]] = []
+        for m in children.get("sw_unit_method", []):
+            params = [
+                {"name": p.get("name"), "type": self._type_label(p)}
+                for p in m.parameters or []
+            ]
+            meths.append(
+                {
+                    "name": m.label,
+                    "scope": m.scope,
+                    "return_type": self._type_label(m.return_ or {}) or "",
+                    "parameters": params,
+                }
+            )
+
+        return {
+            "label": node.get("label"),
+            "id": node_id(node) or unit_id,
+            "attributes": attrs,
+            "methods": meths,
+        }
+
+
+class UnitGraph:
+    """Relationship graph over all units, built once for the whole-model diagrams.
+
+    Edges are the ``sw_unit_relationship`` children of every unit. :meth:`diagram` turns any set
+    of units into a diagram context; relationship targets outside the set are shown as bare
+    (member-less) classes so their edges still render.
+    """
+
+    def __init__(self, units: Iterable[Dict[str, Any]], resolver: UnitResolver):
+        self.resolver = resolver
+        self.units: Dict[str, Dict[str, Any]] = {u.id: u for u in units}
+        self.edges: List[Dict[str, Any]] = []
+        self._outgoing: Dict[str, List[Dict[str, Any]]] = {}
+        self._adjacent: Dict[str, Dict[str, None]] = {}
+        for uid in self.units:
+            for r in resolver.children(uid).get("sw_unit_relationship", []):
+                target_id = r.target
+                if not target_id:
+                    continue
+                edge = {
+                    "source": uid,
+                    "target": target_id,
+                    "type": r.field("type", ""),
+                    "origin_multiplicity": r.field("source_multiplicity", ""),
+                    "target_multiplicity": r.field("target_multiplicity", ""),
+                }
+                self.edges.append(edge)
+                self._outgoing.setdefault(uid, []).append(edge)
+                # Neighbourhoods follow relationships in both directions
+                self._adjacent.setdefault(uid, {})[target_id] = None
+                self._adjacent.setdefault(target_id, {})[uid] = None
+
+    def neighborhood(self, unit_id: str, hops: int) -> List[str]:
+        """Units within ``hops`` relationships of ``unit_id`` (itself first), in breadth-first order."""
+        seen = {unit_id: 0}
+        queue = deque([unit_id])
+        while queue:
+            current = queue.popleft()
+            if seen[current] >= hops:
+                continue
+            for nxt in self._adjacent.get(current, {}):
+                if nxt not in seen:
+                    seen[nxt] = seen[current] + 1
+                    queue.append(nxt)
+        return list(seen)
+
+    def diagram(self, unit_ids: Iterable[str]) -> Dict[str, Any]:
+        """Template context with the given units and every relationship leaving them."""
+        members = list(dict.fromkeys(unit_ids))
+        inside = set(members)
+        edges = [e for uid in members for e in self._outgoing.get(uid, [])]
+        classes = [self._class(uid, external=False) for uid in members]
+        external = dict.fromkeys(e["target"] for e in edges if e["target"] not in inside)
+        classes.extend(self._class(uid, external=True) for uid in external)
+        return {"classes": classes, "relationships": edges}
+
+    def _class(self, unit_id: str, external: bool) -> Dict[str, Any]:
+        resolved = self.resolver.unit(unit_id, self.units.get(unit_id))
+        if not external:
+            return resolved
+        return {"label": resolved["label"], "id": resolved["id"], "attributes": [], "methods": []}
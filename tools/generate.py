@@ -0,0 +1,231 @@
+"""Run the Hephora generators as stages of one process over a single model load.
+
+    python tools/generate.py [--stages docs,class,block,svg] [--watch] [generator options]
+
+The model is read once through a shared NodeCache, prefetched with every profile the
+selected stages use (the schema closure of each generator's PROFILE_ROOTS), and each
+generator then runs over it in turn. The svg stage renders
+the Mermaid diagrams written by the class and block stages, so it runs last; with
+--svg-renderer native the diagram stages write the .svg themselves, from memory, instead.
+
+With --watch the stages run again whenever the model changes: the data/ tree is polled for
+edited YAML files, or the server for its change counter. Only the docs pages built from the
+changed nodes (per the docgen build manifest) are rendered again; the diagrams are regenerated
+from memory, and only those whose .mmd changed are written and rendered to SVG.
+"""
+from __future__ import annotations
+import argparse
+import importlib.util
+import sys
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from types import ModuleType
+from typing import Any, Dict, Iterator, List, Optional, Set
+
+TOOLS_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(TOOLS_DIR))
+
+from hephora_common.cache import NodeCache  # noqa: E402
+from hephora_common.mermaid import MermaidRenderer  # noqa: E402
+from hephora_common.model import NodeModel  # noqa: E402
+from hephora_common.source import SCHEMAS_DIR, add_source_args, open_client  # noqa: E402
+from hephora_common.watch import ChangeFeed  # noqa: E402
+
+# stage -> (tool directory, generator module)
+GENERATORS = {
+    "docs": ("hephora_docgen", "docgen"),
+    "class": ("class_diagrams_generator", "class_diagrams_generator"),
+    "block": ("block_diagram_generator", "block_diagram_generator"),
+}
+STAGES = ("docs", "class", "block", "svg")
+# Directories rendered by the svg stage
+SVG_DIRS = {
+    "class": Path("tools/class_diagrams_generator/out"),
+    "block": Path("tools/block_diagram_generator/out"),
+}
+
+
+class Generator:
+    """One tool script loaded as a module, with the sibling modules it imports by bare name.
+
+    Every tool has its own ``client``/``writer`` modules, so they cannot all sit in
+    ``sys.modules`` at once. Each tool's siblings are kept aside and put back (with the tool
+    directory first on ``sys.path``) while that tool runs, which is also what its render worker
+    processes see.
+    """
+
+    def __init__(self, tool: str, module: str):
+        self.tool_dir = TOOLS_DIR / tool
+        self._siblings: Dict[str, ModuleType] = {}
+        with self._active():
+            spec = importlib.util.spec_from_file_location(f"{tool}_{module}", self.tool_dir / f"{module}.py")
+            self.module = importlib.util.module_from_spec(spec)
+            spec.loader.exec_module(self.module)
+
+    @contextmanager
+    def _active(self) -> Iterator[None]:
+        sys.path.insert(0, str(self.tool_dir))
+        sys.modules.update(self._siblings)
+        try:
+            yield
+        finally:
+            sys.path.remove(str(self.tool_dir))
+            # Keep, and take out of sys.modules, every module imported from the tool directory
+            for name, mod in list(sys.modules.items()):
+                path = getattr(mod, "__file__", None)
+                if path and Path(path).resolve().parent == self.tool_dir:
+                    self._siblings[name] = mod
+                    del sys.modules[name]
+
+    def profiles(self, model: NodeModel) -> List[str]:
+        """Profiles the generator reads: the schema closure of its ``PROFILE_ROOTS``."""
+        return model.profiles.closure(self.module.PROFILE_ROOTS, self.module.PROFILE_REFERENCE_HOPS)
+
+    def add_arguments(self, parser: argparse.ArgumentParser) -> None:
+        self.module.add_arguments(parser)
+
+    def run(self, args: argparse.Namespace, client: NodeCache, **kwargs: Any) -> int:
+        """Run the generator; returns its exit status (generators returning nothing succeeded)."""
+        with self._active():
+            return self.module.run(args, client, **kwargs) or 0
+
+
+def parse_stages(text: str) -> List[str]:
+    stages = [s.strip() for s in text.split(",") if s.strip()]
+    unknown = [s for s in stages if s not in STAGES]
+    if unknown:
+        raise argparse.ArgumentTypeError(f"unknown stage(s) {', '.join(unknown)}; choose from {', '.join(STAGES)}")
+    # Stages always run in dependency order, whatever order they were given in
+    return [s for s in STAGES if s in stages]
+
+
+def run_stages(args: argparse.Namespace, generators: Dict[str, Generator], client: NodeCache,
+               pages: Optional[Set[str]] = None) -> int:
+    """Run the selected stages over ``client``; ``pages`` limits the docs pages rendered.
+
+    Returns the highest exit status of the stages; a failed stage does not stop the next ones.
+    """
+    status = 0
+    for stage in args.stages:
+        stage_start = time.perf_counter()
+        if stage == "svg":
+            if args.svg_renderer == "native":
+                # Already written by the class and block stages
+                continue
+            renderer = MermaidRenderer()
+            try:
+                for directory in SVG_DIRS.values():
+                    if directory.is_dir():
+                        renderer.render_dir(directory)
+            except RuntimeError as exc:
+                print(f"svg: {exc}", file=sys.stderr)
+                status = max(status, 2)
+            else:
+                if renderer.report():
+                    print(renderer.report())
+                print(f"svg: {renderer.summary()}")
+                if renderer.failed:
+                    status = max(status, 3)
+        elif stage == "docs":
+            status = max(status, generators[stage].run(args, client, pages=pages))
+        else:
+            status = max(status, generators[stage].run(args, client))
+        print(f"generate: {stage} stage took {time.perf_counter() - stage_start:.2f}s")
+    return status
+
+
+def watch(args: argparse.Namespace, generators: Dict[str, Generator], source: Any, model: NodeModel,
+          profiles: List[str]) -> None:
+    """Run the stages again for every change to ``profiles`` (or the project root), until interrupted."""
+    feed = ChangeFeed(source, ["v_model"] + profiles)
+    where = args.data_dir if args.data_dir is not None else args.server
+    print(f"generate: watching {where} every {args.interval:g}s (Ctrl-C to stop)")
+    last_error = ""
+    try:
+        while True:
+            time.sleep(args.interval)
+            try:
+                changed, structural = feed.poll()
+                if not changed:
+                    continue
+                start = time.perf_counter()
+                if structural:
+                    # A new or removed node can show up on pages that never listed it; let the
+                    # page digests decide instead
+                    pages = None
+                    print(f"generate: {len(changed)} nodes changed, nodes added or removed: checking every page")
+                else:
+                    pages = generators["docs"].module.affected_pages(changed)
+                    print(f"generate: {len(changed)} nodes changed, {len(pages)} pages affected")
+                client = NodeCache(source, model=model)
+                client.prefetch(profiles)
+                run_stages(args, generators, client, pages)
+                print(f"generate: updated in {time.perf_counter() - start:.2f}s")
+                last_error = ""
+            except Exception as exc:
+                # Typically a YAML file caught half-saved; the next poll picks the change up again
+                if str(exc) != last_error:
+                    print(f"generate: update failed: {exc}", file=sys.stderr)
+                last_error = str(exc)
+    except KeyboardInterrupt:
+        print("generate: stopped watching")
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    generators = {stage: Generator(*where) for stage, where in GENERATORS.items()}
+
+    # The generators share some option names (--svg); "resolve" keeps a single definition of each
+    parser = argparse.ArgumentParser(description="Run the Hephora generators over a single model load",
+                                     conflict_handler="resolve")
+    add_source_args(parser)
+    parser.add_argument(
+        "--stages", type=parse_stages, default=list(STAGES),
+        help=f"Comma-separated stages to run, in dependency order (default: {','.join(STAGES)})",
+    )
+    parser.add_argument(
+        "--watch", action="store_true",
+        help="After the first run keep watching the model and regenerate what each change affects "
+             "(implies --incremental)",
+    )
+    parser.add_argument(
+        "--interval", type=float, default=1.0,
+        help="Seconds between polls for changes with --watch (default: %(default)s)",
+    )
+    for stage, generator in generators.items():
+        generator.add_arguments(parser.add_argument_group(f"{stage} stage"))
+    args = parser.parse_args(argv)
+    if "svg" in args.stages:
+        # Diagrams are rendered once: by the svg stage from the .mmd files, or natively by each
+        # diagram generator from the diagrams it holds in memory
+        args.svg = args.svg_renderer == "native"
+
+    if args.watch:
+        # Pages are only rendered again when what they are built from changed
+        args.incremental = True
+
+    start = time.perf_counter()
+    source = open_client(args)
+    model = NodeModel.from_schemas(SCHEMAS_DIR)
+    client = NodeCache(source, model=model)
+    # One load plan for all stages, so no generator goes back to the source for a profile
+    profiles = model.profiles.order(p for s in args.stages if s in GENERATORS for p in generators[s].profiles(model))
+    client.prefetch(profiles)
+    stats = client.stats()
+    print(f"generate: model loaded in {time.perf_counter() - start:.2f}s "
+          f"({stats['nodes']} nodes, {len(profiles)} profiles)")
+
+    status = run_stages(args, generators, client)
+
+    if getattr(source, "snapshot", None) is not None:
+        print(f"generate: {source.requests_sent} requests sent, {source.snapshot_hits} answered from the snapshot")
+    stats = client.stats()
+    print(f"generate: done in {time.perf_counter() - start:.2f}s "
+          f"(cache: {stats['nodes']} nodes, {stats['hits']} hits, {stats['misses']} misses)")
+    if args.watch:
+        watch(args, generators, source, model, profiles)
+    sys.exit(status)
+
+
+if __name__ == "__main__":
+    main()
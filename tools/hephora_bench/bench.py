@@ -0,0 +1,267 @@
+"""End-to-end benchmark of the Hephora generators on synthetic models.
+
+    python tools/hephora_bench/bench.py [--scales 1k,10k] [--source server|data] [--update-baseline]
+
+For each scale a synthetic model is generated once (see synth.py) and kept under
+--models-dir, then docgen.py, class_diagrams_generator.py and block_diagram_generator.py run
+on it one after the other, each as a fresh process in a scratch copy of the repository layout,
+so the outputs in tools/ are left alone. With --source server (the default) the model is served
+by the stand-in server (server.py) and every run starts without a snapshot, i.e. cold; its
+--latency, --jitter, --error-rate and --workers options are passed on, to measure the tools
+over a realistic network. --source data reads the YAML tree directly.
+
+Each run records its wall time, the peak resident memory of the generator process and the
+number of requests the server answered. The results are compared with the baseline file: a run
+more than --tolerance slower or larger than its baseline, or sending more requests, is a
+regression and the benchmark exits with status 1. Baselines are only comparable on the machine
+they were recorded on; record them there with --update-baseline.
+"""
+from __future__ import annotations
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+BENCH_DIR = Path(__file__).resolve().parent
+TOOLS_DIR = BENCH_DIR.parent
+REPO_ROOT = TOOLS_DIR.parent
+
+import synth  # noqa: E402
+from server import STATS_PATH  # noqa: E402
+
+# name -> (tool directory, script)
+TOOLS = {
+    "docgen": ("hephora_docgen", "docgen.py"),
+    "class_diagrams": ("class_diagrams_generator", "class_diagrams_generator.py"),
+    "block_diagram": ("block_diagram_generator", "block_diagram_generator.py"),
+}
+DEFAULT_BASELINE = BENCH_DIR / "baseline.json"
+# Wall time differences below this many seconds are noise, whatever the tolerance says
+WALL_SLACK_S = 0.2
+
+
+def default_models_dir() -> Path:
+    base = os.environ.get("XDG_CACHE_HOME") or str(Path.home() / ".cache")
+    return Path(base) / "hephora" / "bench"
+
+
+def parse_scales(text: str) -> List[str]:
+    scales = [s.strip() for s in text.split(",") if s.strip()]
+    for scale in scales:
+        synth.parse_count(scale)
+    return scales
+
+
+def ensure_model(models_dir: Path, scale: str, args: argparse.Namespace) -> Path:
+    """The synthetic model for ``scale``, generated unless a tree with the same options exists."""
+    model_args = argparse.Namespace(**vars(args))
+    model_args.nodes = synth.parse_count(scale)
+    out_dir = models_dir / f"{scale}-seed{args.seed}"
+    params_file = out_dir / synth.PARAMS_FILE
+    if params_file.is_file() and json.loads(params_file.read_text(encoding="utf-8")) == synth.params(model_args):
+        return out_dir
+    if out_dir.exists():
+        shutil.rmtree(out_dir)
+    # In its own process, like the servers and generators: a large model built here would stay in
+    # this process's memory, and every process forked from it would start out that large
+    options = []
+    for key, value in synth.params(model_args).items():
+        options += [f"--{key.replace('_', '-')}", str(value)]
+    subprocess.run([sys.executable, str(BENCH_DIR / "synth.py"), str(out_dir), "--schemas", str(REPO_ROOT / "schemas")]
+                   + options, check=True)
+    return out_dir
+
+
+def workspace() -> Path:
+    """A scratch directory laid out like the repository root, which the generators run from."""
+    root = Path(tempfile.mkdtemp(prefix="hephora-bench-"))
+    (root / "schemas").symlink_to(REPO_ROOT / "schemas")
+    for tool, _ in TOOLS.values():
+        (root / "tools" / tool).mkdir(parents=True)
+        (root / "tools" / tool / "templates").symlink_to(TOOLS_DIR / tool / "templates")
+    return root
+
+
+def run_tool(tool: str, source_args: List[str], extra: List[str], log_path: Path) -> Dict[str, Any]:
+    """Run one generator in a fresh workspace; returns its wall time and peak memory."""
+    tool_dir, script = TOOLS[tool]
+    root = workspace()
+    try:
+        with log_path.open("w", encoding="utf-8") as log:
+            start = time.perf_counter()
+            proc = subprocess.Popen([sys.executable, str(TOOLS_DIR / tool_dir / script)] + source_args + extra,
+                                    cwd=root, stdout=log, stderr=subprocess.STDOUT)
+            # wait4 rather than wait: it also returns the resource usage of the finished process
+            _, status, usage = os.wait4(proc.pid, 0)
+            wall = time.perf_counter() - start
+            proc.returncode = os.waitstatus_to_exitcode(status)
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+    if proc.returncode != 0:
+        tail = log_path.read_text(encoding="utf-8", errors="replace").splitlines()[-15:]
+        raise SystemExit(f"bench: {tool} failed with status {proc.returncode}:\n" + "\n".join(tail))
+    # ru_maxrss is in kilobytes on Linux, in bytes on macOS
+    rss = usage.ru_maxrss / (1024 * 1024 if sys.platform == "darwin" else 1024)
+    return {"wall_s": round(wall, 3), "peak_rss_mb": round(rss, 1)}
+
+
+def requests_served(url: Optional[str]) -> int:
+    """Requests the stand-in server at ``url`` has answered so far (0 without a server)."""
+    if url is None:
+        return 0
+    with urllib.request.urlopen(url + STATS_PATH, timeout=10) as r:
+        return sum(json.load(r)["requests"].values())
+
+
+def bench_scale(scale: str, model_dir: Path, args: argparse.Namespace, log_dir: Path) -> Dict[str, Any]:
+    server: Optional[subprocess.Popen] = None
+    url: Optional[str] = None
+    if args.source == "server":
+        network = ["--latency", str(args.latency), "--jitter", str(args.jitter), "--error-rate", str(args.error_rate),
+                   "--seed", str(args.seed), "--log", str(log_dir / f"{scale}-server.jsonl")]
+        if args.workers:
+            network += ["--workers", str(args.workers)]
+        server = subprocess.Popen([sys.executable, str(BENCH_DIR / "server.py"), str(model_dir), "--port", "0"]
+                                  + network, stdout=subprocess.PIPE, text=True)
+        url = server.stdout.readline().strip()
+        if not url:
+            raise SystemExit(f"bench: the stand-in server did not start (status {server.wait()})")
+        source_args = ["--server", url, "--no-snapshot"]
+    else:
+        source_args = ["--data-dir", str(model_dir)]
+    results: Dict[str, Any] = {"nodes": sum(1 for _ in model_dir.glob("*/*.yaml"))}
+    try:
+        for tool in args.tools:
+            extra = ["--jobs", str(args.jobs)] if tool == "docgen" and args.jobs else []
+            runs = []
+            for _ in range(args.repeat):
+                before = requests_served(url)
+                result = run_tool(tool, source_args, extra, log_dir / f"{scale}-{tool}.log")
+                result["requests"] = requests_served(url) - before
+                runs.append(result)
+            # The fastest run is the least disturbed by the rest of the machine
+            best = min(runs, key=lambda r: r["wall_s"])
+            best["peak_rss_mb"] = max(r["peak_rss_mb"] for r in runs)
+            results[tool] = best
+            print(f"bench: {scale} {tool}: {best['wall_s']:.2f}s, {best['peak_rss_mb']:.0f} MB, "
+                  f"{best['requests']} requests")
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+    return results
+
+
+def results_key(scale: str, args: argparse.Namespace) -> str:
+    """Baseline entry of a run: the scale, the source and, for a server, any injected network behaviour."""
+    key = f"{scale}/{args.source}"
+    if args.source == "server":
+        for name, value, unit in (("latency", args.latency, "ms"), ("jitter", args.jitter, "ms"),
+                                  ("errors", args.error_rate, ""), ("workers", args.workers, "")):
+            if value:
+                key += f"/{name}={value:g}{unit}"
+    return key
+
+
+def compare(key: str, current: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    """Regressions of ``current`` against ``baseline``, one message each."""
+    problems = []
+    for tool, now in current.items():
+        before = baseline.get(tool)
+        if not isinstance(now, dict) or not isinstance(before, dict):
+            continue
+        if now["wall_s"] > before["wall_s"] * (1 + tolerance) + WALL_SLACK_S:
+            problems.append(f"{key} {tool}: wall time {now['wall_s']:.2f}s, baseline {before['wall_s']:.2f}s")
+        if now["peak_rss_mb"] > before["peak_rss_mb"] * (1 + tolerance):
+            problems.append(f"{key} {tool}: peak memory {now['peak_rss_mb']:.0f} MB, "
+                            f"baseline {before['peak_rss_mb']:.0f} MB")
+        # The request count of a cold run is deterministic; any increase is real
+        if now["requests"] > before["requests"]:
+            problems.append(f"{key} {tool}: {now['requests']} requests, baseline {before['requests']}")
+    return problems
+
+
+def machine() -> Dict[str, Any]:
+    return {"platform": platform.platform(), "python": platform.python_version(), "cpus": os.cpu_count()}
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the Hephora generators on synthetic models")
+    parser.add_argument("--scales", type=parse_scales, default=["1k"],
+                        help="Comma-separated model sizes, e.g. 1k,10k,100k (default: 1k)")
+    parser.add_argument("--source", choices=("server", "data"), default="server",
+                        help="Serve the model with the stand-in server, or read the YAML tree directly "
+                             "(default: %(default)s)")
+    network = parser.add_argument_group("stand-in server", "Network behaviour of the stand-in server (see server.py)")
+    network.add_argument("--latency", type=float, default=0.0, help="Milliseconds added to every response")
+    network.add_argument("--jitter", type=float, default=0.0, help="Spread of the added latency, in milliseconds")
+    network.add_argument("--error-rate", type=float, default=0.0,
+                         help="Fraction of requests failed with 503 (retried by the client)")
+    network.add_argument("--workers", type=int, default=None, help="Requests the server handles at once")
+    parser.add_argument("--tools", type=lambda t: [x for x in t.split(",") if x], default=list(TOOLS),
+                        help=f"Comma-separated generators to run (default: {','.join(TOOLS)})")
+    parser.add_argument("--repeat", type=int, default=3,
+                        help="Runs per generator; the fastest is kept (default: %(default)s)")
+    parser.add_argument("--jobs", type=int, default=None,
+                        help="Render workers for docgen (default: docgen's own default)")
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE,
+                        help="Baseline results to compare with (default: %(default)s)")
+    parser.add_argument("--update-baseline", action="store_true",
+                        help="Record this run's results as the baseline instead of comparing")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="Allowed slowdown and memory growth over the baseline, as a fraction "
+                             "(default: %(default)s)")
+    parser.add_argument("--models-dir", type=Path, default=default_models_dir(),
+                        help="Where generated models are kept between runs (default: %(default)s)")
+    parser.add_argument("--output", type=Path, default=None, help="Also write this run's results as JSON")
+    synth.add_arguments(parser)
+    args = parser.parse_args(argv)
+    unknown = [t for t in args.tools if t not in TOOLS]
+    if unknown:
+        parser.error(f"unknown tool(s) {', '.join(unknown)}; choose from {', '.join(TOOLS)}")
+
+    log_dir = Path(tempfile.mkdtemp(prefix="hephora-bench-logs-"))
+    results: Dict[str, Any] = {}
+    for scale in args.scales:
+        model_dir = ensure_model(args.models_dir, scale, args)
+        results[results_key(scale, args)] = bench_scale(scale, model_dir, args, log_dir)
+    if args.output is not None:
+        args.output.write_text(json.dumps({"machine": machine(), "results": results}, indent=2) + "\n",
+                               encoding="utf-8")
+
+    stored = json.loads(args.baseline.read_text(encoding="utf-8")) if args.baseline.is_file() else {}
+    if args.update_baseline:
+        stored.setdefault("results", {}).update(results)
+        stored["machine"] = machine()
+        args.baseline.write_text(json.dumps(stored, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+        print(f"bench: baseline updated in {args.baseline}")
+        shutil.rmtree(log_dir, ignore_errors=True)
+        return
+
+    if stored.get("machine") and stored["machine"] != machine():
+        print(f"bench: warning: the baseline was recorded on {stored['machine']['platform']} "
+              f"({stored['machine']['cpus']} CPUs); timings may not be comparable", file=sys.stderr)
+    problems: List[str] = []
+    for key, current in results.items():
+        baseline = stored.get("results", {}).get(key)
+        if baseline is None:
+            print(f"bench: no baseline for {key}; record one with --update-baseline")
+            continue
+        problems.extend(compare(key, current, baseline, args.tolerance))
+    for problem in problems:
+        print(f"bench: REGRESSION {problem}", file=sys.stderr)
+    print(f"bench: {len(results)} scale(s), {len(problems)} regression(s); logs in {log_dir}")
+    if problems:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
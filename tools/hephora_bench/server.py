@@ -0,0 +1,258 @@
+"""A stand-in for the Hephora server, serving a data/ YAML tree over the same HTTP API.
+
+    python tools/hephora_bench/server.py DATA_DIR [--port 8080] [--latency 40] [--jitter 10]
+        [--error-rate 0.01] [--workers 4] [--log requests.jsonl]
+
+Serves ``/nodes``, ``/nodes/list`` and ``/nodes/children`` like the devcontainer's
+``http_server``, plus the optional endpoints HephoraClient makes use of when a server has them:
+``/nodes/batch``, the ``/nodes/version`` change counter and ``ETag`` revalidation (each can be
+switched off to see how the tools do without it). Point the generators at it with
+``--server URL`` or ``HEPHORA_API_URL``.
+
+To see how the tools behave over a real network, every response can be delayed
+(--latency/--jitter, in milliseconds), a fraction of requests answered with an error
+(--error-rate/--error-status), and the number of requests handled at once capped (--workers,
+like a server with a fixed thread pool). --log writes one JSON line per request.
+
+The first line printed is the base URL, for callers starting the server with ``--port 0``.
+The requests answered so far, per endpoint, are served at ``/stand-in/stats``. The data/ tree
+is re-scanned on every ``/nodes/version`` request; the counter moves when a file changed.
+"""
+from __future__ import annotations
+import argparse
+import hashlib
+import json
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import IO, Any, Dict, List, Optional, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from hephora_common.local_store import LocalStoreClient  # noqa: E402
+
+# Not part of the Hephora API: neither counted, delayed nor failed
+STATS_PATH = "/stand-in/stats"
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    """Answers the Hephora read endpoints from the server's :class:`LocalStoreClient`.
+
+    Like the real API, every endpoint is a GET with a JSON body; unknown nodes and paths are 404.
+    """
+
+    server: "StandInServer"
+    protocol_version = "HTTP/1.1"
+    # Headers and body go out in separate writes; with Nagle on, each response waits for a delayed ACK
+    disable_nagle_algorithm = True
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+    def do_GET(self) -> None:
+        length = int(self.headers.get("Content-Length") or 0)
+        try:
+            body = json.loads(self.rfile.read(length) or b"{}")
+        except ValueError:
+            return self._send(400, {"error": "body is not JSON"})
+        if self.path == STATS_PATH:
+            return self._send(200, {"requests": self.server.stats()})
+
+        start = time.perf_counter()
+        with self.server.workers:
+            status, sent = self._answer(body)
+        self.server.record(self.path, body, status, sent, time.perf_counter() - start)
+
+    def _answer(self, body: Dict[str, Any]) -> Tuple[int, int]:
+        """Handle one API request; returns the status and the number of body bytes sent."""
+        server = self.server
+        delay = server.delay()
+        if delay:
+            time.sleep(delay)
+        if server.fail():
+            return self._send(server.error_status, {"error": "injected failure"})
+        store = server.store
+        profile = body.get("profile", "")
+        try:
+            if self.path == "/nodes/list":
+                out = {"nodes": store.list_nodes(profile, full=bool(body.get("full")))}
+            elif self.path == "/nodes":
+                out = {"node": store.get_node(profile, body.get("id", ""))}
+            elif self.path == "/nodes/children":
+                out = {"nodes": store.list_children(profile, body.get("id", ""))}
+            elif self.path == "/nodes/batch" and server.batch:
+                out = {"nodes": self._batch(profile, body.get("ids") or [])}
+            elif self.path == "/nodes/version" and server.versioned:
+                out = {"version": server.version()}
+            else:
+                return self._send(404, {"error": f"no endpoint {self.path}"})
+        except KeyError as exc:
+            return self._send(404, {"error": str(exc.args[0] if exc.args else exc)})
+        return self._send(200, out)
+
+    def _batch(self, profile: str, ids: List[str]) -> List[Dict[str, Any]]:
+        # Ids that are not nodes of the profile are left out, not an error
+        nodes = []
+        for nid in ids:
+            try:
+                nodes.append(self.server.store.get_node(profile, nid))
+            except KeyError:
+                continue
+        return nodes
+
+    def _send(self, status: int, out: Dict[str, Any]) -> Tuple[int, int]:
+        # YAML dates and times come back as objects; the API sends them as strings
+        data = json.dumps(out, default=str).encode("utf-8")
+        etag = None
+        if status == 200 and self.server.etags:
+            etag = '"' + hashlib.sha1(data).hexdigest() + '"'
+            if self.headers.get("If-None-Match") == etag:
+                status, data = 304, b""
+        self.send_response(status)
+        if etag is not None:
+            self.send_header("ETag", etag)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+        return status, len(data)
+
+
+class StandInServer(ThreadingHTTPServer):
+    """A local stand-in for the Hephora server, serving a ``data/`` tree over HTTP.
+
+    It counts the requests it answers per endpoint (:meth:`stats`), so a run's request count can
+    be checked. ``latency`` and ``jitter`` (seconds) delay every response by
+    ``latency ± jitter``; ``error_rate`` of the requests get ``error_status`` instead of an
+    answer; at most ``workers`` requests are handled at once (None: no limit). With ``log``,
+    each request is written to it as a JSON line. Port 0 picks a free port; :attr:`url` is the
+    base URL to pass as ``--server``.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, data_dir: Path, address: Tuple[str, int] = ("127.0.0.1", 0), latency: float = 0.0,
+                 jitter: float = 0.0, error_rate: float = 0.0, error_status: int = 503,
+                 workers: Optional[int] = None, batch: bool = True, etags: bool = True, versioned: bool = True,
+                 log: Optional[IO[str]] = None, seed: Optional[int] = None):
+        self.store = LocalStoreClient(data_dir)
+        self.latency = max(0.0, latency)
+        self.jitter = max(0.0, jitter)
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.workers = threading.BoundedSemaphore(workers) if workers else _Unlimited()
+        self.batch = batch
+        self.etags = etags
+        self.versioned = versioned
+        self.log = log
+        self.requests: Counter = Counter()
+        self.errors = 0
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._store_lock = threading.Lock()
+        self._version = 1
+        self._started = time.time()
+        super().__init__(address, StandInHandler)
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def delay(self) -> float:
+        if not self.jitter:
+            return self.latency
+        with self._lock:
+            return max(0.0, self.latency + self._rng.uniform(-self.jitter, self.jitter))
+
+    def fail(self) -> bool:
+        if self.error_rate <= 0:
+            return False
+        with self._lock:
+            return self._rng.random() < self.error_rate
+
+    def version(self) -> str:
+        """The change counter, advanced when the data/ tree changed since the last call."""
+        with self._store_lock:
+            changed, _ = self.store.refresh()
+            if changed:
+                self._version += 1
+            return str(self._version)
+
+    def record(self, path: str, body: Dict[str, Any], status: int, sent: int, elapsed: float) -> None:
+        with self._lock:
+            self.requests[path] += 1
+            if status >= 500 or status == 429:
+                self.errors += 1
+            if self.log is not None:
+                entry = {
+                    "t": round(time.time() - self._started, 4), "path": path, "profile": body.get("profile"),
+                    "status": status, "bytes": sent, "ms": round(elapsed * 1000, 2),
+                }
+                if "ids" in body:
+                    entry["ids"] = len(body["ids"] or [])
+                self.log.write(json.dumps(entry) + "\n")
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self.requests)
+
+
+class _Unlimited:
+    def __enter__(self) -> None:
+        return None
+
+    def __exit__(self, *exc: Any) -> None:
+        return None
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Serve a data/ YAML tree over the Hephora HTTP API")
+    parser.add_argument("data_dir", type=Path, help="The data/ tree to serve")
+    parser.add_argument("--host", default="127.0.0.1", help="Address to listen on (default: %(default)s)")
+    parser.add_argument("--port", type=int, default=8080,
+                        help="Port to listen on; 0 picks a free one (default: %(default)s)")
+    parser.add_argument("--latency", type=float, default=0.0,
+                        help="Milliseconds added to every response (default: %(default)s)")
+    parser.add_argument("--jitter", type=float, default=0.0,
+                        help="Spread of the added latency: each response gets latency ± jitter ms "
+                             "(default: %(default)s)")
+    parser.add_argument("--error-rate", type=float, default=0.0,
+                        help="Fraction of requests answered with --error-status (default: %(default)s)")
+    parser.add_argument("--error-status", type=int, default=503,
+                        help="Status of the injected failures (default: %(default)s)")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Requests handled at once; the others wait (default: no limit)")
+    parser.add_argument("--no-batch", action="store_true", help="Answer /nodes/batch with 404")
+    parser.add_argument("--no-etag", action="store_true", help="Send no ETag and never answer 304")
+    parser.add_argument("--no-version", action="store_true", help="Answer /nodes/version with 404")
+    parser.add_argument("--log", type=Path, default=None, help="Append one JSON line per request to this file")
+    parser.add_argument("--seed", type=int, default=None, help="Random seed for the jitter and failures")
+    args = parser.parse_args(argv)
+
+    log = args.log.open("a", encoding="utf-8", buffering=1) if args.log is not None else None
+    server = StandInServer(
+        args.data_dir, (args.host, args.port), latency=args.latency / 1000, jitter=args.jitter / 1000,
+        error_rate=args.error_rate, error_status=args.error_status, workers=args.workers,
+        batch=not args.no_batch, etags=not args.no_etag, versioned=not args.no_version, log=log, seed=args.seed,
+    )
+    # The URL first and on its own line: callers starting the server read it to find the port
+    print(server.url, flush=True)
+    print(f"server: serving {args.data_dir} (Ctrl-C to stop)", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        if log is not None:
+            log.close()
+        print(f"server: {sum(server.stats().values())} requests answered, {server.errors} failed")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,285 @@
+"""Write a synthetic Hephora model of any size, for benchmarking the generators.
+
+    python tools/hephora_bench/synth.py OUT_DIR [--nodes 10k] [--methods 4] [--seed 1]
+
+The tree has the layout of the repository's ``data/`` directory
+(``<profile>/<label>_<id8>.yaml``) and follows ``schemas/*.yaml``: one v_model root, the
+profiles each schema lists as ``children`` below their parents, every declared field filled
+with a value of its type and every reference pointing at an existing node of its target
+profile. The number of software units is picked so that the tree holds about ``--nodes``
+nodes; everything else scales with the units. The same options and seed always give the
+same tree.
+"""
+from __future__ import annotations
+import argparse
+import json
+import random
+import sys
+import uuid
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import yaml
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from hephora_common.schema import load_schemas  # noqa: E402
+
+# libyaml's dumper is several times faster on large trees; fall back to the pure-Python one
+_Dumper = getattr(yaml, "CSafeDumper", yaml.SafeDumper)
+
+ROOT_PROFILE = "v_model"
+# Written next to the profile directories; records the options the tree was generated with
+PARAMS_FILE = ".synth.json"
+SCALES = {"1k": 1_000, "10k": 10_000, "100k": 100_000}
+
+_WORDS = (
+    "motor controller sensor frame buffer state request response timeout fault channel driver "
+    "speed torque limit watchdog command queue event handler update config bus voltage current"
+).split()
+_MULTIPLICITIES = ("1", "0..1", "0..*", "1..*")
+
+# (parent profile, child profile) -> children per parent
+Fanout = Dict[Tuple[str, str], int]
+
+
+def parse_count(text: str) -> int:
+    """``1000``, ``10k`` or one of :data:`SCALES`."""
+    text = text.strip().lower()
+    if text in SCALES:
+        return SCALES[text]
+    try:
+        return int(float(text[:-1]) * 1000) if text.endswith("k") else int(text)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"not a node count: {text!r}")
+
+
+def fanout(args: argparse.Namespace, units: int) -> Fanout:
+    """Children per parent for a model of ``units`` software units.
+
+    Every unit gets the per-unit counts of the command line; the architecture, requirements and
+    the integration and qualification test plans grow with the number of units. Edges left out
+    (e.g. attachments of components) get no children.
+    """
+    per_10 = max(1, units // 10)
+    return {
+        ("v_model", "stakeholder_requirements_group"): max(1, units // 100),
+        ("stakeholder_requirements_group", "stakeholder_requirement"): 10,
+        ("v_model", "sw_requirements_group"): max(1, units // 50),
+        ("sw_requirements_group", "sw_requirement"): 10,
+        ("v_model", "sw_architecture"): 1,
+        ("sw_architecture", "sw_component"): per_10,
+        ("sw_architecture", "sw_interface"): per_10,
+        ("sw_architecture", "sw_data_structure"): per_10,
+        ("v_model", "sw_design"): 1,
+        ("sw_design", "sw_unit"): units,
+        ("sw_unit", "sw_unit_data_type"): args.data_types,
+        ("sw_unit", "sw_unit_method"): args.methods,
+        ("sw_unit", "sw_unit_attribute"): args.attributes,
+        ("sw_unit", "sw_unit_relationship"): args.relationships,
+        ("sw_unit", "attachment"): args.attachments,
+        ("v_model", "sw_unit_test_strategy"): 1,
+        ("sw_unit_test_strategy", "sw_unit_test_plan"): int(round(units * args.test_plans)),
+        ("sw_unit_test_plan", "sw_unit_test_case"): args.test_cases,
+        ("sw_unit_test_plan", "attachment"): args.attachments,
+        ("v_model", "sw_integration_test_strategy"): 1,
+        ("sw_integration_test_strategy", "sw_integration_test_plan"): per_10,
+        ("sw_integration_test_plan", "sw_integration_test_case"): args.test_cases,
+        ("v_model", "sw_qualification_test_strategy"): 1,
+        ("sw_qualification_test_strategy", "sw_qualification_test_plan"): per_10,
+        ("sw_qualification_test_plan", "sw_qualification_test_case"): args.test_cases,
+    }
+
+
+def child_profiles(schemas: Dict[str, Dict[str, Any]], profile: str) -> List[str]:
+    """Profiles the schema of ``profile`` lists as its children."""
+    declared = (schemas.get(profile, {}).get("children") or {}).values()
+    return list(dict.fromkeys(c["node"] for c in declared if isinstance(c, dict) and c.get("node")))
+
+
+def node_count(children: Dict[str, List[str]], counts: Fanout, profile: str = ROOT_PROFILE) -> int:
+    """Nodes in the tree below (and including) one ``profile`` node."""
+    return 1 + sum(counts.get((profile, c), 0) * node_count(children, counts, c) for c in children.get(profile, []))
+
+
+def units_for(args: argparse.Namespace, children: Dict[str, List[str]], nodes: int) -> int:
+    """Number of units giving the tree closest to ``nodes`` nodes."""
+    lo, hi = 1, max(1, nodes)
+    while lo < hi:
+        mid = (lo + hi) // 2
+        if node_count(children, fanout(args, mid)) < nodes:
+            lo = mid + 1
+        else:
+            hi = mid
+    below = max(1, lo - 1)
+    if abs(node_count(children, fanout(args, below)) - nodes) <= abs(node_count(children, fanout(args, lo)) - nodes):
+        return below
+    return lo
+
+
+class ModelWriter:
+    """Builds the node tree in memory, then fills in fields and writes one YAML file per node.
+
+    Fields are filled once every node exists, so references can point anywhere in the model.
+    References to the node's own profile (``alias_of``, nested data types, component parents)
+    only point at nodes created before it, which keeps them free of cycles.
+    """
+
+    def __init__(self, schemas: Dict[str, Dict[str, Any]], counts: Fanout, args: argparse.Namespace):
+        self.schemas = schemas
+        self.counts = counts
+        self.args = args
+        self.rng = random.Random(args.seed)
+        # profile -> [(id, label, parent id)] in creation order
+        self.nodes: Dict[str, List[Tuple[str, str, str]]] = {}
+        self.attachment_files: List[str] = []
+
+    def _uid(self) -> str:
+        return str(uuid.UUID(int=self.rng.getrandbits(128), version=4))
+
+    def build(self) -> None:
+        # Breadth-first, so every level is complete before the next one is created
+        level = [(ROOT_PROFILE, "")]
+        while level:
+            following = []
+            for profile, parent in level:
+                nid = self._uid()
+                nodes = self.nodes.setdefault(profile, [])
+                alias = (self.schemas.get(profile, {}).get("meta") or {}).get("alias") or profile
+                nodes.append((nid, f"{alias} {len(nodes) + 1}", parent))
+                for child in child_profiles(self.schemas, profile):
+                    following.extend([(child, nid)] * self.counts.get((profile, child), 0))
+            level = following
+
+    def _text(self, words: int) -> str:
+        return " ".join(self.rng.choice(_WORDS) for _ in range(words)).capitalize()
+
+    def _pool(self, target: str, profile: str, index: int) -> int:
+        """How many nodes of ``target`` a field of node ``index`` of ``profile`` may refer to."""
+        size = len(self.nodes.get(target, []))
+        return min(size, index) if target == profile else size
+
+    def _reference(self, target: str, profile: str, index: int) -> Optional[str]:
+        size = self._pool(target, profile, index)
+        return self.nodes[target][self.rng.randrange(size)][0] if size else None
+
+    def _value(self, name: str, spec: Dict[str, Any], profile: str, index: int) -> Any:
+        ftype = spec.get("type")
+        if ftype == "reference":
+            return self._reference(spec.get("target"), profile, index)
+        if ftype == "enum":
+            return self.rng.choice(spec.get("values") or [None])
+        if ftype == "integer":
+            return self.rng.randint(0, 100)
+        if ftype == "object":
+            return self._fields(spec.get("fields") or {}, profile, index)
+        if ftype == "array":
+            items = spec.get("items") or {}
+            if items.get("type") == "reference":
+                target = items.get("target")
+                size = self._pool(target, profile, index)
+                picked = self.rng.sample(range(size), min(size, self.args.references))
+                return [self.nodes[target][i][0] for i in picked]
+            size = self.args.parameters if items.get("type") == "object" else 2
+            return [v for v in (self._value(name, items, profile, index) for _ in range(size)) if v is not None]
+        if name == "multiplicity" or name.endswith("_multiplicity"):
+            return self.rng.choice(_MULTIPLICITIES)
+        if name == "filepath" and self.attachment_files:
+            return self.rng.choice(self.attachment_files)
+        fmt = (spec.get("meta") or {}).get("format") or {}
+        if fmt.get("type") == "editor":
+            return "\n\n".join(self._text(12) + "." for _ in range(3))
+        return self._text(6)
+
+    def _fields(self, fields: Dict[str, Any], profile: str, index: int) -> Dict[str, Any]:
+        out = {}
+        for name, spec in fields.items():
+            if isinstance(spec, dict):
+                value = self._value(name, spec, profile, index)
+                if value is not None:
+                    out[name] = value
+        return out
+
+    def write(self, out_dir: Path) -> int:
+        if self.nodes.get("attachment"):
+            # A few small evidence files shared by all attachments, next to the profile directories
+            files_dir = out_dir / "_attachments"
+            files_dir.mkdir(parents=True, exist_ok=True)
+            for k in range(8):
+                path = files_dir / f"evidence_{k}.txt"
+                path.write_text(f"{self._text(8)}\n" * 50, encoding="utf-8")
+                self.attachment_files.append(str(path.resolve()))
+        written = 0
+        for profile, nodes in self.nodes.items():
+            profile_dir = out_dir / profile
+            profile_dir.mkdir(parents=True, exist_ok=True)
+            fields = self.schemas.get(profile, {}).get("fields") or {}
+            for index, (nid, label, parent) in enumerate(nodes):
+                doc = {"_profile": profile, "_id": nid, "_label": label, "_parent_id": parent}
+                doc.update(self._fields(fields, profile, index))
+                with (profile_dir / f"{label}_{nid[:8]}.yaml").open("w", encoding="utf-8") as fh:
+                    yaml.dump(doc, fh, Dumper=_Dumper, sort_keys=False, allow_unicode=True)
+                written += 1
+        return written
+
+
+def params(args: argparse.Namespace) -> Dict[str, Any]:
+    """The options a tree is generated from, as recorded in :data:`PARAMS_FILE`."""
+    keys = ("nodes", "seed", "methods", "attributes", "data_types", "relationships", "parameters",
+            "references", "test_plans", "test_cases", "attachments")
+    return {k: getattr(args, k) for k in keys}
+
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    """Add the size and shape options (also offered by the benchmark runner)."""
+    parser.add_argument("--nodes", type=parse_count, default=SCALES["1k"],
+                        help=f"Approximate number of nodes: a count, e.g. 2500 or 10k, or one of "
+                             f"{', '.join(SCALES)} (default: 1k)")
+    parser.add_argument("--seed", type=int, default=1, help="Random seed (default: %(default)s)")
+    parser.add_argument("--methods", type=int, default=4, help="Methods per unit (default: %(default)s)")
+    parser.add_argument("--attributes", type=int, default=4, help="Attributes per unit (default: %(default)s)")
+    parser.add_argument("--data-types", type=int, default=2, help="Data types per unit (default: %(default)s)")
+    parser.add_argument("--relationships", type=int, default=2,
+                        help="Relationships per unit (default: %(default)s)")
+    parser.add_argument("--parameters", type=int, default=2,
+                        help="Items of object lists: method parameters, data type fields, enum values "
+                             "(default: %(default)s)")
+    parser.add_argument("--references", type=int, default=2,
+                        help="Items of reference lists, e.g. a unit's components (default: %(default)s)")
+    parser.add_argument("--test-plans", type=float, default=1.0,
+                        help="Unit test plans per unit (default: %(default)s)")
+    parser.add_argument("--test-cases", type=int, default=3, help="Test cases per test plan (default: %(default)s)")
+    parser.add_argument("--attachments", type=int, default=0,
+                        help="Attachments per unit and per unit test plan (default: %(default)s)")
+
+
+def generate(out_dir: Path, args: argparse.Namespace, schemas_dir: Path) -> int:
+    """Write the tree described by ``args`` into ``out_dir``; returns the number of nodes."""
+    schemas = load_schemas(schemas_dir)
+    if ROOT_PROFILE not in schemas:
+        raise SystemExit(f"synth: no {ROOT_PROFILE} schema in {schemas_dir}")
+    children = {name: child_profiles(schemas, name) for name in schemas}
+    writer = ModelWriter(schemas, fanout(args, units_for(args, children, args.nodes)), args)
+    writer.build()
+    written = writer.write(out_dir)
+    (out_dir / PARAMS_FILE).write_text(json.dumps(params(args), indent=2) + "\n", encoding="utf-8")
+    return written
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Write a synthetic Hephora data/ tree following schemas/*.yaml")
+    parser.add_argument("out_dir", type=Path, help="Directory to write the tree into (must be empty or absent)")
+    parser.add_argument("--schemas", type=Path, default=Path("schemas"),
+                        help="Schema directory (default: %(default)s)")
+    add_arguments(parser)
+    args = parser.parse_args(argv)
+
+    if args.out_dir.exists() and any(args.out_dir.iterdir()):
+        parser.error(f"{args.out_dir} is not empty")
+    written = generate(args.out_dir, args, args.schemas)
+    units = len(list((args.out_dir / "sw_unit").glob("*.yaml")))
+    print(f"synth: wrote {written} nodes ({units} units) to {args.out_dir}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1 @@
+"""Shared building blocks for the Hephora generators (client, caching, model access)."""
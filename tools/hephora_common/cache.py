@@ -0,0 +1,146 @@
+from __future__ import annotations
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from hephora_common.client import node_id
+from hephora_common.model import NodeModel
+
+
+class NodeCache:
+    """Identity-map cache in front of a Hephora client.
+
+    Exposes the same ``list_nodes``/``get_node``/``get_nodes``/``list_children`` interface as
+    :class:`~hephora_common.client.HephoraClient`, so generators can use it as a drop-in client.
+    Node bodies are keyed by ``(profile, id)`` and evicted least-recently-used once
+    ``max_nodes`` is exceeded. Listings are remembered for the lifetime of the cache, which is
+    meant to be a single generator run.
+
+    With a :class:`~hephora_common.model.NodeModel`, full node bodies are converted to compact
+    :class:`~hephora_common.model.Node` objects as they are loaded, so every consumer gets
+    attribute access and interned ids; summary listings stay plain dicts.
+    """
+
+    def __init__(self, client: Any, max_nodes: int = 50_000, model: Optional[NodeModel] = None):
+        self.client = client
+        self.model = model
+        self.max_nodes = max(1, max_nodes)
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._nodes: "OrderedDict[Tuple[str, str], Dict[str, Any]]" = OrderedDict()
+        self._lists: Dict[Tuple[str, bool], List[Any]] = {}
+        self._children: Dict[Tuple[str, str], List[Dict[str, Any]]] = {}
+        self._lock = threading.RLock()
+
+    # ---- client interface ----
+
+    def list_nodes(self, profile: str, full: bool = False) -> List[Dict[str, Any]]:
+        with self._lock:
+            listed = self._lists.get((profile, full))
+        if listed is not None:
+            # Full listings only remember ids; bodies come from (and refresh) the node cache
+            return self.get_nodes(profile, listed) if full else listed
+        nodes = self.client.list_nodes(profile, full=full)
+        with self._lock:
+            if full:
+                nodes = [self._put(profile, node_id(n), n) for n in nodes]
+                self._lists[(profile, True)] = [node_id(n) for n in nodes]
+            else:
+                self._lists[(profile, False)] = nodes
+        return nodes
+
+    def get_node(self, profile: str, node_id: str) -> Dict[str, Any]:
+        cached = self.peek(profile, node_id)
+        if cached is not None:
+            return cached
+        node = self.client.get_node(profile, node_id)
+        with self._lock:
+            return self._put(profile, node_id, node)
+
+    def get_nodes(self, profile: str, ids: Iterable[str]) -> List[Dict[str, Any]]:
+        wanted = list(dict.fromkeys(i for i in ids if i))
+        found: Dict[str, Dict[str, Any]] = {}
+        for i in wanted:
+            cached = self.peek(profile, i)
+            if cached is not None:
+                found[i] = cached
+        missing = [i for i in wanted if i not in found]
+        if missing:
+            fetched = self.client.get_nodes(profile, missing)
+            with self._lock:
+                for i, n in zip(missing, fetched):
+                    found[i] = self._put(profile, i, n)
+        return [found[i] for i in wanted]
+
+    def list_children(self, profile: str, node_id: str) -> List[Dict[str, Any]]:
+        key = (profile, node_id)
+        with self._lock:
+            children = self._children.get(key)
+        if children is None:
+            children = self.client.list_children(profile, node_id)
+            with self._lock:
+                self._children[key] = children
+        return children
+
+    def prefetch(self, profiles: Iterable[str]) -> None:
+        """Warm the cache with the full nodes of ``profiles`` (loaded in parallel by the client)."""
+        with self._lock:
+            wanted = [p for p in dict.fromkeys(profiles) if (p, True) not in self._lists]
+        if not wanted:
+            return
+        for profile, nodes in self.client.prefetch(wanted).items():
+            with self._lock:
+                for n in nodes:
+                    self._put(profile, node_id(n), n)
+                self._lists[(profile, True)] = [node_id(n) for n in nodes]
+
+    def load(self, roots: Iterable[str], reference_hops: int = 1) -> List[str]:
+        """Prefetch everything needed to generate from the profiles ``roots``; return what was planned.
+
+        With a model the plan is the schema closure of ``roots`` (see
+        :meth:`~hephora_common.loader.ProfileGraph.closure`), loaded as one parallel batch in
+        dependency order; without one, just ``roots``.
+        """
+        if self.model is not None:
+            profiles = self.model.profiles.closure(roots, reference_hops)
+        else:
+            profiles = list(dict.fromkeys(roots))
+        self.prefetch(profiles)
+        return profiles
+
+    # ---- cache helpers ----
+
+    def peek(self, profile: str, node_id: str) -> Optional[Dict[str, Any]]:
+        """Return the cached node (counting a hit or miss) without going to the server."""
+        key = (profile, node_id)
+        with self._lock:
+            node = self._nodes.get(key)
+            if node is None:
+                self.misses += 1
+                return None
+            self._nodes.move_to_end(key)
+            self.hits += 1
+            return node
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "nodes": len(self._nodes),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+    def _put(self, profile: str, node_id: Optional[str], node: Dict[str, Any]) -> Dict[str, Any]:
+        if self.model is not None:
+            node = self.model.node(node, profile)
+        if not node_id:
+            return node
+        key = (profile, node_id)
+        self._nodes[key] = node
+        self._nodes.move_to_end(key)
+        while len(self._nodes) > self.max_nodes:
+            self._nodes.popitem(last=False)
+            self.evictions += 1
+        return node
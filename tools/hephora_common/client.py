@@ -0,0 +1,237 @@
+from __future__ import annotations
+import json
+import requests
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from typing import Any, Dict, Iterable, List, Optional
+from urllib3.util.retry import Retry
+
+from hephora_common.snapshot import SnapshotStore
+
+# Status codes meaning "this server has no batch endpoint"; anything else is a real error.
+_NO_BATCH_STATUS = (404, 405, 501)
+# Transient failures worth retrying (the Hephora API is read-only here, so GETs are safe to repeat)
+_RETRY_STATUS = (429, 500, 502, 503, 504)
+
+
+def node_id(node: Dict[str, Any]) -> Optional[str]:
+    """Return the id of a node in either server shape (``id`` or ``_id``)."""
+    return node.get("id") or node.get("_id")
+
+
+def _snapshot_response(url: str, body: bytes) -> requests.Response:
+    r = requests.Response()
+    r.status_code = 200
+    r.url = url
+    r.headers["Content-Type"] = "application/json"
+    r._content = body
+    return r
+
+
+def _chunks(items: List[str], size: int) -> Iterable[List[str]]:
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+class HephoraClient:
+    """Client for the Hephora HTTP API.
+
+    With a :class:`SnapshotStore` every successful response is kept on disk and reused by later
+    runs. If the server exposes a change counter (``/nodes/version``), responses stored under the
+    current counter are served without any request; otherwise they are revalidated with
+    ``If-None-Match`` and only re-downloaded when the server's ``ETag`` changed. Responses from a
+    server offering neither are not stored, so every run fetches everything, as without a snapshot.
+    """
+
+    def __init__(self, base_url: str, token: Optional[str] = None, timeout: int = 20,
+                 batch_size: int = 100, max_workers: int = 8, retries: int = 3, backoff: float = 0.3,
+                 snapshot: Optional[SnapshotStore] = None):
+        self.base_url = base_url.rstrip("/")
+        self.session = requests.Session()
+        self.timeout = timeout
+        self.batch_size = max(1, batch_size)
+        # Upper bound on requests in flight at once, however many threads are fetching
+        self.max_workers = max(1, max_workers)
+        self._in_flight = threading.BoundedSemaphore(self.max_workers)
+        # None = not probed yet; False once the server told us /nodes/batch does not exist
+        self._batch_supported: Optional[bool] = None
+        retry = Retry(
+            total=retries, backoff_factor=backoff, status_forcelist=_RETRY_STATUS,
+            allowed_methods=frozenset({"GET"}), raise_on_status=False,
+        )
+        adapter = HTTPAdapter(pool_connections=self.max_workers, pool_maxsize=self.max_workers, max_retries=retry)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        if token:
+            self.session.headers.update({"Authorization": f"Bearer {token}"})
+        # Optional RunProfile receiving the latency of every request, per endpoint and profile
+        self.profile = None
+        self.snapshot = snapshot
+        # Responses answered from the snapshot (unchanged on the server) and requests actually sent
+        self.snapshot_hits = 0
+        self.requests_sent = 0
+        self._lock = threading.Lock()
+        # Held while probing /nodes/version only; never while waiting for a request slot with _lock held
+        self._probe_lock = threading.Lock()
+        self._version_probed = False
+        self._version: Optional[str] = None
+
+    def list_nodes(self, profile: str, full: bool = False) -> List[Dict[str, Any]]:
+        """List nodes of a profile.
+
+        With ``full=True`` the full node bodies (including ``fields``) are returned. The server is
+        asked for them in the listing itself; if it only returns summaries, the bodies are fetched
+        through :meth:`get_nodes`. Listed nodes that cannot be fetched are left out: a batch that
+        fails is fetched again one node at a time, so only the failing nodes are dropped.
+        """
+        payload: Dict[str, Any] = {"profile": profile}
+        if full:
+            payload["full"] = True
+        r = self._get("/nodes/list", payload)
+        r.raise_for_status()
+        data = r.json()
+        nodes = data.get("nodes", data)
+        if not full or all("fields" in n for n in nodes):
+            return nodes
+        listed: List[Dict[str, Any]] = []
+        for chunk in _chunks([node_id(n) for n in nodes], self.batch_size):
+            try:
+                listed.extend(self.get_nodes(profile, chunk))
+            except (requests.RequestException, ValueError):
+                listed.extend(n for n in self._get_each(profile, chunk) if n is not None)
+        return listed
+
+    def get_node(self, profile: str, node_id: str) -> Dict[str, Any]:
+        r = self._get("/nodes", {"profile": profile, "id": node_id})
+        r.raise_for_status()
+        return r.json().get("node", r.json())
+
+    def get_nodes(self, profile: str, ids: Iterable[str]) -> List[Dict[str, Any]]:
+        """Fetch full bodies for ``ids`` in batched requests, preserving the order of ``ids``.
+
+        Uses the ``/nodes/batch`` endpoint when the server provides it. Otherwise the ids are
+        chunked and each chunk is fetched with parallel :meth:`get_node` calls. Raises on the first
+        node that cannot be fetched, like :meth:`get_node`.
+        """
+        wanted = list(dict.fromkeys(i for i in ids if i))
+        found: Dict[str, Dict[str, Any]] = {}
+        for chunk in _chunks(wanted, self.batch_size):
+            if self._batch_supported is not False:
+                for n in self._get_batch(profile, chunk):
+                    found[node_id(n)] = n
+            missing = [i for i in chunk if i not in found]
+            if missing:
+                found.update(zip(missing, self.get_nodes_concurrent(profile, missing)))
+        return [found[i] for i in wanted]
+
+    def get_nodes_concurrent(self, profile: str, ids: Iterable[str]) -> List[Dict[str, Any]]:
+        """Fetch ``ids`` with one :meth:`get_node` call each, running up to ``max_workers`` at once."""
+        wanted = list(dict.fromkeys(i for i in ids if i))
+        if len(wanted) <= 1 or self.max_workers == 1:
+            return [self.get_node(profile, i) for i in wanted]
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(wanted))) as pool:
+            return list(pool.map(lambda i: self.get_node(profile, i), wanted))
+
+    def _get_each(self, profile: str, ids: List[str]) -> List[Optional[Dict[str, Any]]]:
+        """Fetch ``ids`` one at a time like :meth:`get_nodes_concurrent`, with None for each that fails."""
+        def fetch(i: str) -> Optional[Dict[str, Any]]:
+            try:
+                return self.get_node(profile, i)
+            except (requests.RequestException, ValueError):
+                return None
+
+        with ThreadPoolExecutor(max_workers=max(1, min(self.max_workers, len(ids)))) as pool:
+            return list(pool.map(fetch, ids))
+
+    def prefetch(self, profiles: Iterable[str]) -> Dict[str, List[Dict[str, Any]]]:
+        """Load the full nodes of several profiles in parallel.
+
+        This is a best-effort warm-up: profiles that fail to load are left out of the result so
+        the caller's own error handling applies when it lists them again.
+        """
+        wanted = list(dict.fromkeys(profiles))
+        loaded: Dict[str, List[Dict[str, Any]]] = {}
+        with ThreadPoolExecutor(max_workers=max(1, min(self.max_workers, len(wanted)))) as pool:
+            futures = {p: pool.submit(self.list_nodes, p, True) for p in wanted}
+            for profile, fut in futures.items():
+                try:
+                    loaded[profile] = fut.result()
+                except Exception:
+                    continue
+        return loaded
+
+    def list_children(self, profile: str, node_id: str) -> List[Dict[str, Any]]:
+        r = self._get("/nodes/children", {"profile": profile, "id": node_id})
+        r.raise_for_status()
+        data = r.json()
+        return data.get("nodes", data)
+
+    def _get_batch(self, profile: str, ids: List[str]) -> List[Dict[str, Any]]:
+        r = self._get("/nodes/batch", {"profile": profile, "ids": ids})
+        if r.status_code in _NO_BATCH_STATUS:
+            self._batch_supported = False
+            return []
+        r.raise_for_status()
+        self._batch_supported = True
+        data = r.json()
+        return data.get("nodes", data)
+
+    def _server_version(self) -> Optional[str]:
+        """The server's change counter, probed once per client; None if it has none."""
+        with self._probe_lock:
+            if not self._version_probed:
+                self._version_probed = True
+                try:
+                    r = self._send("/nodes/version", {})
+                    if r.status_code == 200:
+                        version = r.json().get("version")
+                        self._version = None if version is None else str(version)
+                except (requests.RequestException, ValueError, AttributeError):
+                    self._version = None
+            return self._version
+
+    def refresh_version(self) -> Optional[str]:
+        """Probe the server's change counter again and return it (None if the server has none).
+
+        Long-running callers use this to notice changes; later requests are then checked against
+        the new counter instead of the one probed at start-up.
+        """
+        with self._probe_lock:
+            self._version_probed = False
+        return self._server_version()
+
+    def _get(self, path: str, payload: Dict[str, Any]) -> requests.Response:
+        if self.snapshot is None:
+            return self._send(path, payload)
+        url = f"{self.base_url}{path}"
+        key = f"{url} {json.dumps(payload, sort_keys=True)}"
+        version = self._server_version()
+        cached = self.snapshot.get(key)
+        if cached is not None and version is not None and cached.version == version:
+            with self._lock:
+                self.snapshot_hits += 1
+            return _snapshot_response(url, cached.body)
+        headers = {"If-None-Match": cached.etag} if cached is not None and cached.etag else None
+        r = self._send(path, payload, headers)
+        if r.status_code == 304 and cached is not None:
+            self.snapshot.touch(key, version)
+            with self._lock:
+                self.snapshot_hits += 1
+            return _snapshot_response(url, cached.body)
+        etag = r.headers.get("ETag")
+        if r.status_code == 200 and (etag or version is not None):
+            self.snapshot.put(key, etag, version, r.content)
+        return r
+
+    def _send(self, path: str, payload: Dict[str, Any], headers: Optional[Dict[str, str]] = None) -> requests.Response:
+        with self._in_flight:
+            start = time.perf_counter()
+            try:
+                return self.session.get(f"{self.base_url}{path}", json=payload, headers=headers, timeout=self.timeout)
+            finally:
+                with self._lock:
+                    self.requests_sent += 1
+                if self.profile is not None:
+                    self.profile.record_request(path, payload.get("profile"), time.perf_counter() - start)
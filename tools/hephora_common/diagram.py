@@ -0,0 +1,665 @@
+from __future__ import annotations
+import bisect
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Sequence, Tuple
+from xml.sax.saxutils import escape
+
+from hephora_common.output import OutputFiles
+
+# Text metrics and spacing, in SVG user units (px)
+FONT_SIZE = 12
+LINE_HEIGHT = 16
+PAD = 8
+MIN_BOX_WIDTH = 80
+NODE_GAP = 40
+BEND_GAP = 12
+LAYER_GAP = 60
+MARGIN = 20
+# Boxes without any edge are set in rows of at most this width below the layered part
+ISOLATED_ROW_WIDTH = 1000
+# Up/down passes of the crossing reduction and of the coordinate assignment
+ORDER_SWEEPS = 8
+PLACE_SWEEPS = 4
+# Passes moving nodes between layers to shorten the edges
+LAYER_PASSES = 8
+
+# Edge kind -> (dashed, marker at the target end); the Mermaid arrows the templates write
+EDGE_STYLES = {
+    "dependency": (True, "arrow"),
+    "association": (False, "arrow"),
+    "aggregation": (True, "diamond"),
+    "composition": (True, "diamond-filled"),
+    "realization": (True, "triangle"),
+    "generalization": (False, "triangle"),
+    "provides": (False, "arrow"),
+    "requires": (True, "arrow"),
+}
+# Kinds pointing at a supertype: the target is laid out above the source, as in UML
+_UPWARD = {"realization", "generalization"}
+
+_MARKERS = """\
+<marker id="arrow" viewBox="0 0 10 10" refX="10" refY="5" markerWidth="10" markerHeight="10" orient="auto">\
+<path d="M0,0 L10,5 L0,10" fill="none" stroke="#333"/></marker>
+<marker id="triangle" viewBox="0 0 12 12" refX="12" refY="6" markerWidth="14" markerHeight="14" orient="auto">\
+<path d="M0,0 L12,6 L0,12 z" fill="#fff" stroke="#333"/></marker>
+<marker id="diamond" viewBox="0 0 16 10" refX="16" refY="5" markerWidth="16" markerHeight="10" orient="auto">\
+<path d="M0,5 L8,0 L16,5 L8,10 z" fill="#fff" stroke="#333"/></marker>
+<marker id="diamond-filled" viewBox="0 0 16 10" refX="16" refY="5" markerWidth="16" markerHeight="10" \
+orient="auto"><path d="M0,5 L8,0 L16,5 L8,10 z" fill="#333" stroke="#333"/></marker>"""
+
+_STYLE = """\
+text { font-family: sans-serif; font-size: 12px; fill: #222; }
+.title { font-weight: bold; }
+.box { fill: #ececff; stroke: #9370db; }
+.rule { stroke: #9370db; }
+.edge { fill: none; stroke: #333; }
+.dashed { stroke-dasharray: 5,4; }
+.label { font-size: 11px; }"""
+
+# Relative advance of characters in a sans-serif font, in ems; good enough to size boxes
+_NARROW = set("fijlrt.,:;|!'()[]{} ")
+_WIDE = set("mwMW@%")
+
+
+def text_width(text: str, size: float = FONT_SIZE, bold: bool = False) -> float:
+    ems = 0.0
+    for ch in text:
+        if ch in _NARROW:
+            ems += 0.3
+        elif ch in _WIDE:
+            ems += 0.85
+        elif ch.isupper() or ch.isdigit():
+            ems += 0.62
+        else:
+            ems += 0.52
+    return ems * size * (1.08 if bold else 1.0)
+
+
+class Box:
+    """A diagram node: a class with member compartments, a component or an interface circle.
+
+    ``x``/``y`` is the centre, set by the layout.
+    """
+
+    __slots__ = ("id", "label", "compartments", "shape", "width", "height", "x", "y")
+
+    def __init__(self, box_id: str, label: str, compartments: Sequence[Sequence[str]] = (), shape: str = "class"):
+        self.id = box_id
+        self.label = label
+        self.compartments = [list(c) for c in compartments]
+        self.shape = shape
+        self.x = self.y = 0.0
+        title = text_width(label, bold=True)
+        if shape == "interface":
+            self.width = self.height = max(title + 2 * PAD, 2 * LINE_HEIGHT)
+        elif shape == "component":
+            # Room for the component icon in the top-right corner
+            self.width = max(MIN_BOX_WIDTH, title + 4 * PAD + 12)
+            self.height = LINE_HEIGHT + 4 * PAD
+        else:
+            widest = max([title] + [text_width(line) for c in self.compartments for line in c])
+            self.width = max(MIN_BOX_WIDTH, widest + 2 * PAD)
+            self.height = LINE_HEIGHT + 2 * PAD + sum(len(c) * LINE_HEIGHT + PAD for c in self.compartments)
+
+
+class Edge:
+    """A relationship from ``source`` to ``target``; ``points`` is its route, set by the layout."""
+
+    __slots__ = ("source", "target", "kind", "source_label", "target_label", "points")
+
+    def __init__(self, source: str, target: str, kind: str, source_label: str = "", target_label: str = ""):
+        self.source = source
+        self.target = target
+        self.kind = kind
+        self.source_label = source_label
+        self.target_label = target_label
+        self.points: List[Tuple[float, float]] = []
+
+
+class Diagram:
+    """Boxes and edges laid out in layers and written as SVG, without Mermaid.
+
+    ``direction`` is "TB" (layers from top to bottom, for class diagrams) or "LR". The layout
+    is the classic layered one: cycles are broken by reversing DFS back edges, boxes get the
+    layer of their longest incoming path, edges spanning several layers bend through
+    placeholder nodes, the order within each layer is improved by barycenter sweeps (the best
+    order seen wins, by crossing count) and the boxes are then pulled toward their neighbours
+    while keeping that order. Everything is linear or n log n per sweep, so even the
+    whole-model diagram takes milliseconds.
+    """
+
+    def __init__(self, direction: str = "TB"):
+        self.direction = direction
+        self.boxes: Dict[str, Box] = {}
+        self.edges: List[Edge] = []
+
+    def add_box(self, box_id: str, label: str, compartments: Sequence[Sequence[str]] = (),
+                shape: str = "class") -> Box:
+        """Add a box; a box already added under ``box_id`` is kept as it is."""
+        if box_id not in self.boxes:
+            self.boxes[box_id] = Box(box_id, label, compartments, shape)
+        return self.boxes[box_id]
+
+    def add_edge(self, source: str, target: str, kind: str, source_label: str = "", target_label: str = "") -> None:
+        self.edges.append(Edge(source, target, kind, source_label or "", target_label or ""))
+
+    def layout(self) -> None:
+        _LayeredLayout(self).run()
+
+    def to_svg(self) -> str:
+        self.layout()
+        return _emit(self)
+
+
+class _LayeredLayout:
+    """Places the boxes of a diagram and routes its edges (see :class:`Diagram`).
+
+    Works in layer space: ``p`` runs along a layer, ``q`` across layers; "LR" diagrams are
+    transposed at the end.
+    """
+
+    def __init__(self, diagram: Diagram):
+        self.diagram = diagram
+        self.horizontal = diagram.direction == "LR"
+        self.boxes = list(diagram.boxes.values())
+        self.index = {b.id: i for i, b in enumerate(self.boxes)}
+
+    def run(self) -> None:
+        n = len(self.boxes)
+        links: List[Tuple[int, int, Edge]] = []
+        connected = [False] * n
+        for e in self.diagram.edges:
+            u, v = self.index[e.source], self.index[e.target]
+            connected[u] = connected[v] = True
+            if u != v:
+                links.append((v, u, e) if e.kind in _UPWARD else (u, v, e))
+
+        nodes = [i for i in range(n) if connected[i]]
+        flipped = self._break_cycles(n, links)
+        dag = [(v, u) if k in flipped else (u, v) for k, (u, v, _) in enumerate(links)]
+        layer = self._layers(nodes, dag)
+
+        # Node i < n is a box; the others are bends of edges spanning several layers
+        self.layer_of = layer + []
+        self.extent: List[Tuple[float, float]] = [
+            (b.height, b.width) if self.horizontal else (b.width, b.height) for b in self.boxes
+        ]
+        chains: List[List[int]] = []
+        for u, v in dag:
+            chain = [u]
+            for lv in range(layer[u] + 1, layer[v]):
+                self.layer_of.append(lv)
+                self.extent.append((0.0, 0.0))
+                chain.append(len(self.layer_of) - 1)
+            chain.append(v)
+            chains.append(chain)
+        count = len(self.layer_of)
+        self.up: List[List[int]] = [[] for _ in range(count)]
+        self.down: List[List[int]] = [[] for _ in range(count)]
+        for chain in chains:
+            for a, b in zip(chain, chain[1:]):
+                self.down[a].append(b)
+                self.up[b].append(a)
+
+        layers = self._order(nodes, count)
+        pos = self._place(layers, count)
+        for i in nodes:
+            self._set_center(self.boxes[i], pos[i])
+
+        for k, (_, _, e) in enumerate(links):
+            chain = chains[k]
+            points = [self._point(pos[i]) for i in chain]
+            if (e.kind in _UPWARD) != (k in flipped):
+                points.reverse()
+            e.points = points
+        self._spread_parallel(links)
+        for e in self.diagram.edges:
+            src, dst = self.diagram.boxes[e.source], self.diagram.boxes[e.target]
+            if src is dst:
+                e.points = _loop(src)
+                continue
+            e.points[0] = _clip(src, e.points[0], e.points[1])
+            e.points[-1] = _clip(dst, e.points[-1], e.points[-2])
+
+        self._place_isolated([b for i, b in enumerate(self.boxes) if not connected[i]])
+
+    @staticmethod
+    def _break_cycles(n: int, links: List[Tuple[int, int, Edge]]) -> set:
+        """Indexes of the links to reverse so the graph has no cycle: the back edges of a DFS."""
+        succ: List[List[Tuple[int, int]]] = [[] for _ in range(n)]
+        for k, (u, v, _) in enumerate(links):
+            succ[u].append((v, k))
+        state = [0] * n  # 0: not seen, 1: on the DFS stack, 2: done
+        flipped = set()
+        for root in range(n):
+            if state[root]:
+                continue
+            state[root] = 1
+            stack = [(root, iter(succ[root]))]
+            while stack:
+                node, it = stack[-1]
+                for v, k in it:
+                    if state[v] == 1:
+                        flipped.add(k)
+                    elif state[v] == 0:
+                        state[v] = 1
+                        stack.append((v, iter(succ[v])))
+                        break
+                else:
+                    state[node] = 2
+                    stack.pop()
+        return flipped
+
+    def _layers(self, nodes: List[int], dag: List[Tuple[int, int]]) -> List[int]:
+        """Longest-path layering, then shortened edge by edge."""
+        n = len(self.boxes)
+        succ: List[List[int]] = [[] for _ in range(n)]
+        indegree = [0] * n
+        for u, v in dag:
+            succ[u].append(v)
+            indegree[v] += 1
+        layer = [0] * n
+        order = [i for i in nodes if indegree[i] == 0]
+        head = 0
+        while head < len(order):
+            u = order[head]
+            head += 1
+            for v in succ[u]:
+                layer[v] = max(layer[v], layer[u] + 1)
+                indegree[v] -= 1
+                if indegree[v] == 0:
+                    order.append(v)
+        # Longest path stacks everything as high as it goes; move each node toward the side with
+        # more edges, within the layers its neighbours leave free, while that shortens the edges
+        pred: List[List[int]] = [[] for _ in range(n)]
+        for u, v in dag:
+            pred[v].append(u)
+        for _ in range(LAYER_PASSES):
+            moved = False
+            for u in reversed(order):
+                if len(succ[u]) > len(pred[u]):
+                    best = min(layer[v] for v in succ[u]) - 1
+                elif len(pred[u]) > len(succ[u]):
+                    best = max(layer[v] for v in pred[u]) + 1
+                else:
+                    continue
+                if best != layer[u]:
+                    layer[u], moved = best, True
+            if not moved:
+                break
+        base = min((layer[i] for i in nodes), default=0)
+        return [lv - base for lv in layer]
+
+    def _order(self, nodes: List[int], count: int) -> List[List[int]]:
+        """Nodes of each layer, in the order with the fewest crossings the sweeps found."""
+        depth = max((self.layer_of[i] for i in nodes), default=-1) + 1
+        layers: List[List[int]] = [[] for _ in range(depth)]
+        # Start from depth-first discovery order, which keeps related nodes together
+        seen = [False] * count
+        for root in nodes:
+            if seen[root] or self.up[root]:
+                continue
+            stack = [root]
+            while stack:
+                u = stack.pop()
+                if seen[u]:
+                    continue
+                seen[u] = True
+                layers[self.layer_of[u]].append(u)
+                stack.extend(reversed(self.down[u]))
+        on_layers = set(nodes)
+        for i in range(count):
+            if not seen[i] and (i >= len(self.boxes) or i in on_layers):
+                layers[self.layer_of[i]].append(i)
+
+        rank = [0] * count
+        for row in layers:
+            for r, i in enumerate(row):
+                rank[i] = r
+        best, best_crossings = [list(row) for row in layers], self._crossings(layers, rank)
+        for sweep in range(ORDER_SWEEPS):
+            if best_crossings == 0:
+                break
+            downward = sweep % 2 == 0
+            rows = range(1, depth) if downward else range(depth - 2, -1, -1)
+            near = self.up if downward else self.down
+            for lv in rows:
+                row = layers[lv]
+                key = {}
+                for i in row:
+                    js = near[i]
+                    if len(js) == 1:
+                        key[i] = rank[js[0]]
+                    else:
+                        key[i] = sum([rank[j] for j in js]) / len(js) if js else rank[i]
+                row.sort(key=key.__getitem__)
+                for r, i in enumerate(row):
+                    rank[i] = r
+            if downward:
+                continue
+            # Orders are compared after each down and up pair of sweeps; stop once a pair brings nothing
+            crossings = self._crossings(layers, rank)
+            if crossings >= best_crossings:
+                break
+            best, best_crossings = [list(row) for row in layers], crossings
+        return best
+
+    def _crossings(self, layers: List[List[int]], rank: List[int]) -> int:
+        total = 0
+        for row in layers[:-1]:
+            # Rows are in rank order, so only each node's own edges need sorting
+            ends: List[int] = []
+            for u in row:
+                down = self.down[u]
+                if len(down) == 1:
+                    ends.append(rank[down[0]])
+                else:
+                    ends.extend(sorted([rank[v] for v in down]))
+            total += _inversions(ends)
+        return total
+
+    def _place(self, layers: List[List[int]], count: int) -> List[Tuple[float, float]]:
+        """Centre of every node: ``p`` from neighbour barycentres, ``q`` from the layer."""
+        # The order within the layers is fixed by now, and with it the spacing of their nodes
+        offsets = [self._offsets(row) for row in layers]
+        p = [0.0] * count
+        for row, row_offsets in zip(layers, offsets):
+            for i, off in zip(row, row_offsets):
+                p[i] = off
+        both = [up + down for up, down in zip(self.up, self.down)]
+        for sweep in range(PLACE_SWEEPS * 2 + 1):
+            if sweep == PLACE_SWEEPS * 2:
+                rows, near = range(len(layers)), both
+            elif sweep % 2 == 0:
+                rows, near = range(1, len(layers)), self.up
+            else:
+                rows, near = range(len(layers) - 2, -1, -1), self.down
+            for lv in rows:
+                row = layers[lv]
+                wanted = []
+                for i in row:
+                    js = near[i]
+                    if len(js) == 1:
+                        wanted.append(p[js[0]])
+                    elif js:
+                        wanted.append(sum([p[j] for j in js]) / len(js))
+                    else:
+                        wanted.append(p[i])
+                for i, value in zip(row, _fit(wanted, offsets[lv])):
+                    p[i] = value
+
+        left = min((p[i] - self.extent[i][0] / 2 for row in layers for i in row), default=0.0)
+        q, top = [0.0] * count, 0.0
+        for row in layers:
+            thickness = max((self.extent[i][1] for i in row), default=0.0)
+            for i in row:
+                q[i] = top + thickness / 2
+            top += thickness + LAYER_GAP
+        return [(p[i] - left + MARGIN, q[i] + MARGIN) for i in range(count)]
+
+    def _offsets(self, row: List[int]) -> List[float]:
+        """Closest centre positions the nodes of ``row`` can have relative to the first one."""
+        offsets, at = [], 0.0
+        for k, i in enumerate(row):
+            if k:
+                prev = row[k - 1]
+                gap = NODE_GAP if prev < len(self.boxes) and i < len(self.boxes) else BEND_GAP
+                at += (self.extent[prev][0] + self.extent[i][0]) / 2 + gap
+            offsets.append(at)
+        return offsets
+
+    def _point(self, pq: Tuple[float, float]) -> Tuple[float, float]:
+        return (pq[1], pq[0]) if self.horizontal else pq
+
+    def _set_center(self, box: Box, pq: Tuple[float, float]) -> None:
+        box.x, box.y = self._point(pq)
+
+    def _spread_parallel(self, links: List[Tuple[int, int, Edge]]) -> None:
+        # Edges between the same two boxes would be drawn on top of each other; fan them out
+        groups: Dict[Tuple[int, int], List[Edge]] = {}
+        for u, v, e in links:
+            groups.setdefault((min(u, v), max(u, v)), []).append(e)
+        for edges in groups.values():
+            if len(edges) < 2:
+                continue
+            for k, e in enumerate(edges):
+                shift = (k - (len(edges) - 1) / 2) * 14
+                dx, dy = (0.0, shift) if self.horizontal else (shift, 0.0)
+                e.points = [(x + dx, y + dy) for x, y in e.points]
+
+    def _place_isolated(self, boxes: List[Box]) -> None:
+        if not boxes:
+            return
+        isolated = set(b.id for b in boxes)
+        placed = [b for b in self.diagram.boxes.values() if b.id not in isolated]
+        right = max((b.x + b.width / 2 for b in placed), default=0.0)
+        top = max((b.y + b.height / 2 for b in placed), default=-LAYER_GAP + MARGIN) + LAYER_GAP
+        limit = max(right - MARGIN, ISOLATED_ROW_WIDTH)
+        x, row_height = 0.0, 0.0
+        for b in boxes:
+            if x and x + b.width > limit:
+                top += row_height + NODE_GAP
+                x, row_height = 0.0, 0.0
+            b.x, b.y = MARGIN + x + b.width / 2, top + b.height / 2
+            x += b.width + NODE_GAP
+            row_height = max(row_height, b.height)
+
+
+def _fit(wanted: List[float], offsets: List[float]) -> List[float]:
+    """Positions closest (least squares) to ``wanted`` that keep at least the spacing of ``offsets``.
+
+    With ``y = x - offset`` the constraint becomes "y non-decreasing", solved exactly by
+    pool-adjacent-violators.
+    """
+    # Blocks of nodes sharing one y: their sums and sizes
+    sums: List[float] = []
+    sizes: List[int] = []
+    for value, off in zip(wanted, offsets):
+        total, n = value - off, 1
+        while sums and sums[-1] * n > total * sizes[-1]:
+            total += sums.pop()
+            n += sizes.pop()
+        sums.append(total)
+        sizes.append(n)
+    out: List[float] = []
+    for total, n in zip(sums, sizes):
+        out.extend([total / n] * n)
+    return [y + off for y, off in zip(out, offsets)]
+
+
+def _inversions(values: List[int]) -> int:
+    """Pairs out of order in ``values``, i.e. crossings between the edges of two layers."""
+    seen: List[int] = []
+    count = 0
+    for v in values:
+        count += len(seen) - bisect.bisect_right(seen, v)
+        bisect.insort(seen, v)
+    return count
+
+
+def _clip(box: Box, start: Tuple[float, float], toward: Tuple[float, float]) -> Tuple[float, float]:
+    """Where the line from ``start``, inside ``box``, to ``toward`` leaves the outline of the box."""
+    (sx, sy), dx, dy = start, toward[0] - start[0], toward[1] - start[1]
+    if not dx and not dy:
+        return start
+    if box.shape == "interface":
+        # Edges of an interface aim at its centre
+        sx, sy, dx, dy = box.x, box.y, toward[0] - box.x, toward[1] - box.y
+        t = box.width / 2 / ((dx * dx + dy * dy) ** 0.5 or 1.0)
+    else:
+        half_w, half_h = box.width / 2, box.height / 2
+        tx = ((box.x + half_w - sx) / dx if dx > 0 else (box.x - half_w - sx) / dx) if dx else float("inf")
+        ty = ((box.y + half_h - sy) / dy if dy > 0 else (box.y - half_h - sy) / dy) if dy else float("inf")
+        t = min(tx, ty)
+    t = min(max(t, 0.0), 1.0)
+    return sx + dx * t, sy + dy * t
+
+
+def _loop(box: Box) -> List[Tuple[float, float]]:
+    right, reach = box.x + box.width / 2, min(box.height / 4, 20.0)
+    return [(right, box.y - reach), (right + 24, box.y - reach), (right + 24, box.y + reach), (right, box.y + reach)]
+
+
+def _num(value: float) -> str:
+    text = f"{value:.1f}"
+    return text[:-2] if text.endswith(".0") else text
+
+
+def _path(points: List[Tuple[float, float]]) -> str:
+    # Bends are rounded: straight to the middle of each segment, then a curve around the bend point
+    out = [f"M{_num(points[0][0])},{_num(points[0][1])}"]
+    for k in range(1, len(points) - 1):
+        (bx, by), (nx, ny) = points[k], points[k + 1]
+        mx, my = (bx + nx) / 2, (by + ny) / 2
+        if k == 1:
+            px, py = points[0]
+            out.append(f"L{_num((px + bx) / 2)},{_num((py + by) / 2)}")
+        out.append(f"Q{_num(bx)},{_num(by)} {_num(mx)},{_num(my)}")
+    out.append(f"L{_num(points[-1][0])},{_num(points[-1][1])}")
+    return " ".join(out)
+
+
+def _end_label(points: List[Tuple[float, float]], at_start: bool) -> Tuple[float, float]:
+    (x0, y0), (x1, y1) = (points[0], points[1]) if at_start else (points[-1], points[-2])
+    length = ((x1 - x0) ** 2 + (y1 - y0) ** 2) ** 0.5 or 1.0
+    ux, uy = (x1 - x0) / length, (y1 - y0) / length
+    return x0 + ux * 18 - uy * 10, y0 + uy * 18 + ux * 10 + 4
+
+
+def _text(x: float, y: float, text: str, css: str = "", anchor: str = "middle") -> str:
+    css = f' class="{css}"' if css else ""
+    return f'<text x="{_num(x)}" y="{_num(y)}" text-anchor="{anchor}"{css}>{escape(text)}</text>'
+
+
+def _box(box: Box) -> List[str]:
+    left, top = box.x - box.width / 2, box.y - box.height / 2
+    if box.shape == "interface":
+        return [
+            f'<circle class="box" cx="{_num(box.x)}" cy="{_num(box.y)}" r="{_num(box.width / 2)}"/>',
+            _text(box.x, box.y + FONT_SIZE / 3, box.label),
+        ]
+    out = [f'<rect class="box" x="{_num(left)}" y="{_num(top)}" width="{_num(box.width)}" '
+           f'height="{_num(box.height)}"/>']
+    if box.shape == "component":
+        ix, iy = left + box.width - PAD - 12, top + PAD
+        out.append(f'<path class="rule" fill="none" d="M{_num(ix + 3)},{_num(iy)} h9 v14 h-9 z '
+                   f'M{_num(ix)},{_num(iy + 3)} h6 v3 h-6 z M{_num(ix)},{_num(iy + 8)} h6 v3 h-6 z"/>')
+        out.append(_text(box.x - 6, box.y + FONT_SIZE / 3, box.label, "title"))
+        return out
+    y = top + PAD + FONT_SIZE
+    out.append(_text(box.x, y, box.label, "title"))
+    y = top + LINE_HEIGHT + 2 * PAD
+    for compartment in box.compartments:
+        out.append(f'<path class="rule" d="M{_num(left)},{_num(y)} h{_num(box.width)}"/>')
+        for k, line in enumerate(compartment):
+            out.append(_text(left + PAD, y + PAD / 2 + FONT_SIZE + k * LINE_HEIGHT, line, anchor="start"))
+        y += len(compartment) * LINE_HEIGHT + PAD
+    return out
+
+
+def _emit(diagram: Diagram) -> str:
+    right = bottom = 0.0
+    for b in diagram.boxes.values():
+        right = max(right, b.x + b.width / 2)
+        bottom = max(bottom, b.y + b.height / 2)
+    for e in diagram.edges:
+        for x, y in e.points:
+            right, bottom = max(right, x + 20), max(bottom, y + 20)
+    width, height = _num(right + MARGIN), _num(bottom + MARGIN)
+    out = [
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" viewBox="0 0 {width} {height}">',
+        f"<defs>\n{_MARKERS}\n</defs>",
+        f"<style>\n{_STYLE}\n</style>",
+    ]
+    for e in diagram.edges:
+        if len(e.points) < 2:
+            continue
+        dashed, marker = EDGE_STYLES.get(e.kind, (False, "arrow"))
+        css = "edge dashed" if dashed else "edge"
+        out.append(f'<path class="{css}" d="{_path(e.points)}" marker-end="url(#{marker})"/>')
+        if e.source_label:
+            out.append(_text(*_end_label(e.points, True), e.source_label, "label"))
+        if e.target_label:
+            out.append(_text(*_end_label(e.points, False), e.target_label, "label"))
+    for b in diagram.boxes.values():
+        out.extend(_box(b))
+    out.append("</svg>")
+    return "\n".join(out) + "\n"
+
+
+_SCOPES = {"public": "+", "protected": "#", "private": "-"}
+
+
+def _member_lines(c: Dict[str, Any]) -> List[List[str]]:
+    # Same member text as the Mermaid templates: "+type name" and "+name(type name, ...) return"
+    attributes = [
+        f"{_SCOPES.get(a.get('scope') or '', '')}{' '.join(filter(None, (a.get('type'), a.get('name'))))}"
+        for a in c.get("attributes") or []
+    ]
+    methods = []
+    for m in c.get("methods") or []:
+        params = ", ".join(" ".join(filter(None, (p.get("type"), p.get("name")))) for p in m.get("parameters") or [])
+        methods.append(f"{_SCOPES.get(m.get('scope') or '', '')}{m.get('name') or ''}({params}) "
+                       f"{m.get('return_type') or ''}".rstrip())
+    return [attributes, methods]
+
+
+def class_diagram(classes: Iterable[Dict[str, Any]], relationships: Iterable[Dict[str, Any]]) -> Diagram:
+    """Class diagram of resolved units (see UnitResolver) and ``{source, target, type, *_multiplicity}`` edges.
+
+    Relationships of a type the templates do not draw are left out, as in the ``.mmd``.
+    """
+    diagram = Diagram("TB")
+    for c in classes:
+        diagram.add_box(c["id"], c.get("label") or c["id"], _member_lines(c))
+    for r in relationships:
+        if not r.get("target") or r.get("type") not in EDGE_STYLES:
+            continue
+        for end in (r["source"], r["target"]):
+            diagram.add_box(end, end, [[], []])
+        diagram.add_edge(r["source"], r["target"], r["type"],
+                         r.get("origin_multiplicity"), r.get("target_multiplicity"))
+    return diagram
+
+
+def block_diagram(components: Iterable[Dict[str, Any]], interfaces: Iterable[Dict[str, Any]]) -> Diagram:
+    """Component/interface diagram: components provide (solid) and require (dashed) interfaces."""
+    diagram = Diagram("LR")
+    for c in components:
+        diagram.add_box(c["id"], c.get("label") or c["id"], shape="component")
+    for i in interfaces:
+        diagram.add_box(i["id"], i.get("label") or i["id"], shape="interface")
+    for i in interfaces:
+        for kind, ends in (("provides", i.get("provided_by")), ("requires", i.get("required_by"))):
+            for component in ends or []:
+                diagram.add_box(component, component, shape="component")
+                diagram.add_edge(component, i["id"], kind)
+    return diagram
+
+
+class SvgRenderer:
+    """Writes diagrams as ``.svg`` in-process: no mmdc, Chromium or Docker needed.
+
+    Files are only rewritten when their content changed. The time spent on layout and SVG is
+    kept, for the summary.
+    """
+
+    def __init__(self):
+        self.files = OutputFiles()
+        self.rendered = 0
+        self.seconds = 0.0
+        self.slowest = 0.0
+
+    def write(self, diagram: Diagram, path: Path) -> bool:
+        start = time.perf_counter()
+        text = diagram.to_svg()
+        elapsed = time.perf_counter() - start
+        self.rendered += 1
+        self.seconds += elapsed
+        self.slowest = max(self.slowest, elapsed)
+        return self.files.write_text(path, text)
+
+    def summary(self) -> str:
+        return (f"{self.files.written} svg written, {self.files.unchanged} unchanged "
+                f"({self.rendered} laid out in {self.seconds:.2f}s, slowest {self.slowest * 1000:.0f}ms)")
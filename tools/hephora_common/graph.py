@@ -0,0 +1,110 @@
+from __future__ import annotations
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from hephora_common.client import node_id
+from hephora_common.model import Node
+from hephora_common.schema import FieldPath, load_schemas, reference_paths
+
+
+def load_reference_fields(schemas_dir: Path) -> Dict[str, List[Tuple[FieldPath, str]]]:
+    """Read ``schemas/*.yaml`` and return, per profile, every reference field and its target profile.
+
+    Nested object and array fields are included, e.g. ``sw_unit_method`` yields
+    ``("parameters", "[]", "data_type") -> sw_unit_data_type``.
+    """
+    return {name: list(reference_paths(schema.get("fields") or {}))
+            for name, schema in load_schemas(schemas_dir).items()}
+
+
+def field_name(path: FieldPath) -> str:
+    """Dotted name of a reference path as used by :meth:`GraphIndex.referrers` (``parameters.data_type``)."""
+    return ".".join(p for p in path if p != "[]")
+
+
+def _values_at(value: Any, path: FieldPath) -> Iterator[Any]:
+    if not path:
+        yield value
+        return
+    step, rest = path[0], path[1:]
+    if step == "[]":
+        for item in value if isinstance(value, list) else []:
+            yield from _values_at(item, rest)
+    elif isinstance(value, dict) and value.get(step) is not None:
+        yield from _values_at(value[step], rest)
+
+
+def _field_values(node: Any, path: FieldPath) -> Iterator[Any]:
+    # Typed nodes hold each top-level field in a slot; raw dicts under "fields"
+    if isinstance(node, Node):
+        return _values_at(node.field(path[0]), path[1:])
+    return _values_at(node.get("fields") or {}, path)
+
+
+def _parent(node: Any) -> Optional[str]:
+    return node.parent if isinstance(node, Node) else node.get("parent") or node.get("_parent_id")
+
+
+class GraphIndex:
+    """Parent/child and reverse-reference indexes over loaded nodes.
+
+    Built once from full node bodies; afterwards "which nodes of profile P live under X" and
+    "which nodes point at X through field F" are dictionary lookups instead of scans. Lists keep
+    the order in which nodes were added, so results match a linear scan over the same input.
+    """
+
+    def __init__(self, reference_fields: Dict[str, List[Tuple[FieldPath, str]]]):
+        self.reference_fields = reference_fields
+        self._nodes: Dict[str, Dict[str, Any]] = {}
+        self._profiles: Dict[str, str] = {}
+        self._children: Dict[Tuple[str, str], List[Dict[str, Any]]] = {}
+        self._referrers: Dict[Tuple[str, str, str], List[Dict[str, Any]]] = {}
+
+    @classmethod
+    def from_schemas(cls, schemas_dir: Path) -> "GraphIndex":
+        return cls(load_reference_fields(schemas_dir))
+
+    def add(self, profile: str, nodes: Iterable[Dict[str, Any]]) -> None:
+        """Index full nodes of ``profile``. Nodes already indexed are skipped."""
+        paths = [(p, field_name(p)) for p, _ in self.reference_fields.get(profile, [])]
+        for n in nodes:
+            nid = node_id(n)
+            if not nid or nid in self._nodes:
+                continue
+            self._nodes[nid] = n
+            self._profiles[nid] = profile
+            parent = _parent(n)
+            if parent:
+                self._children.setdefault((parent, profile), []).append(n)
+            for path, name in paths:
+                # A node pointing twice at the same target through one field is listed once
+                for target in dict.fromkeys(t for t in _field_values(n, path) if isinstance(t, str) and t):
+                    self._referrers.setdefault((target, profile, name), []).append(n)
+
+    def node(self, node_id: str) -> Optional[Dict[str, Any]]:
+        return self._nodes.get(node_id)
+
+    def profile_of(self, node_id: str) -> Optional[str]:
+        return self._profiles.get(node_id)
+
+    def parent_of(self, node_id: str) -> Optional[str]:
+        node = self._nodes.get(node_id)
+        return (_parent(node) or None) if node is not None else None
+
+    def references(self, node: Dict[str, Any], profile: Optional[str] = None) -> List[str]:
+        """Ids ``node`` points at through any reference field of its profile (looked up if not given)."""
+        profile = profile or self._profiles.get(node_id(node))
+        targets: Dict[str, None] = {}
+        for path, _ in self.reference_fields.get(profile, []):
+            for target in _field_values(node, path):
+                if isinstance(target, str) and target:
+                    targets[target] = None
+        return list(targets)
+
+    def children(self, parent_id: str, profile: str) -> List[Dict[str, Any]]:
+        """Indexed nodes of ``profile`` whose parent is ``parent_id``."""
+        return self._children.get((parent_id, profile), [])
+
+    def referrers(self, target_id: str, profile: str, field: str) -> List[Dict[str, Any]]:
+        """Indexed nodes of ``profile`` whose reference ``field`` (dotted, e.g. ``return.unit_ref``) points at ``target_id``."""
+        return self._referrers.get((target_id, profile, field), [])
@@ -0,0 +1,75 @@
+from __future__ import annotations
+from collections import deque
+from pathlib import Path
+from typing import Any, Dict, Iterable, List
+
+from hephora_common.schema import load_schemas, reference_paths
+
+
+class ProfileGraph:
+    """Which profiles a view of the model needs, from the ``children`` and reference declarations
+    in ``schemas/*.yaml``.
+
+    :meth:`closure` starts from the profiles a generator reads first (its roots) and adds their
+    children, their children's children and so on, plus the profiles their reference fields point
+    at (``sw_unit_method.parameters[].data_type`` brings in ``sw_unit_data_type``). Loading the
+    whole closure up front means no lookup during generation goes back to the source.
+    """
+
+    def __init__(self, schemas: Dict[str, Dict[str, Any]]):
+        self.children: Dict[str, List[str]] = {}
+        self.references: Dict[str, List[str]] = {}
+        for name, schema in schemas.items():
+            self.children[name] = list(dict.fromkeys(
+                c["node"] for c in (schema.get("children") or {}).values() if isinstance(c, dict) and c.get("node")
+            ))
+            self.references[name] = list(dict.fromkeys(
+                t for _, t in reference_paths(schema.get("fields") or {}) if t
+            ))
+
+    @classmethod
+    def from_schemas(cls, schemas_dir: Path) -> "ProfileGraph":
+        return cls(load_schemas(schemas_dir))
+
+    def closure(self, roots: Iterable[str], reference_hops: int = 1) -> List[str]:
+        """Profiles needed to generate from ``roots``, in dependency order.
+
+        Children are always followed; references only ``reference_hops`` deep, so a reference to
+        another part of the model loads the nodes it points at (for their labels) without pulling
+        in everything those nodes refer to in turn. Referenced profiles come before the profiles
+        referring to them (cycles, e.g. units referring to units, are broken arbitrarily).
+        """
+        hops: Dict[str, int] = {}
+        queue = deque()
+        for root in roots:
+            if root not in hops:
+                hops[root] = 0
+                queue.append(root)
+        while queue:
+            profile = queue.popleft()
+            for nxt, cost in [(c, hops[profile]) for c in self.children.get(profile, [])] + \
+                             [(r, hops[profile] + 1) for r in self.references.get(profile, [])]:
+                if cost <= reference_hops and cost < hops.get(nxt, reference_hops + 1):
+                    hops[nxt] = cost
+                    queue.append(nxt)
+        return self.order(hops)
+
+    def order(self, profiles: Iterable[str]) -> List[str]:
+        """``profiles`` with every profile after those it references (depth-first, in the given order)."""
+        wanted = list(dict.fromkeys(profiles))
+        selected = set(wanted)
+        ordered: List[str] = []
+        visiting = set()
+
+        def visit(profile: str) -> None:
+            if profile in visiting or profile in ordered:
+                return
+            visiting.add(profile)
+            for target in self.references.get(profile, []):
+                if target in selected:
+                    visit(target)
+            ordered.append(profile)
+
+        for profile in wanted:
+            visit(profile)
+        return ordered
@@ -0,0 +1,146 @@
+from __future__ import annotations
+import os
+import yaml
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+# libyaml's loader is several times faster on large trees; fall back to the pure-Python one
+_Loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+_SUMMARY_KEYS = ("id", "label", "parent", "profile")
+
+
+def node_from_yaml(doc: Dict[str, Any]) -> Dict[str, Any]:
+    """Convert a ``data/`` YAML document to the node shape served by the Hephora API.
+
+    The reserved ``_id``/``_label``/``_parent_id``/``_profile`` keys become top-level
+    ``id``/``label``/``parent``/``profile`` and all other keys move under ``fields``.
+    """
+    fields = {k: v for k, v in doc.items() if not k.startswith("_")}
+    return {
+        "id": doc.get("_id"),
+        "label": doc.get("_label"),
+        "parent": doc.get("_parent_id") or "",
+        "profile": doc.get("_profile"),
+        "fields": fields,
+    }
+
+
+class _Index(NamedTuple):
+    by_id: Dict[str, Dict[str, Any]]
+    summaries: Dict[str, Dict[str, Any]]
+    by_profile: Dict[str, List[str]]
+    by_parent: Dict[str, List[str]]
+
+
+class LocalStoreClient:
+    """Read-only Hephora client backed by the ``data/<profile>/<label>_<id8>.yaml`` tree.
+
+    The whole tree is loaded in one pass and indexed by id, by profile and by parent, so every
+    call is answered from memory. Nodes are returned in the same shape as
+    :class:`~hephora_common.client.HephoraClient`. :meth:`refresh` picks up later edits to the
+    tree, re-reading only the files that changed. Reads need no lock while another thread
+    refreshes: each one sees either the old indexes or the new ones, which are swapped in whole.
+    """
+
+    def __init__(self, data_dir: Path):
+        self.data_dir = Path(data_dir)
+        self._index = _Index({}, {}, {}, {})
+        # path -> ((mtime_ns, size), node or None for files that are not nodes)
+        self._files: Dict[Path, Tuple[Tuple[int, int], Optional[Dict[str, Any]]]] = {}
+        self.refresh()
+
+    def refresh(self) -> Tuple[Set[str], bool]:
+        """Re-read the YAML files added, changed or deleted since the last load.
+
+        Returns the ids of the affected nodes, including the old and new parents of each, and
+        whether any node was added or removed (as opposed to only edited).
+        """
+        if not self.data_dir.is_dir():
+            raise FileNotFoundError(f"Data directory not found: {self.data_dir}")
+        seen: Dict[Path, Tuple[int, int]] = {}
+        for profile_dir in os.scandir(self.data_dir):
+            if not profile_dir.is_dir():
+                continue
+            for entry in os.scandir(profile_dir.path):
+                if entry.name.endswith(".yaml") and entry.is_file():
+                    st = entry.stat()
+                    seen[Path(entry.path)] = (st.st_mtime_ns, st.st_size)
+        # Everything is parsed before anything is updated: a file caught half-written raises and
+        # leaves the store as it was, so the next refresh sees all the changes again
+        updated = {path: (stamp, self._read(path)) for path, stamp in seen.items()
+                   if path not in self._files or self._files[path][0] != stamp}
+        changed: Set[str] = set()
+        structural = False
+        for path in set(self._files) - set(seen):
+            old = self._files.pop(path)[1]
+            if old is not None:
+                changed.update((old["id"], old["parent"]))
+                structural = True
+        for path, (stamp, node) in updated.items():
+            known = self._files.get(path)
+            self._files[path] = (stamp, node)
+            old = known[1] if known is not None else None
+            for n in (old, node):
+                if n is not None:
+                    changed.update((n["id"], n["parent"]))
+            if (old is None) != (node is None) or (old is not None and node is not None and old["id"] != node["id"]):
+                structural = True
+        if changed or not self._index.by_id:
+            self._index = self._build_index()
+        changed.discard("")
+        return changed, structural
+
+    def _read(self, path: Path) -> Optional[Dict[str, Any]]:
+        with path.open("r", encoding="utf-8") as fh:
+            doc = yaml.load(fh, Loader=_Loader)
+        if not isinstance(doc, dict) or not doc.get("_id"):
+            return None
+        node = node_from_yaml(doc)
+        if not node["profile"]:
+            # Older files may omit _profile; the directory name is the profile
+            node["profile"] = path.parent.name
+        return node
+
+    def _build_index(self) -> _Index:
+        # Built in path order so listings keep the order of a fresh load
+        index = _Index({}, {}, {}, {})
+        for path in sorted(self._files):
+            node = self._files[path][1]
+            if node is None:
+                continue
+            nid = node["id"]
+            index.by_id[nid] = node
+            index.summaries[nid] = {k: node[k] for k in _SUMMARY_KEYS}
+            index.by_profile.setdefault(node["profile"], []).append(nid)
+            index.by_parent.setdefault(node["parent"], []).append(nid)
+        return index
+
+    def list_nodes(self, profile: str, full: bool = False) -> List[Dict[str, Any]]:
+        index = self._index
+        nodes = index.by_id if full else index.summaries
+        return [nodes[i] for i in index.by_profile.get(profile, [])]
+
+    def get_node(self, profile: str, node_id: str) -> Dict[str, Any]:
+        return self._get(self._index, profile, node_id)
+
+    @staticmethod
+    def _get(index: _Index, profile: str, node_id: str) -> Dict[str, Any]:
+        node = index.by_id.get(node_id)
+        if node is None or node["profile"] != profile:
+            raise KeyError(f"No {profile} node with id {node_id}")
+        return node
+
+    def get_nodes(self, profile: str, ids: Iterable[str]) -> List[Dict[str, Any]]:
+        index = self._index
+        return [self._get(index, profile, i) for i in dict.fromkeys(i for i in ids if i)]
+
+    get_nodes_concurrent = get_nodes
+
+    def list_children(self, profile: str, node_id: str) -> List[Dict[str, Any]]:
+        index = self._index
+        self._get(index, profile, node_id)
+        return [index.summaries[i] for i in index.by_parent.get(node_id, [])]
+
+    def prefetch(self, profiles: Iterable[str]) -> Dict[str, List[Dict[str, Any]]]:
+        return {p: self.list_nodes(p, full=True) for p in dict.fromkeys(profiles)}
@@ -0,0 +1,198 @@
+from __future__ import annotations
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional
+
+# Sidecar file in each output directory: sha256 of every .mmd as of its last successful render
+_CACHE_NAME = ".mermaid-cache.json"
+_DOCKER_IMAGE = "minlag/mermaid-cli"
+# mmdc inside the image, and the puppeteer config the image's own entrypoint passes to it
+_DOCKER_MMDC = ["/home/mermaidcli/node_modules/.bin/mmdc", "-p", "/puppeteer-config.json"]
+_CHROMIUM_NAMES = ("chromium", "chromium-browser", "google-chrome-stable", "google-chrome", "chromium-browser-stable")
+
+
+class RenderResult(NamedTuple):
+    name: str
+    status: str  # "rendered", "unchanged" or "failed"
+    seconds: float
+    error: str = ""
+
+
+def _digest(path: Path) -> str:
+    return hashlib.sha256(path.read_bytes()).hexdigest()
+
+
+class MermaidRenderer:
+    """Renders the ``.mmd`` files of a directory to ``.svg`` next to them.
+
+    Diagrams whose ``.mmd`` content hash matches the one recorded at their last render, and whose
+    ``.svg`` still exists, are skipped. The rest are rendered by a fixed pool of ``jobs`` workers.
+    With a local ``mmdc`` each worker runs it directly; with the Docker fallback a single
+    ``minlag/mermaid-cli`` container is started for the whole run and the workers ``docker exec``
+    into it instead of starting a container per file.
+    """
+
+    def __init__(self, jobs: Optional[int] = None, force: bool = False):
+        self.jobs = max(1, jobs or min(4, os.cpu_count() or 1))
+        self.force = force
+        self.results: List[RenderResult] = []
+
+    def render_dir(self, directory: Path) -> List[RenderResult]:
+        directory = Path(directory)
+        cache_path = directory / _CACHE_NAME
+        try:
+            cache: Dict[str, str] = json.loads(cache_path.read_text(encoding="utf-8"))
+        except (ValueError, OSError):
+            cache = {}
+
+        digests = {p.name: _digest(p) for p in sorted(directory.glob("*.mmd"))}
+        stale = []
+        results: List[RenderResult] = []
+        for name, digest in digests.items():
+            svg = directory / f"{name[:-len('.mmd')]}.svg"
+            if not self.force and cache.get(name) == digest and svg.exists():
+                results.append(RenderResult(name, "unchanged", 0.0))
+            else:
+                stale.append(directory / name)
+
+        if stale:
+            with self._backend() as render_one:
+                with ThreadPoolExecutor(max_workers=min(self.jobs, len(stale))) as pool:
+                    results.extend(pool.map(render_one, stale))
+
+        # Only successful renders are remembered; diagrams that no longer exist are forgotten
+        new_cache = {r.name: digests[r.name] for r in results if r.status != "failed"}
+        if new_cache != cache:
+            cache_path.write_text(json.dumps(new_cache, indent=1, sort_keys=True), encoding="utf-8")
+        self.results.extend(results)
+        return results
+
+    @property
+    def failed(self) -> bool:
+        """Whether any diagram failed to render."""
+        return any(r.status == "failed" for r in self.results)
+
+    def summary(self) -> str:
+        counts = {s: sum(1 for r in self.results if r.status == s) for s in ("rendered", "unchanged", "failed")}
+        seconds = sum(r.seconds for r in self.results)
+        return (f"{counts['rendered']} svg rendered ({seconds:.1f}s in total), {counts['unchanged']} unchanged, "
+                f"{counts['failed']} failed")
+
+    def report(self) -> str:
+        """One line per rendered or failed diagram, slowest first."""
+        lines = []
+        for r in sorted(self.results, key=lambda r: -r.seconds):
+            if r.status == "unchanged":
+                continue
+            lines.append(f"  {r.seconds:7.2f}s  {r.status:<8}  {r.name}" + (f": {r.error}" if r.error else ""))
+        return "\n".join(lines)
+
+    def _backend(self):
+        if shutil.which("mmdc"):
+            return _LocalMmdc()
+        if shutil.which("docker"):
+            return _DockerMmdc()
+        raise RuntimeError(
+            "Neither 'mmdc' nor 'docker' found in PATH. Please install Node (npm) and "
+            "@mermaid-js/mermaid-cli or Docker."
+        )
+
+
+def _run(name: str, cmd: List[str]) -> RenderResult:
+    start = time.perf_counter()
+    proc = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True)
+    elapsed = time.perf_counter() - start
+    if proc.returncode != 0:
+        lines = proc.stdout.strip().splitlines()
+        return RenderResult(name, "failed", elapsed, lines[-1] if lines else f"exit status {proc.returncode}")
+    return RenderResult(name, "rendered", elapsed)
+
+
+class _LocalMmdc:
+    """Context manager yielding a function that renders one file with the local ``mmdc``."""
+
+    def __enter__(self):
+        executable = os.environ.get("PUPPETEER_EXECUTABLE_PATH", "")
+        if not executable:
+            # Let Puppeteer use a system Chromium if it did not download its own
+            executable = next((shutil.which(b) for b in _CHROMIUM_NAMES if shutil.which(b)), "")
+        # Chromium refuses to start sandboxed as root, which is how the tool containers run
+        fd, self._config = tempfile.mkstemp(prefix="mermaid-puppeteer-config-", suffix=".json")
+        with os.fdopen(fd, "w") as fh:
+            json.dump({"executablePath": executable, "args": ["--no-sandbox", "--disable-setuid-sandbox"]}, fh)
+        return self._render
+
+    def __exit__(self, *exc):
+        Path(self._config).unlink(missing_ok=True)
+
+    def _render(self, mmd: Path) -> RenderResult:
+        return _run(mmd.name, ["mmdc", "-i", str(mmd), "-o", str(mmd.with_suffix(".svg")),
+                               "--puppeteerConfigFile", self._config])
+
+
+class _DockerMmdc:
+    """Context manager keeping one mermaid-cli container alive for the whole run."""
+
+    def __enter__(self):
+        self._root = Path.cwd().resolve()
+        proc = subprocess.run(
+            ["docker", "run", "-d", "--rm", "-v", f"{self._root}:/data", "--entrypoint", "sh",
+             _DOCKER_IMAGE, "-c", "sleep infinity"],
+            stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True,
+        )
+        if proc.returncode != 0:
+            # Typically the daemon is not running or the image cannot be pulled
+            lines = proc.stderr.strip().splitlines()
+            raise RuntimeError(
+                f"Could not start a {_DOCKER_IMAGE} container (docker exited with status {proc.returncode}"
+                + (f": {lines[-1]}" if lines else "") + "). Start Docker or install "
+                "@mermaid-js/mermaid-cli."
+            )
+        self._container = proc.stdout.strip()
+        return self._render
+
+    def __exit__(self, *exc):
+        subprocess.run(["docker", "rm", "-f", self._container], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+    def _render(self, mmd: Path) -> RenderResult:
+        # The workspace is mounted at /data, so files must live below the current directory
+        rel = mmd.resolve().relative_to(self._root).as_posix()
+        return _run(mmd.name, ["docker", "exec", self._container, *_DOCKER_MMDC,
+                               "-i", f"/data/{rel}", "-o", f"/data/{rel[:-len('.mmd')]}.svg"])
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Render Mermaid .mmd files to .svg, skipping unchanged diagrams")
+    parser.add_argument("dirs", nargs="+", type=Path, help="Directories holding .mmd files")
+    parser.add_argument("--jobs", type=int, default=None, help="Diagrams rendered at once (default: min(4, CPUs))")
+    parser.add_argument("--force", action="store_true", help="Render every diagram even if it did not change")
+    args = parser.parse_args(argv)
+
+    renderer = MermaidRenderer(args.jobs, args.force)
+    for directory in args.dirs:
+        if not directory.is_dir():
+            print(f"Output directory {directory} does not exist. Nothing to render.", file=sys.stderr)
+            sys.exit(1)
+        try:
+            renderer.render_dir(directory)
+        except RuntimeError as exc:
+            print(f"mermaid: {exc}", file=sys.stderr)
+            sys.exit(2)
+    if renderer.report():
+        print(renderer.report())
+    print(f"mermaid: {renderer.summary()}")
+    if renderer.failed:
+        sys.exit(3)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,186 @@
+from __future__ import annotations
+import keyword
+import re
+import sys
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Type
+
+from hephora_common.client import node_id
+from hephora_common.loader import ProfileGraph
+from hephora_common.schema import FieldPath, load_schemas, reference_paths
+
+# Dict keys of both server shapes, and the Node attribute each one maps to
+_KEYS = {
+    "id": "id", "_id": "id",
+    "label": "label", "_label": "label",
+    "parent": "parent", "_parent_id": "parent",
+    "profile": "profile", "_profile": "profile",
+}
+_MISSING = object()
+
+
+def _intern(value: Any) -> Any:
+    return sys.intern(value) if type(value) is str else value
+
+
+def _intern_refs(value: Any, path: FieldPath) -> Any:
+    """``value`` with the ids found along reference ``path`` interned; lists and dicts are updated in place."""
+    if not path:
+        return _intern(value)
+    step, rest = path[0], path[1:]
+    if step == "[]":
+        if isinstance(value, list):
+            for i, item in enumerate(value):
+                value[i] = _intern_refs(item, rest)
+    elif isinstance(value, dict) and step in value:
+        value[step] = _intern_refs(value[step], rest)
+    return value
+
+
+class Node:
+    """One Hephora node, normalized from either server shape.
+
+    Each profile gets a subclass generated from its schema (see :class:`NodeModel`) with one slot
+    per declared field, so ``method.parameters`` or ``unit.sw_component_refs`` are plain attribute
+    reads; fields absent from the node are None. Field names that are Python keywords or clash
+    with the node attributes get a trailing underscore (``method.return_``, ``data_type.fields_``).
+    Fields the schema does not declare are kept in ``extra``.
+
+    Nodes also answer the dict interface the generators were first written against
+    (``n["id"]``, ``n.get("label")``, ``n.get("_parent_id")``, ``n.get("fields")``), so code
+    reading raw dicts keeps working. ``fields`` is rebuilt on every access: use the attributes in
+    loops. Pickling a node gives its server-shape dict.
+    """
+
+    __slots__ = ("id", "label", "parent", "profile", "extra")
+    # Schema field name -> attribute name, set on each generated subclass
+    schema_attributes: Dict[str, str] = {}
+
+    @property
+    def fields(self) -> Dict[str, Any]:
+        out = {}
+        for name, attr in self.schema_attributes.items():
+            value = getattr(self, attr)
+            if value is not None:
+                out[name] = value
+        if self.extra:
+            out.update(self.extra)
+        return out
+
+    def field(self, name: str, default: Any = None) -> Any:
+        """Value of field ``name`` (declared or not), or ``default``."""
+        attr = self.schema_attributes.get(name)
+        value = getattr(self, attr) if attr is not None else (self.extra or {}).get(name)
+        return default if value is None else value
+
+    def get(self, key: str, default: Any = None) -> Any:
+        if key == "fields":
+            return self.fields
+        attr = _KEYS.get(key)
+        return default if attr is None else getattr(self, attr)
+
+    def __getitem__(self, key: str) -> Any:
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            raise KeyError(key)
+        return value
+
+    def __contains__(self, key: object) -> bool:
+        return key == "fields" or key in _KEYS
+
+    def to_dict(self) -> Dict[str, Any]:
+        """The node in the server's ``{id, label, parent, profile, fields}`` shape."""
+        return {"id": self.id, "label": self.label, "parent": self.parent, "profile": self.profile,
+                "fields": self.fields}
+
+    def __reduce__(self):
+        # Generated classes only exist where a NodeModel was built, e.g. not in render workers
+        return dict, (self.to_dict(),)
+
+    def __repr__(self) -> str:
+        return f"<{type(self).__name__} {self.id} {self.label!r}>"
+
+
+_RESERVED = set(dir(Node))
+
+
+def _attribute(name: str) -> str:
+    attr = re.sub(r"\W", "_", name)
+    if not attr or attr[0].isdigit():
+        attr = "_" + attr
+    if keyword.iskeyword(attr) or attr in _RESERVED:
+        attr += "_"
+    return attr
+
+
+def _node_type(profile: str, fields: Dict[str, Any]) -> Type[Node]:
+    attributes = {name: _attribute(name) for name in fields}
+    class_name = "".join(part.title() for part in profile.split("_")) or "Node"
+    return type(class_name, (Node,), {
+        "__slots__": tuple(attributes.values()),
+        "__module__": __name__,
+        "schema_attributes": attributes,
+    })
+
+
+class NodeModel:
+    """Node classes generated from ``schemas/*.yaml``, one per profile.
+
+    :meth:`node` turns a raw node of either server shape into an instance of its profile's class.
+    Ids, labels and profiles are interned, as are the ids held in the reference fields the schema
+    declares, so each id string is stored once however many nodes point at it. Nodes of profiles
+    without a schema get a class with no declared fields (everything lands in ``extra``).
+    ``profiles`` plans which profiles to load, from the same schemas.
+    """
+
+    def __init__(self, schemas: Dict[str, Dict[str, Any]]):
+        self.profiles = ProfileGraph(schemas)
+        self.types: Dict[str, Type[Node]] = {}
+        self._references: Dict[str, List[FieldPath]] = {}
+        for name, schema in schemas.items():
+            fields = schema.get("fields") or {}
+            self.types[name] = _node_type(name, fields)
+            self._references[name] = [p for p, _ in reference_paths(fields)]
+
+    @classmethod
+    def from_schemas(cls, schemas_dir: Path) -> "NodeModel":
+        return cls(load_schemas(schemas_dir))
+
+    def node(self, raw: Any, profile: Optional[str] = None) -> Node:
+        """Normalize ``raw``; ``profile`` is used when the body does not name its own."""
+        if isinstance(raw, Node):
+            return raw
+        fields = raw.get("fields")
+        if fields is None and "_id" in raw:
+            # Flat shape: fields sit next to the underscore keys
+            fields = {k: v for k, v in raw.items() if not k.startswith("_")}
+        fields = fields or {}
+        profile = raw.get("profile") or raw.get("_profile") or profile or ""
+        cls = self.types.get(profile)
+        if cls is None:
+            cls = self.types[profile] = _node_type(profile, {})
+            self._references[profile] = []
+        for path in self._references[profile]:
+            if path[0] in fields:
+                fields[path[0]] = _intern_refs(fields[path[0]], path[1:])
+
+        n = cls.__new__(cls)
+        n.id = _intern(node_id(raw))
+        n.label = _intern(raw.get("label") or raw.get("_label"))
+        n.parent = _intern(raw.get("parent") or raw.get("_parent_id") or "")
+        n.profile = sys.intern(profile)
+        extra: Optional[Dict[str, Any]] = None
+        attributes = cls.schema_attributes
+        for attr in attributes.values():
+            setattr(n, attr, None)
+        for name, value in fields.items():
+            attr = attributes.get(name)
+            if attr is not None:
+                setattr(n, attr, value)
+            else:
+                if extra is None:
+                    extra = {}
+                extra[name] = value
+        n.extra = extra
+        return n
+
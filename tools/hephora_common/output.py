@@ -0,0 +1,104 @@
+from __future__ import annotations
+import os
+import tempfile
+import threading
+from pathlib import Path
+from typing import Optional, Set
+
+_mode_lock = threading.Lock()
+_new_file_mode: Optional[int] = None
+
+
+def new_file_mode() -> int:
+    """Mode ``open()`` gives new files under the process umask (mkstemp always creates 0600).
+
+    Linux reports the umask in /proc. Elsewhere it can only be read by setting it, so that is
+    done once, under a lock, and the result kept: two threads doing it at once could leave the
+    process with a umask of 0.
+    """
+    global _new_file_mode
+    with _mode_lock:
+        if _new_file_mode is None:
+            umask = None
+            try:
+                with open("/proc/self/status", encoding="ascii") as fh:
+                    for line in fh:
+                        if line.startswith("Umask:"):
+                            umask = int(line.split()[1], 8)
+                            break
+            except (OSError, ValueError):
+                pass
+            if umask is None:
+                umask = os.umask(0)
+                os.umask(umask)
+            _new_file_mode = 0o666 & ~umask
+        return _new_file_mode
+
+
+class OutputFiles:
+    """Writes generated files only when their content changes.
+
+    Unchanged files (same size and bytes) are left alone so their mtimes stay put and
+    downstream tools (Sphinx, mermaid) see nothing to rebuild. Changed files are written to a
+    temporary file next to the target and renamed over it, so readers never see half a page.
+    Safe to share between threads.
+    """
+
+    def __init__(self):
+        self.written = 0
+        self.unchanged = 0
+        self.bytes_written = 0
+        self._dirs: Set[Path] = set()
+        self._lock = threading.Lock()
+
+    def write_text(self, path: Path, text: str, encoding: str = "utf-8") -> bool:
+        """Write ``text`` to ``path`` unless it already holds exactly that; return whether it was written."""
+        return self.write_bytes(path, text.encode(encoding))
+
+    def write_bytes(self, path: Path, data: bytes) -> bool:
+        if self._same_content(path, data):
+            with self._lock:
+                self.unchanged += 1
+            return False
+        self._ensure_dir(path.parent)
+        fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as fh:
+                fh.write(data)
+            os.chmod(tmp, new_file_mode())
+            os.replace(tmp, path)
+        except BaseException:
+            Path(tmp).unlink(missing_ok=True)
+            raise
+        with self._lock:
+            self.written += 1
+            self.bytes_written += len(data)
+        return True
+
+    def count(self, written: bool, nbytes: int) -> None:
+        """Account for a file written (or found unchanged) by a worker process."""
+        with self._lock:
+            if written:
+                self.written += 1
+                self.bytes_written += nbytes
+            else:
+                self.unchanged += 1
+
+    def summary(self) -> str:
+        return f"{self.written} written ({self.bytes_written} bytes), {self.unchanged} unchanged"
+
+    def _same_content(self, path: Path, data: bytes) -> bool:
+        try:
+            if os.stat(path).st_size != len(data):
+                return False
+            with open(path, "rb") as fh:
+                return fh.read() == data
+        except OSError:
+            return False
+
+    def _ensure_dir(self, directory: Path) -> None:
+        if directory in self._dirs:
+            return
+        directory.mkdir(parents=True, exist_ok=True)
+        with self._lock:
+            self._dirs.add(directory)
@@ -0,0 +1,127 @@
+from __future__ import annotations
+import json
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+# Upper bounds (ms) of the latency histogram buckets; slower samples land in the overflow bucket
+_BUCKETS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+
+def _latency_stats(samples: List[float]) -> Dict[str, Any]:
+    ordered = sorted(samples)
+    n = len(ordered)
+    hist = {f"<={b}ms": 0 for b in _BUCKETS_MS}
+    hist[f">{_BUCKETS_MS[-1]}ms"] = 0
+    for s in ordered:
+        ms = s * 1000
+        key = next((f"<={b}ms" for b in _BUCKETS_MS if ms <= b), f">{_BUCKETS_MS[-1]}ms")
+        hist[key] += 1
+    return {
+        "count": n,
+        "total_s": round(sum(ordered), 6),
+        "mean_ms": round(sum(ordered) / n * 1000, 3) if n else 0.0,
+        "p50_ms": round(ordered[n // 2] * 1000, 3) if n else 0.0,
+        "p95_ms": round(ordered[min(n - 1, int(n * 0.95))] * 1000, 3) if n else 0.0,
+        "max_ms": round(ordered[-1] * 1000, 3) if n else 0.0,
+        "histogram": {k: v for k, v in hist.items() if v},
+    }
+
+
+class RunProfile:
+    """Timings collected during one generator run.
+
+    Phases are consecutive wall-clock spans started with :meth:`phase`; each call ends the
+    previous one, so a long ``main()`` can be split into sections without re-indenting it.
+    Requests, template renders and other measured activities are kept as latency samples and
+    reported with counts, percentiles and a histogram. Safe to share between threads.
+    """
+
+    def __init__(self):
+        self._start = time.perf_counter()
+        self._phases: List[Tuple[str, float]] = []
+        self._current: Optional[Tuple[str, float]] = None
+        self._requests: Dict[Tuple[str, str], List[float]] = {}
+        self._renders: Dict[str, List[float]] = {}
+        self._timers: Dict[str, List[float]] = {}
+        self._notes: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+    def phase(self, name: str) -> None:
+        """End the running phase (if any) and start ``name``."""
+        now = time.perf_counter()
+        if self._current is not None:
+            self._phases.append((self._current[0], now - self._current[1]))
+        self._current = (name, now)
+
+    def finish(self) -> None:
+        if self._current is not None:
+            self._phases.append((self._current[0], time.perf_counter() - self._current[1]))
+            self._current = None
+
+    def record_request(self, endpoint: str, profile: Optional[str], seconds: float) -> None:
+        with self._lock:
+            self._requests.setdefault((endpoint, profile or "-"), []).append(seconds)
+
+    def record_render(self, template_name: str, seconds: float) -> None:
+        with self._lock:
+            self._renders.setdefault(template_name, []).append(seconds)
+
+    @contextmanager
+    def measure(self, name: str) -> Iterator[None]:
+        """Time the enclosed block as one sample of activity ``name`` (e.g. ``attachment copy``)."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                self._timers.setdefault(name, []).append(elapsed)
+
+    def note(self, key: str, value: Any) -> None:
+        """Attach a value computed elsewhere (output counters, cache stats) to the report."""
+        self._notes[key] = value
+
+    def report(self) -> Dict[str, Any]:
+        self.finish()
+        with self._lock:
+            return {
+                "total_s": round(time.perf_counter() - self._start, 6),
+                "phases": [{"name": n, "seconds": round(s, 6)} for n, s in self._phases],
+                "requests": [
+                    {"endpoint": e, "profile": p, **_latency_stats(v)} for (e, p), v in sorted(self._requests.items())
+                ],
+                "renders": [{"template": t, **_latency_stats(v)} for t, v in sorted(self._renders.items())],
+                "timers": [{"name": n, **_latency_stats(v)} for n, v in sorted(self._timers.items())],
+                **self._notes,
+            }
+
+    def save(self, path: Path, report: Optional[Dict[str, Any]] = None) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(report or self.report(), indent=1), encoding="utf-8")
+
+    def summary(self, report: Optional[Dict[str, Any]] = None) -> str:
+        """Human-readable digest of :meth:`report`."""
+        r = report or self.report()
+        total = r["total_s"] or 1e-9
+        lines = [f"total {r['total_s']:.3f}s", "phases:"]
+        for p in r["phases"]:
+            lines.append(f"  {p['name']:<24} {p['seconds']:8.3f}s {100 * p['seconds'] / total:5.1f}%")
+        for title, rows, key in (("requests", r["requests"], None), ("renders", r["renders"], "template"),
+                                 ("timers", r["timers"], "name")):
+            if not rows:
+                continue
+            count = sum(row["count"] for row in rows)
+            lines.append(f"{title}: {count} ({sum(row['total_s'] for row in rows):.3f}s)")
+            for row in sorted(rows, key=lambda row: -row["total_s"]):
+                label = f"{row['endpoint']} {row['profile']}" if key is None else row[key]
+                lines.append(
+                    f"  {label:<44} {row['count']:6d}  mean {row['mean_ms']:8.2f}ms"
+                    f"  p95 {row['p95_ms']:8.2f}ms  max {row['max_ms']:8.2f}ms"
+                )
+        for key, value in r.items():
+            if key not in ("total_s", "phases", "requests", "renders", "timers"):
+                lines.append(f"{key}: {json.dumps(value, sort_keys=True)}")
+        return "\n".join(lines)
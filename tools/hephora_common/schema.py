@@ -0,0 +1,35 @@
+from __future__ import annotations
+import yaml
+from pathlib import Path
+from typing import Any, Dict, Iterator, Tuple
+
+# A reference field path inside a node's ``fields``; "[]" marks "every item of this array"
+FieldPath = Tuple[str, ...]
+
+
+def reference_paths(fields: Dict[str, Any], prefix: FieldPath = ()) -> Iterator[Tuple[FieldPath, str]]:
+    """Every reference field declared in a schema ``fields`` mapping, with its target profile."""
+    for name, spec in (fields or {}).items():
+        if not isinstance(spec, dict):
+            continue
+        path = prefix + (name,)
+        ftype = spec.get("type")
+        if ftype == "reference":
+            yield path, spec.get("target")
+        elif ftype == "object":
+            yield from reference_paths(spec.get("fields"), path)
+        elif ftype == "array":
+            items = spec.get("items") or {}
+            if items.get("type") == "reference":
+                yield path + ("[]",), items.get("target")
+            elif items.get("type") == "object":
+                yield from reference_paths(items.get("fields"), path + ("[]",))
+
+
+def load_schemas(schemas_dir: Path) -> Dict[str, Dict[str, Any]]:
+    """Read ``schemas/*.yaml`` into a mapping of profile name to schema."""
+    schemas: Dict[str, Dict[str, Any]] = {}
+    for path in sorted(Path(schemas_dir).glob("*.yaml")):
+        schema = yaml.safe_load(path.read_text(encoding="utf-8")) or {}
+        schemas[schema.get("name") or path.stem] = schema
+    return schemas
@@ -0,0 +1,64 @@
+from __future__ import annotations
+import os
+import sqlite3
+import threading
+from pathlib import Path
+from typing import NamedTuple, Optional
+
+
+def default_snapshot_path() -> Path:
+    """``$HEPHORA_SNAPSHOT``, or ``nodes.sqlite`` next to the template cache under ``$XDG_CACHE_HOME/hephora``."""
+    override = os.environ.get("HEPHORA_SNAPSHOT")
+    if override:
+        return Path(override)
+    base = os.environ.get("XDG_CACHE_HOME") or str(Path.home() / ".cache")
+    return Path(base) / "hephora" / "nodes.sqlite"
+
+
+class SnapshotEntry(NamedTuple):
+    etag: Optional[str]
+    version: Optional[str]
+    body: bytes
+
+
+class SnapshotStore:
+    """Persistent copy of Hephora API responses, kept in SQLite between runs.
+
+    Entries are keyed by request (server, endpoint and JSON payload, e.g. one profile listing
+    or one node) and hold the response body together with what is needed to revalidate it:
+    the server's ``ETag`` and the server change counter current when it was stored. Safe to
+    share between threads.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(str(self.path), check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            " key TEXT PRIMARY KEY, etag TEXT, version TEXT, body BLOB NOT NULL)"
+        )
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[SnapshotEntry]:
+        with self._lock:
+            row = self._db.execute("SELECT etag, version, body FROM responses WHERE key = ?", (key,)).fetchone()
+        return SnapshotEntry(*row) if row else None
+
+    def put(self, key: str, etag: Optional[str], version: Optional[str], body: bytes) -> None:
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses (key, etag, version, body) VALUES (?, ?, ?, ?)",
+                (key, etag, version, body),
+            )
+
+    def touch(self, key: str, version: Optional[str]) -> None:
+        """Record that the entry was revalidated against server state ``version``."""
+        with self._lock:
+            self._db.execute("UPDATE responses SET version = ? WHERE key = ?", (version, key))
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
@@ -0,0 +1,57 @@
+from __future__ import annotations
+import argparse
+import os
+import sqlite3
+from pathlib import Path
+from typing import Any
+
+from hephora_common.cache import NodeCache
+from hephora_common.client import HephoraClient
+from hephora_common.local_store import LocalStoreClient
+from hephora_common.model import NodeModel
+from hephora_common.snapshot import SnapshotStore, default_snapshot_path
+
+DEFAULT_SERVER = os.environ.get("HEPHORA_API_URL", "http://http_server:8080")
+# Node schemas, relative to the repository root the tools run from
+SCHEMAS_DIR = Path("schemas")
+
+
+def add_source_args(parser: argparse.ArgumentParser) -> None:
+    """Add the options that select where a generator reads the model from."""
+    group = parser.add_mutually_exclusive_group()
+    group.add_argument(
+        "--server", default=DEFAULT_SERVER,
+        help="Hephora HTTP API base URL (default: $HEPHORA_API_URL or %(default)s)",
+    )
+    group.add_argument(
+        "--data-dir", type=Path, default=None,
+        help="Read the model offline from a data/ YAML tree instead of the Hephora server",
+    )
+    parser.add_argument(
+        "--snapshot", type=Path, default=default_snapshot_path(),
+        help="Local snapshot of server responses reused and revalidated across runs "
+             "(default: $HEPHORA_SNAPSHOT or %(default)s)",
+    )
+    parser.add_argument(
+        "--no-snapshot", action="store_true",
+        help="Download everything from the server without using or updating the snapshot",
+    )
+
+
+def open_client(args: argparse.Namespace) -> Any:
+    """Return a client for the source chosen on the command line."""
+    if args.data_dir is not None:
+        return LocalStoreClient(args.data_dir)
+    snapshot = None
+    if not args.no_snapshot:
+        try:
+            snapshot = SnapshotStore(args.snapshot)
+        except (OSError, sqlite3.Error):
+            # An unwritable cache location only costs the warm-run savings
+            snapshot = None
+    return HephoraClient(args.server, snapshot=snapshot)
+
+
+def open_cache(args: argparse.Namespace) -> NodeCache:
+    """Return a :class:`NodeCache` over the chosen source, loading nodes as schema-typed objects."""
+    return NodeCache(open_client(args), model=NodeModel.from_schemas(SCHEMAS_DIR))
@@ -0,0 +1,71 @@
+from __future__ import annotations
+import hashlib
+import json
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from hephora_common.cache import NodeCache
+from hephora_common.client import HephoraClient, node_id
+from hephora_common.local_store import LocalStoreClient
+
+# (ids of the changed nodes and of their parents, whether any node was added or removed)
+Changes = Tuple[Set[str], bool]
+
+
+def _parent(node: Dict[str, Any]) -> str:
+    return node.get("parent") or node.get("_parent_id") or ""
+
+
+class ChangeFeed:
+    """Reports which nodes of the model changed since the previous :meth:`poll`.
+
+    A ``data/`` tree is re-scanned by :meth:`LocalStoreClient.refresh`, which only re-reads the
+    YAML files whose size or mtime changed. A server is asked for its change counter
+    (``/nodes/version``) and only re-listed when it moved; a server without one is re-listed on
+    every poll, which with a snapshot costs one revalidation per profile while nothing changes.
+    Re-listed nodes are compared with the previous listing by content.
+    """
+
+    def __init__(self, source: Any, profiles: Iterable[str]):
+        self.source = source
+        self.profiles = list(dict.fromkeys(profiles))
+        self._version: Optional[str] = None
+        # node id -> (digest of its body, parent id), as of the last poll
+        self._nodes: Dict[str, Tuple[str, str]] = {}
+        if isinstance(source, HephoraClient):
+            self._version = source.refresh_version()
+            self._nodes = self._scan()
+
+    def poll(self) -> Changes:
+        if isinstance(self.source, LocalStoreClient):
+            return self.source.refresh()
+        if isinstance(self.source, HephoraClient):
+            version = self.source.refresh_version()
+            if version is not None and version == self._version:
+                return set(), False
+            self._version = version
+        nodes = self._scan()
+        changed: Set[str] = set()
+        for nid in set(nodes) | set(self._nodes):
+            old, new = self._nodes.get(nid), nodes.get(nid)
+            if old != new:
+                changed.add(nid)
+                changed.update(entry[1] for entry in (old, new) if entry is not None)
+        structural = set(nodes) != set(self._nodes)
+        self._nodes = nodes
+        changed.discard("")
+        return changed, structural
+
+    def _scan(self) -> Dict[str, Tuple[str, str]]:
+        # A fresh cache per scan, so nothing is answered from the previous listing
+        cache = NodeCache(self.source)
+        cache.prefetch(self.profiles)
+        nodes: Dict[str, Tuple[str, str]] = {}
+        for profile in self.profiles:
+            try:
+                listed: List[Dict[str, Any]] = cache.list_nodes(profile, full=True)
+            except Exception:
+                continue
+            for n in listed:
+                body = json.dumps(n, sort_keys=True, default=str).encode("utf-8")
+                nodes[node_id(n)] = (hashlib.sha256(body).hexdigest(), _parent(n))
+        return nodes
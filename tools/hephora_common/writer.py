@@ -0,0 +1,62 @@
+from __future__ import annotations
+import os
+import time
+from pathlib import Path
+from typing import Optional
+from jinja2 import BytecodeCache, Environment, FileSystemBytecodeCache, FileSystemLoader, select_autoescape
+
+from hephora_common.output import OutputFiles
+
+
+def template_cache_dir() -> Path:
+    """Directory holding compiled templates: ``$HEPHORA_TEMPLATE_CACHE`` or ``$XDG_CACHE_HOME/hephora/jinja``."""
+    override = os.environ.get("HEPHORA_TEMPLATE_CACHE")
+    if override:
+        return Path(override)
+    base = os.environ.get("XDG_CACHE_HOME") or str(Path.home() / ".cache")
+    return Path(base) / "hephora" / "jinja"
+
+
+def _bytecode_cache() -> Optional[BytecodeCache]:
+    # Jinja keys cached bytecode by template name and a checksum of its source, so an edited
+    # template is recompiled on its next load and stale entries are never used
+    directory = template_cache_dir()
+    try:
+        directory.mkdir(parents=True, exist_ok=True)
+    except OSError:
+        return None
+    return FileSystemBytecodeCache(str(directory))
+
+
+def make_environment(templates_dir: Path) -> Environment:
+    """Jinja environment shared by all generators, with compiled templates cached on disk."""
+    return Environment(
+        loader=FileSystemLoader(str(templates_dir)),
+        autoescape=select_autoescape(enabled_extensions=("j2",)),
+        # Preserve whitespace/newlines to keep RST list-table and toctree formatting stable
+        trim_blocks=False, lstrip_blocks=False,
+        bytecode_cache=_bytecode_cache(),
+    )
+
+
+class RstWriter:
+    def __init__(self, templates_dir: Path):
+        self.templates_dir = templates_dir
+        self.env = make_environment(templates_dir)
+        # Only files whose content changed are rewritten (atomically)
+        self.files = OutputFiles()
+        # Optional RunProfile receiving the render time of every page
+        self.profile = None
+
+    def render(self, template_name: str, context: dict) -> str:
+        return self.env.get_template(template_name).render(**context)
+
+    def write(self, template_name: str, context: dict, out_path: Path) -> None:
+        start = time.perf_counter()
+        text = self.render(template_name, context)
+        if self.profile is not None:
+            self.profile.record_render(template_name, time.perf_counter() - start)
+        self.files.write_text(out_path, text)
+
+    def summary(self) -> str:
+        return self.files.summary()
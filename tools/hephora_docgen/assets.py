@@ -0,0 +1,272 @@
+from __future__ import annotations
+import errno
+import hashlib
+import os
+import shutil
+import sys
+import tempfile
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+# New files get the mode the output writer gives them; it lives in tools/hephora_common
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from hephora_common.output import new_file_mode  # noqa: E402
+
+try:
+    import fcntl
+except ImportError:  # Windows: no reflinks
+    fcntl = None
+
+try:
+    from PIL import Image
+except ImportError:  # Pillow is optional; without it no thumbnails are made
+    Image = None
+
+# ioctl(2) request cloning a whole file on copy-on-write filesystems (btrfs, XFS, bcachefs)
+_FICLONE = 0x40049409
+_HASH_CHUNK = 1 << 20
+# Raster formats Pillow can shrink; other images (SVG) are shown as they are
+THUMBNAIL_SUFFIXES = (".png", ".jpg", ".jpeg", ".gif", ".bmp", ".webp")
+
+
+def _same_stat(a: os.stat_result, b: os.stat_result) -> bool:
+    return a.st_size == b.st_size and a.st_mtime_ns == b.st_mtime_ns
+
+
+class AssetPublisher:
+    """Publishes attachment files into the docs ``_static`` tree.
+
+    A destination that already matches its source (same size and mtime, or same content) is left
+    alone. Otherwise the file is cloned (reflink), hard-linked or copied, in that order of
+    preference with ``mode="auto"``, or always copied with ``mode="copy"``. Hard links share the
+    source's inode, so only use ``auto`` when the docs tree is not edited by hand. Content is
+    hashed at most once per run, and a file published under several names is read only once:
+    later destinations link to the first one. New files appear atomically. Safe to share between
+    threads.
+
+    With ``jobs > 0`` the work runs on that many background threads: :meth:`publish` and
+    :meth:`thumbnail` only queue it, so pages keep rendering while large evidence files are
+    copied (streamed by ``shutil.copyfile``, never held in memory), and :meth:`join` waits for
+    it. Jobs for the same destination run in the order they were queued. Either way neither
+    method raises: failures are reported by :meth:`join`.
+    """
+
+    def __init__(self, mode: str = "auto", jobs: int = 0):
+        self.mode = mode
+        self.thumbnails = 0
+        self.unchanged = 0
+        self.copied = 0
+        self.linked = 0
+        self.cloned = 0
+        self.bytes_copied = 0
+        # (path, size, mtime_ns) -> sha256, so a file is hashed at most once per run
+        self._digests: Dict[Tuple[str, int, int], str] = {}
+        # sha256 -> first destination published with that content in this run
+        self._published: Dict[str, Path] = {}
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=jobs, thread_name_prefix="assets") if jobs > 0 else None
+        # Last job queued per destination, and what it was queued with
+        self._pending: Dict[Path, Tuple[Tuple, Future]] = {}
+        # Destinations that failed while publishing inline, with the error
+        self._failures: List[Tuple[Path, str]] = []
+        # Optional RunProfile timing each file published, where the work runs (not where it is queued)
+        self.profile = None
+
+    def publish(self, src: Path, dest: Path) -> None:
+        """Make ``dest`` hold the content of ``src``, doing as little I/O as possible."""
+        self._submit(dest, ("publish", src), self._publish, src, dest)
+
+    def thumbnail(self, src: Path, dest: Path, size: int) -> bool:
+        """Write a copy of image ``src`` shrunk to fit ``size`` x ``size`` pixels to ``dest``.
+
+        A ``dest`` with the source's mtime is taken as current, whatever its size: give each
+        ``size`` its own destination.
+
+        Returns False, without doing anything, if Pillow is missing or ``src`` is not a raster
+        image. If Pillow fails on the image, a copy of the full image stands in at ``dest``; it is
+        never taken as current, so a later run makes the thumbnail once it can.
+        """
+        if Image is None or src.suffix.lower() not in THUMBNAIL_SUFFIXES:
+            return False
+        self._submit(dest, ("thumbnail", src, size), self._thumbnail, src, dest, size)
+        return True
+
+    def join(self) -> List[Tuple[Path, str]]:
+        """Wait for queued work and return the destinations that failed, with the error."""
+        with self._lock:
+            pending = list(self._pending.items())
+            self._pending.clear()
+            failures, self._failures = self._failures, []
+        for dest, (_, fut) in pending:
+            exc = fut.exception()
+            if exc is not None:
+                failures.append((dest, str(exc)))
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+        # A destination published from several pages fails once per page; report it once
+        first: Dict[Path, str] = {}
+        for dest, error in failures:
+            first.setdefault(dest, error)
+        return list(first.items())
+
+    def _submit(self, dest: Path, what: Tuple, fn, *args) -> None:
+        if self._pool is None:
+            try:
+                fn(*args)
+            except Exception as exc:
+                with self._lock:
+                    self._failures.append((dest, str(exc)))
+            return
+        with self._lock:
+            prior = self._pending.get(dest)
+            if prior is not None and prior[0] == what:
+                return
+            # Earlier jobs are dequeued first, so waiting on one can never deadlock the pool
+            fut = self._pool.submit(self._after, prior[1] if prior else None, fn, *args)
+            self._pending[dest] = (what, fut)
+
+    @staticmethod
+    def _after(prior: Optional[Future], fn, *args) -> None:
+        if prior is not None:
+            prior.exception()
+        fn(*args)
+
+    def _thumbnail(self, src: Path, dest: Path, size: int) -> None:
+        src_st = os.stat(src)
+        try:
+            if os.stat(dest).st_mtime_ns == src_st.st_mtime_ns:
+                self._count("unchanged")
+                return
+        except FileNotFoundError:
+            pass
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=dest.parent, prefix=f".{dest.name}.", suffix=".tmp")
+        os.close(fd)
+        try:
+            try:
+                with Image.open(src) as im:
+                    fmt = im.format
+                    # JPEG decoding can be scaled down directly, so big captures are never fully decoded
+                    im.draft(im.mode, (size, size))
+                    im.thumbnail((size, size))
+                    im.save(tmp, format=fmt)
+                shrunk = True
+            except Exception:
+                # The page still links here: show the full image until a thumbnail can be made
+                shutil.copyfile(src, tmp)
+                shrunk = False
+            os.chmod(tmp, new_file_mode())
+            if shrunk:
+                # Same mtime as the source marks the thumbnail as current; the full-image stand-in
+                # keeps its own, so the next run tries again
+                os.utime(tmp, ns=(src_st.st_atime_ns, src_st.st_mtime_ns))
+            os.replace(tmp, dest)
+        except BaseException:
+            Path(tmp).unlink(missing_ok=True)
+            raise
+        if shrunk:
+            self._count("thumbnails")
+        else:
+            self._count("copied", src_st.st_size)
+
+    def _publish(self, src: Path, dest: Path) -> None:
+        if self.profile is None:
+            self._publish_file(src, dest)
+            return
+        with self.profile.measure("attachment copy"):
+            self._publish_file(src, dest)
+
+    def _publish_file(self, src: Path, dest: Path) -> None:
+        src_st = os.stat(src)
+        try:
+            dest_st = os.stat(dest)
+        except FileNotFoundError:
+            dest_st = None
+        if dest_st is not None and (os.path.samestat(src_st, dest_st) or _same_stat(src_st, dest_st)):
+            self._count("unchanged")
+            return
+        digest = self._digest(src, src_st)
+        if dest_st is not None and dest_st.st_size == src_st.st_size and self._digest(dest, dest_st) == digest:
+            # Same bytes, different mtime (e.g. a restored checkout): align the mtime so the next run takes the fast path
+            os.utime(dest, ns=(dest_st.st_atime_ns, src_st.st_mtime_ns))
+            self._count("unchanged")
+            self._remember(digest, dest)
+            return
+        with self._lock:
+            twin = self._published.get(digest)
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        if twin is not None and twin != dest and twin.exists():
+            # The same content is already in the docs tree, which is one filesystem: link to it
+            self._transfer(twin, os.stat(twin), dest)
+        else:
+            self._transfer(src, src_st, dest)
+        self._remember(digest, dest)
+
+    def summary(self) -> str:
+        text = (f"{self.copied + self.linked + self.cloned} attachments published "
+                f"({self.copied} copied, {self.cloned} cloned, {self.linked} linked, {self.bytes_copied} bytes), "
+                f"{self.unchanged} unchanged")
+        if self.thumbnails:
+            text += f", {self.thumbnails} thumbnails"
+        return text
+
+    def _transfer(self, src: Path, src_st: os.stat_result, dest: Path) -> None:
+        fd, tmp = tempfile.mkstemp(dir=dest.parent, prefix=f".{dest.name}.", suffix=".tmp")
+        os.close(fd)
+        try:
+            how = self._place(src, Path(tmp))
+            if how != "linked":
+                # Clones and copies keep the source mtime so unchanged files are recognised by stat alone
+                os.chmod(tmp, new_file_mode())
+                os.utime(tmp, ns=(src_st.st_atime_ns, src_st.st_mtime_ns))
+            os.replace(tmp, dest)
+        except BaseException:
+            Path(tmp).unlink(missing_ok=True)
+            raise
+        self._count(how, src_st.st_size if how == "copied" else 0)
+
+    def _place(self, src: Path, tmp: Path) -> str:
+        if self.mode == "auto":
+            if fcntl is not None:
+                try:
+                    with open(src, "rb") as fin, open(tmp, "wb") as fout:
+                        fcntl.ioctl(fout.fileno(), _FICLONE, fin.fileno())
+                    return "cloned"
+                except OSError:
+                    pass
+            try:
+                tmp.unlink()
+                os.link(src, tmp)
+                return "linked"
+            except OSError as exc:
+                if exc.errno not in (errno.EXDEV, errno.EPERM, errno.EMLINK, errno.ENOTSUP, errno.EACCES):
+                    raise
+        shutil.copyfile(src, tmp)
+        return "copied"
+
+    def _digest(self, path: Path, st: os.stat_result) -> str:
+        key = (str(path), st.st_size, st.st_mtime_ns)
+        with self._lock:
+            cached = self._digests.get(key)
+        if cached is not None:
+            return cached
+        h = hashlib.sha256()
+        with open(path, "rb") as fh:
+            for chunk in iter(lambda: fh.read(_HASH_CHUNK), b""):
+                h.update(chunk)
+        with self._lock:
+            self._digests[key] = h.hexdigest()
+        return self._digests[key]
+
+    def _remember(self, digest: str, dest: Path) -> None:
+        with self._lock:
+            self._published.setdefault(digest, dest)
+
+    def _count(self, what: str, nbytes: int = 0) -> None:
+        with self._lock:
+            setattr(self, what, getattr(self, what) + 1)
+            self.bytes_copied += nbytes
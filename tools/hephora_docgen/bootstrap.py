@@ -1,5 +1,12 @@
 from __future__ import annotations
+import sys
 from pathlib import Path
+from typing import Optional
+
+# The output writer is shared by all generators and lives in tools/hephora_common
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from hephora_common.output import OutputFiles  # noqa: E402
 
 CONF_PY = """\
 import sphinx_rtd_theme
@@ -36,7 +43,7 @@ SECTION_TPL = """\
    This section is created by bootstrap. Generators will populate it.
 """
 
-def ensure_sphinx_skeleton(source_dir: Path):
+def ensure_sphinx_skeleton(source_dir: Path, files: Optional[OutputFiles] = None):
    """Create a Sphinx source tree with common sections for the project.
 
    Structure:
@@ -45,13 +52,17 @@ def ensure_sphinx_skeleton(source_dir: Path):
      - architecture/
      - design/
      - unit_tests/
+
+   Files already holding the right content are not touched, so an unchanged skeleton does not
+   make Sphinx re-read anything.
    """
+   files = files or OutputFiles()
 
    (source_dir / "_templates").mkdir(parents=True, exist_ok=True)
 
-   # Always ensure core files exist (overwrite to keep config up to date)
-   (source_dir / "conf.py").write_text(CONF_PY, encoding="utf-8")
-   (source_dir / "index.rst").write_text(INDEX_RST, encoding="utf-8")
+   # Always ensure core files are up to date, but only write them when they differ
+   files.write_text(source_dir / "conf.py", CONF_PY)
+   files.write_text(source_dir / "index.rst", INDEX_RST)
 
    # Define sections and friendly titles
    sections = [
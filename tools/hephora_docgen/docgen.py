@@ -1,122 +1,245 @@
 
-from client import HephoraClient
+from client import HephoraClient, node_id
 from writer import RstWriter
 from bootstrap import ensure_sphinx_skeleton
+from manifest import BuildManifest
+from assets import AssetPublisher
+from sphinx_build import BUILD_DIR, build_html, sphinx_available
+from preview import PREVIEW_DIR, PREVIEW_MANIFEST_PATH, PREVIEW_TEMPLATES, PreviewWriter, preview_pages
 from pathlib import Path
-from typing import Dict, Any, List
-import shutil
+from typing import Dict, Any, Iterable, List, Optional, Set
+import argparse
+import os
+import sys
+
+# The node cache, graph index and run profile are shared by all generators and live in tools/hephora_common
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from hephora_common.cache import NodeCache  # noqa: E402
+from hephora_common.graph import GraphIndex  # noqa: E402
+from hephora_common.profiling import RunProfile  # noqa: E402
+from hephora_common.source import add_source_args, open_cache  # noqa: E402
+
+# Top profile of each section; everything below them and what they refer to is planned from the schemas
+PROFILE_ROOTS = ["sw_requirements_group", "sw_architecture", "sw_design", "sw_unit_test_strategy"]
+PROFILE_REFERENCE_HOPS = 1
+
+# Generated Sphinx sources, and the record of which nodes each page was built from
+OUT_DIR = Path("tools/hephora_docgen/docs/source")
+MANIFEST_PATH = OUT_DIR / ".docgen-manifest.json"
+# Profiles whose anchors (``dt-<unit>-<data type>``) carry their parent's label
+ANCHORED_UNDER_PARENT = ("sw_unit_data_type",)
+
+
+def affected_pages(node_ids: Iterable[str]) -> Set[str]:
+    """Pages of the last run built from any of ``node_ids``, per the build manifest (Sphinx and preview)."""
+    node_ids = list(node_ids)
+    return BuildManifest(MANIFEST_PATH, OUT_DIR).pages_for(node_ids) | preview_pages(node_ids)
+
+
+def page_nodes(graph: GraphIndex, nodes: List[Dict[str, Any]], profile: Optional[str] = None) -> List[str]:
+    """Ids a page is built from: the given nodes plus every node they reference.
+
+    A referenced data type's ``:ref:`` anchor is named after the unit owning it, so that unit is
+    included too: renaming it must re-render every page linking to its data types.
+    """
+    ids: List[str] = []
+    for n in nodes:
+        ids.append(node_id(n))
+        for target in graph.references(n, profile):
+            ids.append(target)
+            if graph.profile_of(target) in ANCHORED_UNDER_PARENT:
+                owner = graph.parent_of(target)
+                if owner:
+                    ids.append(owner)
+    return ids
+
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    """Add the docgen options (also offered by tools/generate.py)."""
+    parser.add_argument(
+        "--incremental", action="store_true",
+        help="Only re-render pages whose source nodes or template changed and delete pages of removed nodes",
+    )
+    parser.add_argument(
+        "--jobs", type=int, default=os.cpu_count() or 1,
+        help="Worker processes used to render pages (default: number of CPUs; 1 renders in-process)",
+    )
+    parser.add_argument(
+        "--attachment-mode", choices=("auto", "copy"), default="auto",
+        help="auto: reflink or hard-link attachments into _static when possible, else copy; copy: always copy",
+    )
+    parser.add_argument(
+        "--attachment-jobs", type=int, default=4,
+        help="Background threads publishing attachments while pages render (0 publishes them inline)",
+    )
+    parser.add_argument(
+        "--thumbnails", type=int, nargs="?", const=480, default=None, metavar="PX",
+        help="Show image test evidences as thumbnails of at most PX pixels (default 480) linking to the "
+             "full image; needs Pillow (tools/hephora_docgen/requirements-thumbnails.txt)",
+    )
+    output = parser.add_mutually_exclusive_group()
+    output.add_argument(
+        "--html", action="store_true",
+        help=f"Build the HTML with Sphinx afterwards, incrementally: only changed pages are read again "
+             f"(output and doctrees in {BUILD_DIR})",
+    )
+    output.add_argument(
+        "--preview", action="store_true",
+        help=f"Render the pages straight to plain HTML in {PREVIEW_DIR} instead of the Sphinx sources: "
+             f"a quick look at the model without running Sphinx",
+    )
+    parser.add_argument(
+        "--sphinx-jobs", default="auto",
+        help="Processes Sphinx reads sources with, or 'auto' for one per CPU (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--profile-run", nargs="?", const="tools/hephora_docgen/docs/docgen-profile.json", metavar="REPORT",
+        help="Time each section, request, template render and attachment copy; print a summary and "
+             "write a JSON report (default: tools/hephora_docgen/docs/docgen-profile.json)",
+    )
 
 
-def main() -> None:
-    # Standard docs path
-    out_dir = Path("tools/hephora_docgen/docs/source")
-    ensure_sphinx_skeleton(out_dir)
+def run(args: argparse.Namespace, client: NodeCache, pages: Optional[Set[str]] = None) -> int:
+    """Generate the Sphinx sources, reading the model through ``client``; returns the exit status.
 
-    client = HephoraClient("http://http_server:8080")
-    writer = RstWriter(Path("tools/hephora_docgen/templates"))
+    With ``pages`` (paths relative to the docs source dir, see :func:`affected_pages`) only those
+    pages, and pages not generated before, are rendered; the others are left as they are. The
+    run fails (status 1) when an attachment the pages link to could not be published, or when
+    ``--html`` was given and sphinx-build failed.
+    """
+    # Phase timers are always kept (they are cheap); request and render samples only with --profile-run
+    run_profile = RunProfile()
+    run_profile.phase("Load")
+
+    # Standard docs path
+    out_dir = OUT_DIR
+    if not args.preview:
+        ensure_sphinx_skeleton(out_dir)
+
+    if args.profile_run and isinstance(client.client, HephoraClient):
+        client.client.profile = run_profile
+    # Load every profile the sections read, in one parallel batch, before rendering starts
+    profiles = client.load(PROFILE_ROOTS, PROFILE_REFERENCE_HOPS)
+    # Parent/child and reverse-reference lookups for all sections, built once from the loaded nodes
+    graph = GraphIndex.from_schemas(Path("schemas"))
+    for profile in profiles:
+        try:
+            graph.add(profile, client.list_nodes(profile, full=True))
+        except Exception:
+            continue
+    # The manifest records, per generated page, its source node ids and a digest of what it was rendered from
+    if args.preview:
+        # Same pages and contexts, rendered to HTML; attachments are still published to the Sphinx sources
+        manifest = BuildManifest(PREVIEW_MANIFEST_PATH, PREVIEW_DIR)
+        writer = PreviewWriter(PREVIEW_TEMPLATES, out_dir, PREVIEW_DIR, manifest,
+                               incremental=args.incremental, jobs=args.jobs)
+    else:
+        manifest = BuildManifest(MANIFEST_PATH, out_dir)
+        writer = RstWriter(Path("tools/hephora_docgen/templates"), manifest, incremental=args.incremental,
+                           jobs=args.jobs)
+    writer.only = pages
+    if args.profile_run:
+        writer.profile = run_profile
+    # Attachments are published once by content, in the background; unchanged ones are not copied again
+    assets = AssetPublisher(args.attachment_mode, jobs=args.attachment_jobs)
+    if args.profile_run:
+        assets.profile = run_profile
 
     # -------------------- Project Overview --------------------
+    run_profile.phase("Project")
     v_models = client.list_nodes("v_model")
     assert v_models, "No v_model nodes found"
     v_model = client.get_node("v_model", v_models[0]["id"])
-    # Normalize v_model fields as server returns {label, id, fields:{description, client, version}}
-    v_fields: Dict[str, Any] = v_model.get("fields", {})
-    v_label = v_model.get("label") or v_model.get("_label", "Project Overview")
+    v_label = v_model.label or "Project Overview"
     writer.write(
         "project/index.rst.j2",
         {
             "title": v_label,
-            "description": v_fields.get("description"),
-            "client": v_fields.get("client"),
-            "version": v_fields.get("version"),
+            "description": v_model.description,
+            "client": v_model.client,
+            "version": v_model.version,
         },
         out_dir / "project" / "index.rst",
+        [node_id(v_model)],
     )
 
     # -------------------- Requirements --------------------
-    groups: List[Dict[str, Any]] = client.list_nodes("sw_requirements_group")
+    run_profile.phase("Requirements")
+    groups: List[Dict[str, Any]] = client.list_nodes("sw_requirements_group", full=True)
     group_pages: List[Dict[str, Any]] = []
 
-    # Preload all requirements (avoid many network calls if needed)
-    all_requirements: List[Dict[str, Any]] = []
-    try:
-        all_requirements = [client.get_node("sw_requirement", r["id"]) for r in client.list_nodes("sw_requirement")]
-    except Exception:
-        pass
-
-    for g in groups:
-        g_node = client.get_node("sw_requirements_group", g["id"])
-        g_fields: Dict[str, Any] = g_node.get("fields", {})
-        group_label = g_node.get("label") or g_node.get("_label", "Group")
+    for g_node in groups:
+        group_label = g_node.label or "Group"
         group_slug = group_label.replace(" ", "-")
 
-        # Filter requirements by parent id (new shape uses top-level 'parent')
+        # Requirements of this group (children by parent id)
         reqs_filtered: List[Dict[str, Any]] = []
-        for r in all_requirements:
-            parent = r.get("parent") or r.get("_parent_id")
-            if parent == g_node.get("id") or parent == g_node.get("_id"):
-                r_fields = r.get("fields", {})
-                r_label = r.get("label") or r.get("_label")
-                req_slug = (r_label or "").replace(" ", "-")
-                reqs_filtered.append({
-                    "label": r_label,
-                    "brief": r_fields.get("brief"),
-                    "slug": req_slug,
-                })
+        group_reqs = graph.children(node_id(g_node), "sw_requirement")
+        for r in group_reqs:
+            r_label = r.label
+            req_slug = (r_label or "").replace(" ", "-")
+            reqs_filtered.append({
+                "label": r_label,
+                "brief": r.brief,
+                "slug": req_slug,
+            })
 
-                # Write requirement detail page
-                writer.write(
-                    "requirements/item.rst.j2",
-                    {
-                        "label": r_label,
-                        "brief": r_fields.get("brief"),
-                        "details": r_fields.get("details"),
-                        "rationale": r_fields.get("rationale"),
-                        "acceptance_criteria": r_fields.get("acceptance_criteria"),
-                    },
-                    out_dir / "requirements" / "items" / f"{req_slug}.rst",
-                )
+            # Write requirement detail page
+            writer.write(
+                "requirements/item.rst.j2",
+                {
+                    "label": r_label,
+                    "brief": r.brief,
+                    "details": r.details,
+                    "rationale": r.rationale,
+                    "acceptance_criteria": r.acceptance_criteria,
+                },
+                out_dir / "requirements" / "items" / f"{req_slug}.rst",
+                page_nodes(graph, [r]),
+            )
 
         writer.write(
             "requirements/group.rst.j2",
             {
                 "group_label": group_label,
-                "description": g_fields.get("description"),
+                "description": g_node.description,
                 "requirements": reqs_filtered,
             },
             out_dir / "requirements" / "groups" / f"{group_slug}.rst",
+            page_nodes(graph, [g_node, *group_reqs]),
         )
 
         group_pages.append({
             "label": group_label,
             "doc_path": f"groups/{group_slug}",
-            "description": g_fields.get("description"),
+            "description": g_node.description,
         })
 
     writer.write(
         "requirements/index.rst.j2",
         {"groups": group_pages},
         out_dir / "requirements" / "index.rst",
+        page_nodes(graph, groups),
     )
     
     # -------------------- Architecture --------------------
+    run_profile.phase("Architecture")
     architectures: List[Dict[str, Any]] = client.list_nodes("sw_architecture")
     if architectures:
         arch = client.get_node("sw_architecture", architectures[0]["id"])  # single architecture for now
-        a_fields: Dict[str, Any] = arch.get("fields", {})
-        arch_label = arch.get("label") or arch.get("_label", "Software Architecture")
+        arch_label = arch.label or "Software Architecture"
 
         # Collect attachments from architecture fields (copy assets into _static/attachments)
         attachments_meta: List[Dict[str, Any]] = []
         try:
-            att_ids = a_fields.get("attachments") or []
+            att_ids = arch.attachments or []
             static_dir = out_dir / "_static" / "attachments"
             static_dir.mkdir(parents=True, exist_ok=True)
             for aid in att_ids:
                 try:
                     anode = client.get_node("attachment", aid)
-                    afields = anode.get("fields", {}) or {}
-                    src_path = (afields.get("filepath") or anode.get("filepath") or "").strip()
+                    src_path = (anode.filepath or "").strip()
                     if not src_path:
                         continue
                     # Resolve and copy file if it exists
@@ -125,17 +248,11 @@ def main() -> None:
                         src = Path.cwd() / src
                     if src.exists() and src.is_file():
                         dest = static_dir / src.name
-                        try:
-                            shutil.copyfile(src, dest)
-                        except Exception:
-                            # Best effort; if copy fails, still reference original path
-                            dest = src
+                        # Queued; a failed copy is reported, and fails the run, once all are done
+                        assets.publish(src, dest)
                         # Build path relative to architecture/index.rst (one level deeper than docs root)
-                        if dest.exists():
-                            rel_from_arch = Path("..") / "_static" / "attachments" / dest.name
-                            doc_rel = rel_from_arch.as_posix()
-                        else:
-                            doc_rel = src_path
+                        rel_from_arch = Path("..") / "_static" / "attachments" / dest.name
+                        doc_rel = rel_from_arch.as_posix()
                     else:
                         # If file not found, prefix with .. so user sees attempted path relative to architecture page
                         doc_rel = (Path("..") / src_path).as_posix() if not src_path.startswith("..") else src_path
@@ -144,7 +261,7 @@ def main() -> None:
                     attachments_meta.append({
                         "filename": src.name,
                         "doc_path": doc_rel,
-                        "description": afields.get("description") or anode.get("description"),
+                        "description": anode.description,
                         "is_image": is_image,
                     })
                 except Exception:
@@ -152,113 +269,103 @@ def main() -> None:
         except Exception:
             attachments_meta = []
 
-        # Collect components belonging to this architecture (by parent)
-        comps_raw: List[Dict[str, Any]] = []
-        try:
-            comps_raw = [client.get_node("sw_component", c["id"]) for c in client.list_nodes("sw_component")]
-        except Exception:
-            comps_raw = []
-
         # Preload interfaces and data structures for relationship resolution
         interfaces_raw: List[Dict[str, Any]] = []
         data_structures_raw: List[Dict[str, Any]] = []
         try:
-            interfaces_raw = [client.get_node("sw_interface", i["id"]) for i in client.list_nodes("sw_interface")]
+            interfaces_raw = client.list_nodes("sw_interface", full=True)
         except Exception:
             interfaces_raw = []
         try:
-            data_structures_raw = [client.get_node("sw_data_structure", d["id"]) for d in client.list_nodes("sw_data_structure")]
+            data_structures_raw = client.list_nodes("sw_data_structure", full=True)
         except Exception:
             data_structures_raw = []
-        ds_map = {d.get("id"): d for d in data_structures_raw}
+        ds_map = {d.id: d for d in data_structures_raw}
 
+        # Components belonging to this architecture (by parent)
         components = []
-        for c in comps_raw:
-            parent = c.get("parent") or c.get("_parent_id")
-            if parent == arch.get("id") or parent == arch.get("_id"):
-                c_fields = c.get("fields", {})
-                c_label = c.get("label") or c.get("_label", "Component")
-                slug = c_label.replace(" ", "-")
-                # Collect requirement labels linked to this component
-                req_ids = c_fields.get("sw_requirements") or []
-                req_links_arch: List[Dict[str, str]] = []
-                req_links_comp: List[Dict[str, str]] = []
-                for rid in req_ids:
-                    try:
-                        r = client.get_node("sw_requirement", rid)
-                        r_label = r.get("label") or r.get("_label", "")
-                        r_slug = (r_label or "").replace(" ", "-")
-                        req_links_arch.append({
-                            "label": r_label,
-                            # architecture/index.rst lives under architecture/, so use relative path to requirements/items
-                            "doc_path": f"../requirements/items/{r_slug}",
-                        })
-                        req_links_comp.append({
-                            "label": r_label,
-                            # component pages live under architecture/components/
-                            "doc_path": f"../../requirements/items/{r_slug}",
-                        })
-                    except Exception:
-                        pass
-
-                # Interfaces related to this component (provided_by / required_by reference this component)
-                provided_ifaces = []
-                required_ifaces = []
-                related_ds_set = set()
-                for iface in interfaces_raw:
-                    f_fields = iface.get("fields", {}) or {}
-                    provided_by = f_fields.get("provided_by") or []
-                    required_by = f_fields.get("required_by") or []
-                    if c.get("id") in provided_by or c.get("id") in required_by:
-                        iface_label = iface.get("label") or iface.get("_label", "Interface")
-                        # Details
-                        direction = f_fields.get("data_direction")
-                        comm = f_fields.get("communication") or {}
-                        mode = (comm or {}).get("mode")
-                        ctype = (comm or {}).get("type")
-                        # Data structures linked to interface
-                        ds_ids = f_fields.get("sw_data_structures") or []
-                        ds_labels = []
-                        for did in ds_ids:
-                            dnode = ds_map.get(did)
-                            if dnode:
-                                dlabel = dnode.get("label") or dnode.get("_label", "Data Structure")
-                                ds_labels.append(dlabel)
-                                related_ds_set.add(dlabel)
-                        iface_entry = {
-                            "label": iface_label,
-                            "direction": direction,
-                            "mode": mode,
-                            "comm_type": ctype,
-                            "data_structures": ds_labels,
-                        }
-                        if c.get("id") in provided_by:
-                            provided_ifaces.append(iface_entry)
-                        if c.get("id") in required_by:
-                            required_ifaces.append(iface_entry)
-
-                related_data_structures = [
-                    {"label": lbl}
-                    for lbl in sorted(related_ds_set)
-                ]
+        arch_components = graph.children(node_id(arch), "sw_component")
+        # Nodes each component page is built from, by component slug
+        component_nodes: Dict[str, List[Dict[str, Any]]] = {}
+        for c in arch_components:
+            c_label = c.label or "Component"
+            slug = c_label.replace(" ", "-")
+            # Collect requirement labels linked to this component
+            req_ids = c.sw_requirements or []
+            req_links_arch: List[Dict[str, str]] = []
+            req_links_comp: List[Dict[str, str]] = []
+            for rid in req_ids:
+                try:
+                    r = client.get_node("sw_requirement", rid)
+                    r_label = r.label or ""
+                    r_slug = (r_label or "").replace(" ", "-")
+                    req_links_arch.append({
+                        "label": r_label,
+                        # architecture/index.rst lives under architecture/, so use relative path to requirements/items
+                        "doc_path": f"../requirements/items/{r_slug}",
+                    })
+                    req_links_comp.append({
+                        "label": r_label,
+                        # component pages live under architecture/components/
+                        "doc_path": f"../../requirements/items/{r_slug}",
+                    })
+                except Exception:
+                    pass
 
-                components.append({
-                    "label": c_label,
-                    "slug": slug,
-                    "description": c_fields.get("description"),
-                    "requirements": req_links_arch,
-                    "requirements_for_component": req_links_comp,
-                    "provided_interfaces": provided_ifaces,
-                    "required_interfaces": required_ifaces,
-                    "data_structures": related_data_structures,
-                    "doc_path": f"components/{slug}",
-                })
+            # Interfaces related to this component (provided_by / required_by reference this component)
+            related_ds_set = set()
+
+            def iface_summary(iface: Dict[str, Any]) -> Dict[str, Any]:
+                iface_label = iface.label or "Interface"
+                # Details
+                direction = iface.data_direction
+                comm = iface.communication or {}
+                mode = comm.get("mode")
+                ctype = comm.get("type")
+                # Data structures linked to interface
+                ds_ids = iface.sw_data_structures or []
+                ds_labels = []
+                for did in ds_ids:
+                    dnode = ds_map.get(did)
+                    if dnode:
+                        dlabel = dnode.label or "Data Structure"
+                        ds_labels.append(dlabel)
+                        related_ds_set.add(dlabel)
+                return {
+                    "label": iface_label,
+                    "direction": direction,
+                    "mode": mode,
+                    "comm_type": ctype,
+                    "data_structures": ds_labels,
+                }
+
+            provided_nodes = graph.referrers(node_id(c), "sw_interface", "provided_by")
+            required_nodes = graph.referrers(node_id(c), "sw_interface", "required_by")
+            provided_ifaces = [iface_summary(i) for i in provided_nodes]
+            required_ifaces = [iface_summary(i) for i in required_nodes]
+            component_nodes[slug] = [c, *provided_nodes, *required_nodes]
+
+            related_data_structures = [
+                {"label": lbl}
+                for lbl in sorted(related_ds_set)
+            ]
+
+            components.append({
+                "label": c_label,
+                "slug": slug,
+                "description": c.description,
+                "requirements": req_links_arch,
+                "requirements_for_component": req_links_comp,
+                "provided_interfaces": provided_ifaces,
+                "required_interfaces": required_ifaces,
+                "data_structures": related_data_structures,
+                "doc_path": f"components/{slug}",
+            })
 
         # Build interface and data structure page metadata (global lists)
         interfaces_pages = []
         for iface in interfaces_raw:
-            f_fields = iface.get("fields", {}) or {}
-            iface_label = iface.get("label") or iface.get("_label", "Interface")
+            iface_label = iface.label or "Interface"
             iface_slug = (iface_label or "").replace(" ", "-")
             interfaces_pages.append({
                 "label": iface_label,
@@ -268,8 +375,7 @@ def main() -> None:
 
         data_structures_pages = []
         for ds in data_structures_raw:
-            ds_fields = ds.get("fields", {}) or {}
-            ds_label = ds.get("label") or ds.get("_label", "Data Structure")
+            ds_label = ds.label or "Data Structure"
             ds_slug = (ds_label or "").replace(" ", "-")
             data_structures_pages.append({
                 "label": ds_label,
@@ -282,13 +388,15 @@ def main() -> None:
             "architecture/index.rst.j2",
             {
                 "title": arch_label,
-                "description": a_fields.get("description"),
+                "description": arch.description,
                 "components": components,
                 "interfaces_all": interfaces_pages,
                 "data_structures_all": data_structures_pages,
                 "attachments": attachments_meta,
             },
             out_dir / "architecture" / "index.rst",
+            page_nodes(graph, [arch], "sw_architecture")
+            + page_nodes(graph, [*arch_components, *interfaces_raw, *data_structures_raw]),
         )
 
         # Write per-component detail pages
@@ -326,22 +434,22 @@ def main() -> None:
                     ],
                 },
                 out_dir / "architecture" / "components" / f"{comp['slug']}.rst",
+                page_nodes(graph, component_nodes[comp["slug"]]),
             )
 
         # Write interface detail pages
         for iface in interfaces_raw:
-            f_fields = iface.get("fields", {}) or {}
-            iface_label = iface.get("label") or iface.get("_label", "Interface")
+            iface_label = iface.label or "Interface"
             iface_slug = (iface_label or "").replace(" ", "-")
-            provided_by_ids = f_fields.get("provided_by") or []
-            required_by_ids = f_fields.get("required_by") or []
-            req_ids = f_fields.get("sw_requirements") or []
-            ds_ids = f_fields.get("sw_data_structures") or []
+            provided_by_ids = iface.provided_by or []
+            required_by_ids = iface.required_by or []
+            req_ids = iface.sw_requirements or []
+            ds_ids = iface.sw_data_structures or []
 
             def comp_entry(cid: str) -> Dict[str, str]:
                 try:
                     comp_node = client.get_node("sw_component", cid)
-                    label = comp_node.get("label") or comp_node.get("_label", "Component")
+                    label = comp_node.label or "Component"
                     slug = (label or "").replace(" ", "-")
                     return {"label": label, "doc_path": f"../components/{slug}"}
                 except Exception:
@@ -354,7 +462,7 @@ def main() -> None:
             for rid in req_ids:
                 try:
                     rnode = client.get_node("sw_requirement", rid)
-                    rlabel = rnode.get("label") or rnode.get("_label", "")
+                    rlabel = rnode.label or ""
                     rslug = (rlabel or "").replace(" ", "-")
                     requirements_entries.append({
                         "label": rlabel,
@@ -367,7 +475,7 @@ def main() -> None:
             for did in ds_ids:
                 dnode = ds_map.get(did)
                 if dnode:
-                    dlabel = dnode.get("label") or dnode.get("_label", "Data Structure")
+                    dlabel = dnode.label or "Data Structure"
                     dslug = (dlabel or "").replace(" ", "-")
                     ds_entries.append({"label": dlabel, "doc_path": f"../data_structures/{dslug}"})
 
@@ -375,25 +483,25 @@ def main() -> None:
                 "architecture/interface.rst.j2",
                 {
                     "title": iface_label,
-                    "description": f_fields.get("description"),
-                    "direction": f_fields.get("data_direction"),
-                    "mode": (f_fields.get("communication") or {}).get("mode"),
-                    "comm_type": (f_fields.get("communication") or {}).get("type"),
+                    "description": iface.description,
+                    "direction": iface.data_direction,
+                    "mode": (iface.communication or {}).get("mode"),
+                    "comm_type": (iface.communication or {}).get("type"),
                     "provided_by": provided_by,
                     "required_by": required_by,
                     "data_structures": ds_entries,
                     "requirements": requirements_entries,
                 },
                 out_dir / "architecture" / "interfaces" / f"{iface_slug}.rst",
+                page_nodes(graph, [iface]),
             )
 
         # Write data structure detail pages
         for ds in data_structures_raw:
-            ds_fields = ds.get("fields", {}) or {}
-            ds_label = ds.get("label") or ds.get("_label", "Data Structure")
+            ds_label = ds.label or "Data Structure"
             ds_slug = (ds_label or "").replace(" ", "-")
             field_entries = []
-            for f in (ds_fields.get("fields") or []):
+            for f in (ds.fields_ or []):
                 field_entries.append({
                     "name": f.get("name"),
                     "data_type": f.get("data_type"),
@@ -402,23 +510,24 @@ def main() -> None:
                 "architecture/data_structure.rst.j2",
                 {
                     "title": ds_label,
-                    "description": ds_fields.get("description"),
+                    "description": ds.description,
                     "fields": field_entries,
                 },
                 out_dir / "architecture" / "data_structures" / f"{ds_slug}.rst",
+                page_nodes(graph, [ds]),
             )
 
     # -------------------- Design (Detailed) --------------------
+    run_profile.phase("Design")
     designs: List[Dict[str, Any]] = client.list_nodes("sw_design")
     if designs:
         design = client.get_node("sw_design", designs[0]["id"])  # single design for now
-        d_fields: Dict[str, Any] = design.get("fields", {})
-        design_label = design.get("label") or design.get("_label", "Software Design")
+        design_label = design.label or "Software Design"
 
         # Gather units under design (children sw_unit)
         units_raw: List[Dict[str, Any]] = []
         try:
-            units_raw = [client.get_node("sw_unit", u["id"]) for u in client.list_nodes("sw_unit")]
+            units_raw = client.list_nodes("sw_unit", full=True)
         except Exception:
             units_raw = []
 
@@ -426,27 +535,21 @@ def main() -> None:
         units_map: Dict[str, Dict[str, str]] = {}
         for u in units_raw:
             try:
-                ulab = u.get("label") or u.get("_label") or (u.get("fields") or {}).get("name") or "Unit"
+                ulab = u.label or u.field("name") or "Unit"
                 uslug = (ulab or "").replace(" ", "-")
-                units_map[u.get("id")] = {"label": ulab, "slug": uslug, "doc_path": f"design/items/{uslug}"}
+                units_map[u.id] = {"label": ulab, "slug": uslug, "doc_path": f"design/items/{uslug}"}
             except Exception:
                 continue
 
         # Attachments for design (children attachments)
         design_attachments: List[Dict[str, Any]] = []
         try:
-            att_nodes = []
-            # We attempt to load attachments referenced directly in design's children definition.
-            # The backend may expose them via list_nodes("attachment") and filter by parent.
-            for att in client.list_nodes("attachment"):
-                parent = att.get("parent") or att.get("_parent_id")
-                if parent == design.get("id"):
-                    att_nodes.append(client.get_node("attachment", att["id"]))
+            # Attachments that are children of the design
+            att_nodes = graph.children(node_id(design), "attachment")
             static_dir = out_dir / "_static" / "design_attachments"
             static_dir.mkdir(parents=True, exist_ok=True)
             for anode in att_nodes:
-                afields = anode.get("fields", {}) or {}
-                src_path = (afields.get("filepath") or anode.get("filepath") or "").strip()
+                src_path = (anode.filepath or "").strip()
                 if not src_path:
                     continue
                 src = Path(src_path)
@@ -454,42 +557,24 @@ def main() -> None:
                     src = Path.cwd() / src
                 if src.exists() and src.is_file():
                     dest = static_dir / src.name
-                    try:
-                        shutil.copyfile(src, dest)
-                        rel_path = Path("..") / "_static" / "design_attachments" / dest.name
-                    except Exception:
-                        rel_path = Path("..") / src_path
+                    assets.publish(src, dest)
+                    rel_path = Path("..") / "_static" / "design_attachments" / dest.name
                 else:
                     rel_path = Path("..") / src_path
                 is_image = src.suffix.lower() in [".png", ".jpg", ".jpeg", ".svg", ".gif", ".bmp", ".webp"]
                 design_attachments.append({
                     "filename": src.name,
                     "doc_path": rel_path.as_posix(),
-                    "description": afields.get("description") or anode.get("description"),
+                    "description": anode.description,
                     "is_image": is_image,
                 })
         except Exception:
             design_attachments = []
 
-        # Preload unit-related subnodes for detail pages
+        # Preload unit data types for cross-unit linking (per-unit subnodes come from the graph index)
         unit_data_types_raw: List[Dict[str, Any]] = []
-        unit_methods_raw: List[Dict[str, Any]] = []
-        unit_attributes_raw: List[Dict[str, Any]] = []
-        unit_relationships_raw: List[Dict[str, Any]] = []
         try:
-            unit_data_types_raw = [client.get_node("sw_unit_data_type", n["id"]) for n in client.list_nodes("sw_unit_data_type")]
-        except Exception:
-            pass
-        try:
-            unit_methods_raw = [client.get_node("sw_unit_method", n["id"]) for n in client.list_nodes("sw_unit_method")]
-        except Exception:
-            pass
-        try:
-            unit_attributes_raw = [client.get_node("sw_unit_attribute", n["id"]) for n in client.list_nodes("sw_unit_attribute")]
-        except Exception:
-            pass
-        try:
-            unit_relationships_raw = [client.get_node("sw_unit_relationship", n["id"]) for n in client.list_nodes("sw_unit_relationship")]
+            unit_data_types_raw = client.list_nodes("sw_unit_data_type", full=True)
         except Exception:
             pass
 
@@ -497,14 +582,12 @@ def main() -> None:
         dt_map_global: Dict[str, Dict[str, str]] = {}
         for dt in unit_data_types_raw:
             try:
-                parent_u = dt.get("parent") or dt.get("_parent_id")
-                u_meta = units_map.get(parent_u) or {}
-                dtf = dt.get("fields", {}) or {}
-                dt_label = dt.get("label") or dt.get("_label") or dtf.get("name") or "DataType"
+                u_meta = units_map.get(dt.parent) or {}
+                dt_label = dt.label or dt.field("name") or "DataType"
                 dt_slug = (dt_label or "").replace(" ", "-")
                 unit_slug = u_meta.get("slug") or ""
                 anchor = f"dt-{unit_slug}-{dt_slug}" if unit_slug else f"dt-{dt_slug}"
-                dt_map_global[dt.get("id")] = {
+                dt_map_global[dt.id] = {
                     "label": dt_label,
                     "slug": dt_slug,
                     "unit_slug": unit_slug,
@@ -517,18 +600,16 @@ def main() -> None:
 
         # Index of design units
         units_summary = []
-        for u in units_raw:
-            parent = u.get("parent") or u.get("_parent_id")
-            if parent == design.get("id"):
-                u_fields = u.get("fields", {}) or {}
-                u_label = u.get("label") or u.get("_label", "Unit")
-                u_slug = (u_label or "").replace(" ", "-")
-                units_summary.append({
-                    "label": u_label,
-                    "slug": u_slug,
-                    "description": u_fields.get("description"),
-                    "doc_path": f"items/{u_slug}",
-                })
+        design_units = graph.children(node_id(design), "sw_unit")
+        for u in design_units:
+            u_label = u.label or "Unit"
+            u_slug = (u_label or "").replace(" ", "-")
+            units_summary.append({
+                "label": u_label,
+                "slug": u_slug,
+                "description": u.description,
+                "doc_path": f"items/{u_slug}",
+            })
 
         # Write design index
         def fix_description_rst(text: str | None) -> str | None:
@@ -544,129 +625,120 @@ def main() -> None:
             "design/index.rst.j2",
             {
                 "title": design_label,
-                "description": fix_description_rst(d_fields.get("description")),
+                "description": fix_description_rst(design.description),
                 "units": units_summary,
                 "attachments": design_attachments,
             },
             out_dir / "design" / "index.rst",
+            page_nodes(graph, [design, *design_units, *graph.children(node_id(design), "attachment")]),
         )
 
         # Build per-unit detail pages
-        for u in units_raw:
-            parent = u.get("parent") or u.get("_parent_id")
-            if parent != design.get("id"):
-                continue
-            u_fields = u.get("fields", {}) or {}
-            u_label = u.get("label") or u.get("_label", "Unit")
+        for u in design_units:
+            u_label = u.label or "Unit"
             u_slug = (u_label or "").replace(" ", "-")
 
             # Attributes
             attributes = []
-            for a in unit_attributes_raw:
-                if (a.get("parent") or a.get("_parent_id")) == u.get("id"):
-                    af = a.get("fields", {}) or {}
-                    # Resolve data type label and link display
-                    dt_id = af.get("data_type")
-                    dt_meta = dt_map_global.get(dt_id)
-                    dt_label = client.get_node("sw_unit_data_type", dt_id).get("label") if dt_id else None
-                    dt_display = f":ref:`{dt_meta['label']} <{dt_meta['anchor']}>`" if dt_meta else (dt_label or "-")
-                    attributes.append({
-                        "label": a.get("label") or a.get("_label") or af.get("name"),
-                        "description": af.get("description"),
-                        "data_type": dt_label,
-                        "data_type_display": dt_display,
-                        "scope": af.get("scope"),
-                    })
+            for a in graph.children(u.id, "sw_unit_attribute"):
+                # Resolve data type label and link display
+                dt_id = a.data_type
+                dt_meta = dt_map_global.get(dt_id)
+                dt_label = client.get_node("sw_unit_data_type", dt_id).label if dt_id else None
+                dt_display = f":ref:`{dt_meta['label']} <{dt_meta['anchor']}>`" if dt_meta else (dt_label or "-")
+                attributes.append({
+                    "label": a.label or a.field("name"),
+                    "description": a.description,
+                    "data_type": dt_label,
+                    "data_type_display": dt_display,
+                    "scope": a.scope,
+                })
 
             # Methods
             methods = []
-            for m in unit_methods_raw:
-                if (m.get("parent") or m.get("_parent_id")) == u.get("id"):
-                    mf = m.get("fields", {}) or {}
-                    m_label = m.get("label") or m.get("_label") or mf.get("name")
-                    params = []
-                    for p in (mf.get("parameters") or []):
-                        p_dt_id = p.get("data_type")
-                        p_dt_meta = dt_map_global.get(p_dt_id)
-                        p_dt_label = client.get_node("sw_unit_data_type", p_dt_id).get("label") if p_dt_id else None
-                        # If a unit_ref exists, try to link to that unit page
-                        p_unit_ref_id = p.get("unit_ref")
-                        p_unit_meta = units_map.get(p_unit_ref_id) if p_unit_ref_id else None
-                        p_unit_display = f":ref:`{p_unit_meta['label']} <unit-{p_unit_meta['slug']}>`" if p_unit_meta else None
-                        p_dt_display = f":ref:`{p_dt_meta['label']} <{p_dt_meta['anchor']}>`" if p_dt_meta else (p_dt_label or p_unit_display or "")
-                        params.append({
-                            "name": p.get("name"),
-                            "description": p.get("description"),
-                            "data_type": p_dt_label,
-                            "data_type_display": p_dt_display,
-                            "unit_ref": client.get_node("sw_unit", p.get("unit_ref")).get("label") if p.get("unit_ref") else None,
-                        })
-                    ret = mf.get("return") or {}
-                    ret_dt_id = ret.get("data_type") if ret else None
-                    ret_dt_meta = dt_map_global.get(ret_dt_id) if ret_dt_id else None
-                    ret_dt_label = client.get_node("sw_unit_data_type", ret_dt_id).get("label") if ret_dt_id else None
-                    ret_unit_ref_id = ret.get("unit_ref") if ret else None
-                    ret_unit_meta = units_map.get(ret_unit_ref_id) if ret_unit_ref_id else None
-                    ret_unit_display = f":ref:`{ret_unit_meta['label']} <unit-{ret_unit_meta['slug']}>`" if ret_unit_meta else None
-                    ret_dt_display = f":ref:`{ret_dt_meta['label']} <{ret_dt_meta['anchor']}>`" if ret_dt_meta else (ret_dt_label or ret_unit_display or "")
-                    methods.append({
-                        "label": m_label,
-                        "description": mf.get("description"),
-                        "scope": mf.get("scope"),
-                        "parameters": params,
-                        "return": {
-                            "description": ret.get("description"),
-                            "data_type": ret_dt_label,
-                            "data_type_display": ret_dt_display,
-                            "unit_ref": client.get_node("sw_unit", ret.get("unit_ref")).get("label") if ret.get("unit_ref") else None,
-                        } if ret else None,
+            for m in graph.children(u.id, "sw_unit_method"):
+                m_label = m.label or m.field("name")
+                params = []
+                for p in (m.parameters or []):
+                    p_dt_id = p.get("data_type")
+                    p_dt_meta = dt_map_global.get(p_dt_id)
+                    p_dt_label = client.get_node("sw_unit_data_type", p_dt_id).label if p_dt_id else None
+                    # If a unit_ref exists, try to link to that unit page
+                    p_unit_ref_id = p.get("unit_ref")
+                    p_unit_meta = units_map.get(p_unit_ref_id) if p_unit_ref_id else None
+                    p_unit_display = f":ref:`{p_unit_meta['label']} <unit-{p_unit_meta['slug']}>`" if p_unit_meta else None
+                    p_dt_display = f":ref:`{p_dt_meta['label']} <{p_dt_meta['anchor']}>`" if p_dt_meta else (p_dt_label or p_unit_display or "")
+                    params.append({
+                        "name": p.get("name"),
+                        "description": p.get("description"),
+                        "data_type": p_dt_label,
+                        "data_type_display": p_dt_display,
+                        "unit_ref": client.get_node("sw_unit", p.get("unit_ref")).label if p.get("unit_ref") else None,
                     })
+                ret = m.return_ or {}
+                ret_dt_id = ret.get("data_type") if ret else None
+                ret_dt_meta = dt_map_global.get(ret_dt_id) if ret_dt_id else None
+                ret_dt_label = client.get_node("sw_unit_data_type", ret_dt_id).label if ret_dt_id else None
+                ret_unit_ref_id = ret.get("unit_ref") if ret else None
+                ret_unit_meta = units_map.get(ret_unit_ref_id) if ret_unit_ref_id else None
+                ret_unit_display = f":ref:`{ret_unit_meta['label']} <unit-{ret_unit_meta['slug']}>`" if ret_unit_meta else None
+                ret_dt_display = f":ref:`{ret_dt_meta['label']} <{ret_dt_meta['anchor']}>`" if ret_dt_meta else (ret_dt_label or ret_unit_display or "")
+                methods.append({
+                    "label": m_label,
+                    "description": m.description,
+                    "scope": m.scope,
+                    "parameters": params,
+                    "return": {
+                        "description": ret.get("description"),
+                        "data_type": ret_dt_label,
+                        "data_type_display": ret_dt_display,
+                        "unit_ref": client.get_node("sw_unit", ret.get("unit_ref")).label if ret.get("unit_ref") else None,
+                    } if ret else None,
+                })
 
             # Data types defined under this unit
             data_types = []
-            for dt in unit_data_types_raw:
-                if (dt.get("parent") or dt.get("_parent_id")) == u.get("id"):
-                    dtf = dt.get("fields", {}) or {}
-                    dt_label = dt.get("label") or dt.get("_label") or dtf.get("name")
-                    dt_slug = (dt_label or "").replace(" ", "-")
-                    fields_list = []
-                    for f in (dtf.get("fields") or []):
-                        f_dt_id = f.get("data_type")
-                        f_dt_meta = dt_map_global.get(f_dt_id)
-                        f_dt_label = client.get_node("sw_unit_data_type", f_dt_id).get("label") if f_dt_id else None
-                        f_dt_display = f":ref:`{f_dt_meta['label']} <{f_dt_meta['anchor']}>`" if f_dt_meta else (f_dt_label or (client.get_node("sw_unit", f.get("unit_ref")).get("label") if f.get("unit_ref") else None) or "-")
-                        fields_list.append({
-                            "name": f.get("name"),
-                            "data_type": f_dt_label,
-                            "data_type_display": f_dt_display,
-                            "unit_ref": client.get_node("sw_unit", f.get("unit_ref")).get("label") if f.get("unit_ref") else None,
-                        })
-                    enum_values = []
-                    for ev in (dtf.get("enum_values") or []):
-                        enum_values.append({
-                            "name": ev.get("name"),
-                            "value": ev.get("value"),
-                            "description": ev.get("description"),
-                        })
-                    data_types.append({
-                        "label": dt_label,
-                        "slug": dt_slug,
-                        "kind": dtf.get("kind"),
-                        "alias_of": dtf.get("alias_of"),
-                        "description": dtf.get("description"),
-                        "fields": fields_list,
-                        "enum_values": enum_values,
-                        "function_pointer_parameters": dtf.get("function_pointer_parameters"),
-                        "function_pointer_return": dtf.get("function_pointer_return"),
+            for dt in graph.children(u.id, "sw_unit_data_type"):
+                dt_label = dt.label or dt.field("name")
+                dt_slug = (dt_label or "").replace(" ", "-")
+                fields_list = []
+                for f in (dt.fields_ or []):
+                    f_dt_id = f.get("data_type")
+                    f_dt_meta = dt_map_global.get(f_dt_id)
+                    f_dt_label = client.get_node("sw_unit_data_type", f_dt_id).label if f_dt_id else None
+                    f_dt_display = f":ref:`{f_dt_meta['label']} <{f_dt_meta['anchor']}>`" if f_dt_meta else (f_dt_label or (client.get_node("sw_unit", f.get("unit_ref")).label if f.get("unit_ref") else None) or "-")
+                    fields_list.append({
+                        "name": f.get("name"),
+                        "data_type": f_dt_label,
+                        "data_type_display": f_dt_display,
+                        "unit_ref": client.get_node("sw_unit", f.get("unit_ref")).label if f.get("unit_ref") else None,
+                    })
+                enum_values = []
+                for ev in (dt.enum_values or []):
+                    enum_values.append({
+                        "name": ev.get("name"),
+                        "value": ev.get("value"),
+                        "description": ev.get("description"),
                     })
+                data_types.append({
+                    "label": dt_label,
+                    "slug": dt_slug,
+                    "kind": dt.kind,
+                    "alias_of": dt.alias_of,
+                    "description": dt.description,
+                    "fields": fields_list,
+                    "enum_values": enum_values,
+                    "function_pointer_parameters": dt.function_pointer_parameters,
+                    "function_pointer_return": dt.function_pointer_return,
+                })
 
             # Interfaces provided (references) - convert to labels
-            provided_interface_ids = u_fields.get("interfaces_provided") or []
+            provided_interface_ids = u.interfaces_provided or []
             provided_interfaces = []
             for iid in provided_interface_ids:
                 try:
                     iface = client.get_node("sw_interface", iid)
-                    ilabel = iface.get("label") or iface.get("_label", "Interface")
+                    ilabel = iface.label or "Interface"
                     provided_interfaces.append({
                         "label": ilabel,
                         # from design/items/ -> up two levels to root then into architecture/interfaces/
@@ -676,12 +748,12 @@ def main() -> None:
                     pass
 
             # Components referenced
-            component_ids = u_fields.get("sw_component_refs") or []
+            component_ids = u.sw_component_refs or []
             components_refs = []
             for cid in component_ids:
                 try:
                     comp_node = client.get_node("sw_component", cid)
-                    clabel = comp_node.get("label") or comp_node.get("_label", "Component")
+                    clabel = comp_node.label or "Component"
                     components_refs.append({
                         "label": clabel,
                         # from design/items/ -> up two levels to root then into architecture/components/
@@ -693,40 +765,12 @@ def main() -> None:
             # Unit attachments
             unit_attachments = []
             try:
-                att_nodes = []
-                # Prefer listing children of the unit (more reliable than scanning all attachments)
-                try:
-                    children = client.list_children("sw_unit", u.get("id")) or []
-                except Exception:
-                    children = []
-                # Collect attachment child nodes
-                for child in children:
-                    # Some backends include 'profile' on child entries; if available, filter by it
-                    profile = child.get("profile") or child.get("_profile") or ""
-                    cid = child.get("id") or child.get("_id")
-                    if not cid:
-                        continue
-                    if profile == "attachment":
-                        try:
-                            att_nodes.append(client.get_node("attachment", cid))
-                        except Exception:
-                            continue
-                # Fallback: scan all attachments and match by parent id if no children were found
-                if not att_nodes:
-                    try:
-                        for att in client.list_nodes("attachment"):
-                            parent_att = att.get("parent") or att.get("_parent_id")
-                            if parent_att == u.get("id"):
-                                att_nodes.append(client.get_node("attachment", att["id"]))
-                    except Exception:
-                        pass
-
+                att_nodes = graph.children(u.id, "attachment")
                 static_dir = out_dir / "_static" / "unit_attachments"
                 static_dir.mkdir(parents=True, exist_ok=True)
                 for anode in att_nodes:
-                    afields = anode.get("fields", {}) or {}
-                    # Some backends may store filepath at the top level
-                    src_path = (afields.get("filepath") or anode.get("filepath") or "").strip()
+                    # Flat-shape nodes keep filepath at the top level; the node model folds it in
+                    src_path = (anode.filepath or "").strip()
                     if not src_path:
                         continue
                     src = Path(src_path)
@@ -734,20 +778,17 @@ def main() -> None:
                         src = Path.cwd() / src
                     if src.exists() and src.is_file():
                         dest = static_dir / src.name
-                        try:
-                            shutil.copyfile(src, dest)
-                            # Unit item pages live under design/items/, which is two levels below the docs root
-                            # Static assets are referenced from the docs root under _static/
-                            rel_path = Path("..") / ".." / "_static" / "unit_attachments" / dest.name
-                        except Exception:
-                            rel_path = Path("..") / ".." / src_path
+                        assets.publish(src, dest)
+                        # Unit item pages live under design/items/, which is two levels below the docs root
+                        # Static assets are referenced from the docs root under _static/
+                        rel_path = Path("..") / ".." / "_static" / "unit_attachments" / dest.name
                     else:
                         rel_path = Path("..") / ".." / src_path
                     is_image = src.suffix.lower() in [".png", ".jpg", ".jpeg", ".svg", ".gif", ".bmp", ".webp"]
                     unit_attachments.append({
                         "filename": src.name,
                         "doc_path": rel_path.as_posix(),
-                        "description": afields.get("description") or anode.get("description"),
+                        "description": anode.description,
                         "is_image": is_image,
                     })
             except Exception:
@@ -757,7 +798,7 @@ def main() -> None:
                 "design/unit.rst.j2",
                 {
                     "title": u_label,
-                    "description": u_fields.get("description"),
+                    "description": u.description,
                     "unit_slug": u_slug,
                     "attributes": attributes,
                     "methods": methods,
@@ -767,176 +808,134 @@ def main() -> None:
                     "attachments": unit_attachments,
                 },
                 out_dir / "design" / "items" / f"{u_slug}.rst",
+                page_nodes(graph, [u] + [
+                    child for profile in ("sw_unit_attribute", "sw_unit_method", "sw_unit_data_type", "attachment")
+                    for child in graph.children(node_id(u), profile)
+                ]),
             )
     
     # -------------------- Unit Tests --------------------
+    run_profile.phase("Unit Tests")
     try:
-        strategies_raw: List[Dict[str, Any]] = client.list_nodes("sw_unit_test_strategy")
+        strategies_raw: List[Dict[str, Any]] = client.list_nodes("sw_unit_test_strategy", full=True)
     except Exception:
         strategies_raw = []
 
     # Build a minimal units map for linking (independent of design section)
     units_raw_for_tests: List[Dict[str, Any]] = []
     try:
-        units_raw_for_tests = [client.get_node("sw_unit", u["id"]) for u in client.list_nodes("sw_unit")]
+        units_raw_for_tests = client.list_nodes("sw_unit", full=True)
     except Exception:
         pass
     units_map_tests: Dict[str, Dict[str, str]] = {}
     for u in units_raw_for_tests:
         try:
-            ulab = u.get("label") or u.get("_label") or (u.get("fields") or {}).get("name") or "Unit"
+            ulab = u.label or u.field("name") or "Unit"
             uslug = (ulab or "").replace(" ", "-")
-            units_map_tests[u.get("id")] = {"label": ulab, "slug": uslug, "doc_path": f"design/items/{uslug}"}
+            units_map_tests[u.id] = {"label": ulab, "slug": uslug, "doc_path": f"design/items/{uslug}"}
         except Exception:
             continue
 
     strategies_pages: List[Dict[str, Any]] = []
 
-    for s in strategies_raw:
-        try:
-            strategy = client.get_node("sw_unit_test_strategy", s["id"])
-        except Exception:
-            continue
-        s_fields = strategy.get("fields", {}) or {}
-        s_label = strategy.get("label") or strategy.get("_label") or "Unit Test Strategy"
+    for strategy in strategies_raw:
+        s_label = strategy.label or "Unit Test Strategy"
         s_slug = (s_label or "").replace(" ", "-")
 
         # Gather plans under the strategy
-        plans_nodes: List[Dict[str, Any]] = []
-        try:
-            children = client.list_children("sw_unit_test_strategy", strategy.get("id")) or []
-        except Exception:
-            children = []
-        for ch in children:
-            profile = ch.get("profile") or ch.get("_profile") or ""
-            cid = ch.get("id") or ch.get("_id")
-            if profile == "sw_unit_test_plan" and cid:
-                try:
-                    plans_nodes.append(client.get_node("sw_unit_test_plan", cid))
-                except Exception:
-                    continue
-        if not plans_nodes:
-            try:
-                for p in client.list_nodes("sw_unit_test_plan"):
-                    parent = p.get("parent") or p.get("_parent_id")
-                    if parent == strategy.get("id"):
-                        plans_nodes.append(client.get_node("sw_unit_test_plan", p["id"]))
-            except Exception:
-                pass
+        plans_nodes = graph.children(node_id(strategy), "sw_unit_test_plan")
 
         plans_render: List[Dict[str, Any]] = []
         for p in plans_nodes:
-            pf = p.get("fields", {}) or {}
-            p_label = p.get("label") or p.get("_label") or "Test Plan"
+            p_label = p.label or "Test Plan"
             p_slug = (p_label or "").replace(" ", "-")
-            p_unit_id = pf.get("sw_unit")
-            p_unit_meta = units_map_tests.get(p_unit_id)
+            p_unit_meta = units_map_tests.get(p.sw_unit)
 
             # Collect test cases and evidences
-            test_cases: List[Dict[str, Any]] = []
-            evidences_nodes: List[Dict[str, Any]] = []
-            try:
-                p_children = client.list_children("sw_unit_test_plan", p.get("id")) or []
-            except Exception:
-                p_children = []
-            for ch in p_children:
-                profile = ch.get("profile") or ch.get("_profile") or ""
-                cid = ch.get("id") or ch.get("_id")
-                if profile == "sw_unit_test_case" and cid:
-                    try:
-                        test_cases.append(client.get_node("sw_unit_test_case", cid))
-                    except Exception:
-                        continue
-                if profile == "attachment" and cid:
-                    try:
-                        evidences_nodes.append(client.get_node("attachment", cid))
-                    except Exception:
-                        continue
-            if not test_cases:
-                try:
-                    for tc in client.list_nodes("sw_unit_test_case"):
-                        parent = tc.get("parent") or tc.get("_parent_id")
-                        if parent == p.get("id"):
-                            test_cases.append(client.get_node("sw_unit_test_case", tc["id"]))
-                except Exception:
-                    pass
+            test_cases = graph.children(node_id(p), "sw_unit_test_case")
+            evidences_nodes = graph.children(node_id(p), "attachment")
 
             # Copy evidences
             evidences_meta: List[Dict[str, Any]] = []
             static_dir = out_dir / "_static" / "unit_test_evidences"
             static_dir.mkdir(parents=True, exist_ok=True)
             for anode in evidences_nodes:
-                af = anode.get("fields", {}) or {}
-                src_path = (af.get("filepath") or anode.get("filepath") or "").strip()
+                src_path = (anode.filepath or "").strip()
                 if not src_path:
                     continue
                 src = Path(src_path)
                 if not src.is_absolute():
                     src = Path.cwd() / src
+                thumb_path = None
                 if src.exists() and src.is_file():
                     dest = static_dir / src.name
-                    try:
-                        shutil.copyfile(src, dest)
-                        rel_path = Path("..") / ".." / "_static" / "unit_test_evidences" / dest.name
-                    except Exception:
-                        rel_path = Path("..") / ".." / src_path
+                    assets.publish(src, dest)
+                    rel_path = Path("..") / ".." / "_static" / "unit_test_evidences" / dest.name
+                    # Image evidences are shown as a thumbnail linking to the full capture
+                    # Thumbnails of each size have their own directory, so a new --thumbnails size is never
+                    # mistaken for the thumbnails already made at another
+                    thumb = Path("thumbs") / str(args.thumbnails) / src.name
+                    if args.thumbnails and assets.thumbnail(src, static_dir / thumb, args.thumbnails):
+                        thumb_path = (Path("..") / ".." / "_static" / "unit_test_evidences" / thumb).as_posix()
                 else:
                     rel_path = Path("..") / ".." / src_path
                 is_image = src.suffix.lower() in [".png", ".jpg", ".jpeg", ".svg", ".gif", ".bmp", ".webp"]
                 evidences_meta.append({
                     "filename": src.name,
                     "doc_path": rel_path.as_posix(),
-                    "description": af.get("description") or anode.get("description"),
+                    "thumb_path": thumb_path,
+                    "description": anode.description,
                     "is_image": is_image,
                 })
 
             # Prepare test cases for plan page and generate per-test-case pages
             tc_render: List[Dict[str, Any]] = []
             for tc in test_cases:
-                tcf = tc.get("fields", {}) or {}
-                tc_label = tc.get("label") or tc.get("_label") or "Test Case"
+                tc_label = tc.label or "Test Case"
                 tc_slug = (tc_label or "").replace(" ", "-")
                 tc_ctx = {
                     "title": tc_label,
-                    "description": tcf.get("description"),
-                    "preconditions": tcf.get("preconditions"),
-                    "steps": tcf.get("steps"),
-                    "expected_result": tcf.get("expected_result"),
-                    "status": tcf.get("status"),
+                    "description": tc.description,
+                    "preconditions": tc.preconditions,
+                    "steps": tc.steps,
+                    "expected_result": tc.expected_result,
+                    "status": tc.status,
                 }
                 # Write individual test case page
                 writer.write(
                     "unit_tests/test_case.rst.j2",
                     tc_ctx,
                     out_dir / "unit_tests" / "cases" / f"{tc_slug}.rst",
+                    page_nodes(graph, [tc]),
                 )
                 # Use path relative to the plan page (plans/ -> ../cases/)
                 tc_render.append({
                     "label": tc_label,
                     "doc_path": f"../cases/{tc_slug}",
-                    "description": tcf.get("description"),
-                    "preconditions": tcf.get("preconditions"),
-                    "steps": tcf.get("steps"),
-                    "expected_result": tcf.get("expected_result"),
-                    "status": tcf.get("status"),
+                    "description": tc.description,
+                    "preconditions": tc.preconditions,
+                    "steps": tc.steps,
+                    "expected_result": tc.expected_result,
+                    "status": tc.status,
                 })
 
             writer.write(
                 "unit_tests/plan.rst.j2",
                 {
                     "title": p_label,
-                    "description": pf.get("description"),
+                    "description": p.description,
                     "unit": ({"label": p_unit_meta.get("label"), "doc_path": f"../../{p_unit_meta.get('doc_path')}"} if p_unit_meta else None),
                     "test_cases": tc_render,
                     "evidences": evidences_meta,
                 },
                 out_dir / "unit_tests" / "plans" / f"{p_slug}.rst",
+                page_nodes(graph, [p, *test_cases, *evidences_nodes]),
             )
 
             plans_render.append({
                 "label": p_label,
                 "slug": p_slug,
-                "description": pf.get("description"),
+                "description": p.description,
                 "doc_path": f"../plans/{p_slug}",
                 "test_cases_count": len(tc_render),
                 "evidences_count": len(evidences_meta),
@@ -947,12 +946,13 @@ def main() -> None:
             "unit_tests/strategy.rst.j2",
             {
                 "title": s_label,
-                "description": s_fields.get("description"),
-                "tools": s_fields.get("tools"),
-                "environment": s_fields.get("environment"),
+                "description": strategy.description,
+                "tools": strategy.tools,
+                "environment": strategy.environment,
                 "plans": plans_render,
             },
             out_dir / "unit_tests" / "strategies" / f"{s_slug}.rst",
+            page_nodes(graph, [strategy, *plans_nodes]),
         )
 
         strategies_pages.append({"label": s_label, "slug": s_slug, "doc_path": f"strategies/{s_slug}"})
@@ -964,26 +964,60 @@ def main() -> None:
             "strategies": strategies_pages,
         },
         out_dir / "unit_tests" / "index.rst",
+        page_nodes(graph, strategies_raw),
     )
 
-    # Ensure root index references unit_tests/index
-    try:
-        root_index = out_dir / "index.rst"
-        text = root_index.read_text(encoding="utf-8")
-        if "unit_tests/index" not in text:
-            lines = text.splitlines()
-            # Append after design/index if present
-            inserted = False
-            for i, line in enumerate(lines):
-                if line.strip() == "design/index":
-                    lines.insert(i + 1, "   unit_tests/index")
-                    inserted = True
-                    break
-            if not inserted:
-                lines.append("   unit_tests/index")
-            root_index.write_text("\n".join(lines), encoding="utf-8")
-    except Exception:
-        pass
+    # Pages are queued while the sections are built; render them all now
+    run_profile.phase("Render")
+    writer.flush()
+    run_profile.phase("Attachments")
+    failures = assets.join()
+    for dest, error in failures:
+        print(f"docgen: could not publish {dest}: {error}", file=sys.stderr)
+    removed = manifest.remove_stale() if args.incremental else []
+    manifest.save()
+    print(f"docgen: {writer.summary()}, {len(removed)} stale removed, {assets.summary()}")
+    if args.preview:
+        print(f"docgen: preview in {PREVIEW_DIR / 'index.html'}")
+    status = 1 if failures else 0
+    if args.html:
+        run_profile.phase("HTML")
+        if sphinx_available():
+            try:
+                print(f"docgen: {build_html(out_dir, BUILD_DIR, args.sphinx_jobs)}")
+            except RuntimeError as exc:
+                print(f"docgen: HTML build failed: {exc}", file=sys.stderr)
+                status = 1
+        else:
+            print("docgen: --html needs Sphinx (pip install sphinx sphinx_rtd_theme); HTML not built", file=sys.stderr)
+    if args.profile_run:
+        run_profile.note("output", {
+            "written": writer.files.written, "unchanged": writer.files.unchanged,
+            "bytes_written": writer.files.bytes_written, "not_rerendered": writer.skipped,
+        })
+        run_profile.note("attachments", {
+            "copied": assets.copied, "cloned": assets.cloned, "linked": assets.linked,
+            "unchanged": assets.unchanged, "bytes_copied": assets.bytes_copied, "thumbnails": assets.thumbnails,
+        })
+        run_profile.note("cache", client.stats())
+        if isinstance(client.client, HephoraClient):
+            run_profile.note("server", {
+                "requests_sent": client.client.requests_sent, "snapshot_hits": client.client.snapshot_hits,
+            })
+        report = run_profile.report()
+        run_profile.save(Path(args.profile_run), report)
+        print(run_profile.summary(report))
+        print(f"docgen: profile report written to {args.profile_run}")
+    return status
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Generate the Sphinx sources from the Hephora model")
+    add_source_args(parser)
+    add_arguments(parser)
+    args = parser.parse_args(argv)
+    # Every section goes through the cache so each node is downloaded at most once per run
+    sys.exit(run(args, open_cache(args)))
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
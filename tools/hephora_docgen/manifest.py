@@ -0,0 +1,88 @@
+from __future__ import annotations
+import hashlib
+import json
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Set
+
+
+def _json_default(value: Any) -> Any:
+    # Typed nodes hash as their server-shape dict, anything else by its text
+    to_dict = getattr(value, "to_dict", None)
+    return to_dict() if callable(to_dict) else str(value)
+
+
+def context_digest(template_source: str, context: Dict[str, Any]) -> str:
+    """Hash of everything a page is rendered from: the template text and its context."""
+    h = hashlib.sha256()
+    h.update(template_source.encode("utf-8"))
+    h.update(b"\0")
+    h.update(json.dumps(context, sort_keys=True, default=_json_default).encode("utf-8"))
+    return h.hexdigest()
+
+
+class BuildManifest:
+    """Record of the pages generated by the previous docgen run.
+
+    For every output file (relative to the docs source dir) the manifest keeps the ids of the
+    nodes the page was built from and the digest of its template and context. A page whose
+    digest matches and which still exists on disk does not need to be rendered again; a page
+    recorded last run but not produced by this one belongs to a removed node and is stale.
+    """
+
+    def __init__(self, path: Path, root: Path):
+        self.path = path
+        self.root = root
+        self.previous: Dict[str, Dict[str, Any]] = {}
+        self.current: Dict[str, Dict[str, Any]] = {}
+        if path.exists():
+            try:
+                self.previous = json.loads(path.read_text(encoding="utf-8")).get("pages", {})
+            except (ValueError, OSError):
+                # A corrupt manifest only costs a full rebuild
+                self.previous = {}
+
+    def _key(self, out_path: Path) -> str:
+        return out_path.relative_to(self.root).as_posix()
+
+    def is_current(self, out_path: Path, digest: str) -> bool:
+        entry = self.previous.get(self._key(out_path))
+        return bool(entry) and entry.get("digest") == digest and out_path.exists()
+
+    def record(self, out_path: Path, node_ids: Iterable[str], digest: str) -> None:
+        self.current[self._key(out_path)] = {
+            "nodes": sorted({i for i in node_ids if i}),
+            "digest": digest,
+        }
+
+    def carry_over(self, out_path: Path, pages: Set[str]) -> bool:
+        """Keep last run's record of ``out_path``, unless it is one of ``pages`` or has no record.
+
+        Returns True if the page was kept, i.e. does not need to be rendered.
+        """
+        key = self._key(out_path)
+        entry = self.previous.get(key)
+        if key in pages or not entry or not out_path.exists():
+            return False
+        self.current[key] = entry
+        return True
+
+    def pages_for(self, node_ids: Iterable[str]) -> Set[str]:
+        """Pages (relative to the docs source dir) that last run built from any of ``node_ids``."""
+        wanted = set(node_ids)
+        return {k for k, entry in self.previous.items() if wanted.intersection(entry.get("nodes", ()))}
+
+    def stale_pages(self) -> List[Path]:
+        return [self.root / k for k in sorted(set(self.previous) - set(self.current))]
+
+    def remove_stale(self) -> List[Path]:
+        """Delete pages generated last run that this run did not produce."""
+        removed = []
+        for page in self.stale_pages():
+            if page.is_file():
+                page.unlink()
+                removed.append(page)
+        return removed
+
+    def save(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.path.write_text(json.dumps({"pages": self.current}, indent=1, sort_keys=True), encoding="utf-8")
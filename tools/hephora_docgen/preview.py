@@ -0,0 +1,164 @@
+from __future__ import annotations
+import functools
+import posixpath
+import re
+import sys
+from pathlib import Path, PurePosixPath
+from typing import Any, Callable, Dict, Iterable, Optional, Set, Tuple
+
+from jinja2 import Environment, pass_context
+from markupsafe import Markup, escape
+
+from manifest import BuildManifest
+from writer import RstWriter, _init_worker
+
+# The template environment is shared by all generators and lives in tools/hephora_common
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from hephora_common.writer import make_environment  # noqa: E402
+
+# Preview pages and their templates; the layout every page template extends
+PREVIEW_DIR = Path("tools/hephora_docgen/docs/preview")
+PREVIEW_MANIFEST_PATH = PREVIEW_DIR / ".preview-manifest.json"
+PREVIEW_TEMPLATES = Path("tools/hephora_docgen/preview_templates")
+LAYOUT = "_layout.html.j2"
+
+_REF = re.compile(r":ref:`([^`<]*?)\s*<([^>`]+)>`")
+
+STYLESHEET = """\
+body { font-family: system-ui, sans-serif; margin: 0; color: #222; line-height: 1.45; }
+nav { background: #2c3e50; padding: .6em 1.5em; }
+nav a { color: #fff; margin-right: 1.2em; text-decoration: none; }
+main { max-width: 72em; padding: 1em 1.5em 3em; }
+table { border-collapse: collapse; margin: .5em 0 1em; }
+th, td { border: 1px solid #ccc; padding: .3em .6em; text-align: left; vertical-align: top; }
+th { background: #f0f0f0; }
+.text { white-space: pre-line; }
+figure img { max-width: 100%; }
+"""
+
+
+def _text(text: Any) -> Markup:
+    """Free text (RST or Markdown as typed in the model), kept readable with its line breaks."""
+    if not text:
+        return Markup("")
+    return Markup('<div class="text">{}</div>').format(text)
+
+
+def _doc(doc_path: Optional[str]) -> str:
+    """URL of a page given by its Sphinx document path (relative, without suffix)."""
+    return f"{doc_path}.html" if doc_path else "#"
+
+
+@pass_context
+def _asset(ctx: Any, path: Optional[str]) -> str:
+    # Attachment paths are relative to the .rst page; the files stay in the Sphinx source tree
+    if not path or posixpath.isabs(path):
+        return path or ""
+    return posixpath.normpath(posixpath.join(ctx["page_source"], path))
+
+
+@pass_context
+def _xref(ctx: Any, text: Any) -> Markup:
+    """``text`` with its ``:ref:`label <anchor>``` roles turned into links to the anchored pages."""
+    if not text:
+        return Markup("")
+    text = str(text)
+    anchors: Dict[str, str] = ctx.environment.globals["anchors"]
+    page_dir = posixpath.dirname(ctx["page_path"])
+    out, pos = [], 0
+    for m in _REF.finditer(text):
+        out.append(escape(text[pos:m.start()]))
+        target = anchors.get(m.group(2))
+        if target is None:
+            out.append(escape(m.group(1)))
+        else:
+            href = posixpath.relpath(target, page_dir or ".")
+            out.append(Markup('<a href="{}#{}">{}</a>').format(href, m.group(2), m.group(1)))
+        pos = m.end()
+    out.append(escape(text[pos:]))
+    return Markup("").join(out)
+
+
+def make_preview_environment(templates_dir: Path, anchors: Optional[Dict[str, str]] = None) -> Environment:
+    """The docgen Jinja environment plus the filters of the HTML templates."""
+    env = make_environment(templates_dir)
+    env.filters.update(text=_text, doc=_doc, asset=_asset, xref=_xref)
+    env.globals["anchors"] = anchors if anchors is not None else {}
+    return env
+
+
+def preview_pages(node_ids: Iterable[str]) -> Set[str]:
+    """Preview pages of the last run built from any of ``node_ids``, as docs source paths (``.rst``)."""
+    pages = BuildManifest(PREVIEW_MANIFEST_PATH, PREVIEW_DIR).pages_for(node_ids)
+    return {PurePosixPath(p).with_suffix(".rst").as_posix() for p in pages}
+
+
+def _anchors(template_name: str, context: Dict[str, Any]) -> Iterable[str]:
+    """RST labels a page defines (see the ``.. _name:`` targets of its template)."""
+    if template_name == "design/unit.rst.j2":
+        unit_slug = context.get("unit_slug")
+        yield f"unit-{unit_slug}"
+        for dt in context.get("data_types") or []:
+            yield f"dt-{unit_slug}-{dt.get('slug')}" if unit_slug else f"dt-{dt.get('slug')}"
+
+
+class PreviewWriter(RstWriter):
+    """Renders the docgen pages straight to HTML, for a quick preview without Sphinx.
+
+    docgen hands it the same templates, contexts and ``.rst`` paths as the Sphinx sources; each
+    page is rendered with the HTML template of the same name (``design/unit.rst.j2`` ->
+    ``design/unit.html.j2``) to the matching ``.html`` file under ``out_dir``. Pages are always
+    queued: the ``:ref:`` labels every page defines are collected first, so cross-links are
+    resolved to the right file when the pages are rendered (in parallel, as for the Sphinx
+    sources). Attachments are linked where docgen published them, in the Sphinx source tree.
+    """
+
+    def __init__(self, templates_dir: Path, source_dir: Path, out_dir: Path, manifest: Optional[BuildManifest] = None,
+                 incremental: bool = False, jobs: int = 1):
+        super().__init__(templates_dir, manifest, incremental=incremental, jobs=jobs)
+        self.source_dir = source_dir
+        self.out_dir = out_dir
+        self.queue_all = True
+        # RST label -> page defining it, relative to out_dir
+        self.anchors: Dict[str, str] = {}
+        self.env = make_preview_environment(templates_dir, self.anchors)
+        self._only: Optional[Set[str]] = None
+
+    @property
+    def only(self) -> Optional[Set[str]]:
+        return self._only
+
+    @only.setter
+    def only(self, pages: Optional[Set[str]]) -> None:
+        # Pages are named by their docs source path; the manifest knows them by their .html name
+        self._only = None if pages is None else {PurePosixPath(p).with_suffix(".html").as_posix() for p in pages}
+
+    def write(self, template_name: str, context: dict, out_path: Path, node_ids: Iterable[str] = ()) -> None:
+        page = out_path.relative_to(self.source_dir).with_suffix(".html")
+        page_dir = page.parent.as_posix()
+        for anchor in _anchors(template_name, context):
+            self.anchors[anchor] = page.as_posix()
+        depth = len(page.parts) - 1
+        context = dict(
+            context,
+            page_path=page.as_posix(),
+            page_root="../" * depth,
+            page_source=posixpath.relpath((self.source_dir / page_dir).as_posix(), (self.out_dir / page_dir).as_posix()),
+        )
+        super().write(template_name.replace(".rst.j2", ".html.j2"), context, self.out_dir / page, node_ids)
+
+    def flush(self) -> None:
+        super().flush()
+        self.files.write_text(self.out_dir / "preview.css", STYLESHEET)
+        self.files.write_text(self.out_dir / "index.html", self.render("index.html.j2", {
+            "page_path": "index.html", "page_root": "", "page_source": "",
+        }))
+
+    def _worker_setup(self) -> Tuple[Callable, tuple]:
+        # Workers get a copy of the labels collected so far, i.e. of every page
+        return _init_worker, (self.templates_dir, functools.partial(make_preview_environment, anchors=dict(self.anchors)))
+
+    def _template_source(self, template_name: str) -> str:
+        # A change to the shared layout re-renders every page
+        return super()._template_source(LAYOUT) + super()._template_source(template_name)
@@ -0,0 +1,41 @@
+from __future__ import annotations
+import importlib.util
+import re
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Optional
+
+# HTML output and Sphinx's pickled environment, kept between runs so rebuilds are incremental
+BUILD_DIR = Path("tools/hephora_docgen/docs/build")
+
+_UPDATING = re.compile(r"updating environment: (?:\[[^\]]*\] )?(\d+) added, (\d+) changed, (\d+) removed")
+
+
+def sphinx_available() -> bool:
+    return importlib.util.find_spec("sphinx") is not None
+
+
+def build_html(source_dir: Path, build_dir: Path = BUILD_DIR, jobs: str = "auto") -> str:
+    """Build the HTML for ``source_dir`` with Sphinx and return a one-line summary.
+
+    The doctrees live in ``build_dir/doctrees`` and persist across runs, so Sphinx only reads the
+    sources whose mtime changed since the last build (the generators leave unchanged pages alone)
+    and writes the pages affected by them. Sources are read by ``jobs`` processes. Sphinx's
+    warnings go to stderr; a failed build raises RuntimeError.
+    """
+    start = time.perf_counter()
+    cmd = [
+        sys.executable, "-m", "sphinx", "-b", "html", "-j", str(jobs),
+        "-d", str(build_dir / "doctrees"), str(source_dir), str(build_dir / "html"),
+    ]
+    proc = subprocess.run(cmd, capture_output=True, text=True)
+    if proc.stderr:
+        sys.stderr.write(proc.stderr)
+    if proc.returncode != 0:
+        raise RuntimeError(f"sphinx-build exited with status {proc.returncode}")
+    updated: Optional[re.Match] = _UPDATING.search(proc.stdout)
+    sources = (f"{updated.group(2)} changed, {updated.group(1)} added, {updated.group(3)} removed sources"
+               if updated else "sources read")
+    return f"html built in {time.perf_counter() - start:.2f}s ({sources}) in {build_dir / 'html'}"
@@ -1,17 +1,109 @@
 from __future__ import annotations
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from jinja2 import Environment, FileSystemLoader, select_autoescape
-
-class RstWriter:
-    def __init__(self, templates_dir: Path):
-        self.env = Environment(
-            loader=FileSystemLoader(str(templates_dir)),
-            autoescape=select_autoescape(enabled_extensions=("j2",)),
-            # Preserve whitespace/newlines to keep RST list-table and toctree formatting stable
-            trim_blocks=False, lstrip_blocks=False,
-        )
-
-    def write(self, template_name: str, context: dict, out_path: Path) -> None:
-        out_path.parent.mkdir(parents=True, exist_ok=True)
-        tpl = self.env.get_template(template_name)
-        out_path.write_text(tpl.render(**context), encoding="utf-8")
\ No newline at end of file
+from typing import Callable, Dict, Iterable, Optional, Set, Tuple
+
+from manifest import BuildManifest, context_digest
+
+# The base template writer is shared by all generators and lives in tools/hephora_common
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from hephora_common.output import OutputFiles  # noqa: E402
+from hephora_common.writer import RstWriter as BaseRstWriter, make_environment  # noqa: E402
+
+# Below this many queued pages a process pool costs more to start than it saves
+_MIN_PARALLEL_PAGES = 64
+
+# (template name, context, output path)
+RenderJob = Tuple[str, dict, Path]
+
+# Per-process state of render workers, set up once by _init_worker
+_worker_env = None
+_worker_files: Optional[OutputFiles] = None
+
+
+def _init_worker(templates_dir: Path, environment: Callable = make_environment) -> None:
+    global _worker_env, _worker_files
+    # Workers load compiled templates from the shared bytecode cache instead of recompiling
+    _worker_env = environment(templates_dir)
+    _worker_files = OutputFiles()
+
+
+def _render_job(job: RenderJob) -> Tuple[bool, int, float]:
+    template_name, context, out_path = job
+    start = time.perf_counter()
+    data = _worker_env.get_template(template_name).render(**context).encode("utf-8")
+    elapsed = time.perf_counter() - start
+    return _worker_files.write_bytes(out_path, data), len(data), elapsed
+
+
+class RstWriter(BaseRstWriter):
+    def __init__(self, templates_dir: Path, manifest: Optional[BuildManifest] = None, incremental: bool = False,
+                 jobs: int = 1):
+        super().__init__(templates_dir)
+        # With a manifest every page is recorded; in incremental mode unchanged pages are skipped
+        self.manifest = manifest
+        self.incremental = incremental
+        self.skipped = 0
+        # Pages (relative to the manifest root) to consider; others recorded last run are kept as they are
+        self.only: Optional[Set[str]] = None
+        # With jobs > 1 pages are queued by write() and rendered in parallel by flush()
+        self.jobs = max(1, jobs)
+        # Queue pages even with jobs == 1, for writers that need to see every page before rendering one
+        self.queue_all = False
+        self._queue: Dict[Path, RenderJob] = {}
+        self._template_sources: Dict[str, str] = {}
+
+    def write(self, template_name: str, context: dict, out_path: Path, node_ids: Iterable[str] = ()) -> None:
+        digest = None
+        if self.manifest is not None and self.only is not None and self.manifest.carry_over(out_path, self.only):
+            self.skipped += 1
+            return
+        if self.manifest is not None:
+            digest = context_digest(self._template_source(template_name), context)
+            if self.incremental and self.manifest.is_current(out_path, digest):
+                self.manifest.record(out_path, node_ids, digest)
+                self.skipped += 1
+                return
+            self.manifest.record(out_path, node_ids, digest)
+        if self.jobs > 1 or self.queue_all:
+            # Keyed by path: if two pages map to the same file the later one wins, as in a serial run
+            self._queue.pop(out_path, None)
+            self._queue[out_path] = (template_name, context, out_path)
+            return
+        super().write(template_name, context, out_path)
+
+    def flush(self) -> None:
+        """Render and write all queued pages, across ``jobs`` worker processes when worthwhile."""
+        queued = list(self._queue.values())
+        self._queue.clear()
+        if len(queued) < _MIN_PARALLEL_PAGES or self.jobs == 1:
+            for template_name, context, out_path in queued:
+                super().write(template_name, context, out_path)
+            return
+        workers = min(self.jobs, len(queued))
+        initializer, initargs = self._worker_setup()
+        with ProcessPoolExecutor(max_workers=workers, initializer=initializer, initargs=initargs) as pool:
+            chunksize = max(1, len(queued) // (workers * 4))
+            for (template_name, _, _), (written, nbytes, elapsed) in zip(
+                    queued, pool.map(_render_job, queued, chunksize=chunksize)):
+                self.files.count(written, nbytes)
+                if self.profile is not None:
+                    self.profile.record_render(template_name, elapsed)
+
+    def _worker_setup(self) -> Tuple[Callable, tuple]:
+        """Initializer of the render worker processes, and its arguments."""
+        return _init_worker, (self.templates_dir,)
+
+    def summary(self) -> str:
+        text = super().summary()
+        if self.incremental:
+            text += f", {self.skipped} not re-rendered"
+        return text
+
+    def _template_source(self, template_name: str) -> str:
+        if template_name not in self._template_sources:
+            self._template_sources[template_name] = self.env.loader.get_source(self.env, template_name)[0]
+        return self._template_sources[template_name]
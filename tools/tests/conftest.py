@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# The shared modules are imported as hephora_common.*, as the generators' client shims do
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
@@ -0,0 +1,70 @@
+import os
+
+import pytest
+
+from generate import Generator
+
+Image = pytest.importorskip("PIL.Image")
+
+
+@pytest.fixture(scope="module")
+def assets():
+    return Generator("hephora_docgen", "assets").module
+
+
+def test_thumbnail_is_made_once_and_then_taken_as_current(assets, tmp_path):
+    src = tmp_path / "capture.png"
+    Image.new("RGB", (800, 600)).save(src)
+    dest = tmp_path / "thumbs" / "200" / "capture.png"
+
+    publisher = assets.AssetPublisher()
+    assert publisher.thumbnail(src, dest, 200)
+    assert publisher.join() == []
+    with Image.open(dest) as im:
+        assert im.size == (200, 150)
+
+    again = assets.AssetPublisher()
+    again.thumbnail(src, dest, 200)
+    again.join()
+    assert (again.thumbnails, again.unchanged) == (0, 1)
+
+
+def test_failed_thumbnail_stands_in_full_image_until_one_can_be_made(assets, tmp_path):
+    src = tmp_path / "capture.png"
+    src.write_bytes(b"not a png yet")
+    dest = tmp_path / "thumbs" / "200" / "capture.png"
+
+    publisher = assets.AssetPublisher(jobs=2)
+    assert publisher.thumbnail(src, dest, 200)
+    assert publisher.join() == []
+    assert dest.read_bytes() == b"not a png yet"
+    assert os.stat(dest).st_mtime_ns != os.stat(src).st_mtime_ns
+    assert (publisher.thumbnails, publisher.copied) == (0, 1)
+
+    # The stand-in is not mistaken for a current thumbnail once the image can be shrunk
+    mtime = os.stat(src).st_mtime_ns
+    Image.new("RGB", (800, 600)).save(src)
+    os.utime(src, ns=(mtime, mtime))
+    retry = assets.AssetPublisher()
+    retry.thumbnail(src, dest, 200)
+    retry.join()
+    assert retry.thumbnails == 1
+    with Image.open(dest) as im:
+        assert im.size == (200, 150)
+
+
+def test_publish_skips_destinations_already_current(assets, tmp_path):
+    src = tmp_path / "report.txt"
+    src.write_text("evidence", encoding="utf-8")
+    dest = tmp_path / "_static" / "report.txt"
+
+    first = assets.AssetPublisher("copy")
+    first.publish(src, dest)
+    assert first.join() == []
+    assert (first.copied, first.bytes_copied) == (1, 8)
+
+    second = assets.AssetPublisher("copy", jobs=2)
+    second.publish(src, dest)
+    assert second.join() == []
+    assert (second.copied, second.unchanged) == (0, 1)
+    assert dest.read_text(encoding="utf-8") == "evidence"
@@ -0,0 +1,67 @@
+from pathlib import Path
+
+import pytest
+
+from generate import Generator
+from hephora_common.cache import NodeCache
+from hephora_common.model import NodeModel
+
+REPO = Path(__file__).resolve().parents[2]
+
+NODES = {
+    "sw_unit": [{"id": "u1", "label": "Motor", "parent": "d1", "fields": {}}],
+    "sw_unit_attribute": [
+        {"id": "a1", "label": "speed", "parent": "u1", "fields": {"data_type": "t1", "scope": "private"}},
+        {"id": "a2", "label": "limit", "parent": "u1", "fields": {"data_type": "gone", "scope": "public"}},
+    ],
+    "sw_unit_method": [{"id": "m1", "label": "start", "parent": "u1", "fields": {}}],
+    "sw_unit_relationship": [],
+    "sw_unit_data_type": [{"id": "t1", "label": "Rpm", "parent": "u1", "fields": {"kind": "alias"}}],
+}
+
+
+class FakeClient:
+    """Serves NODES; listing a profile in ``broken`` fails like an unreachable server."""
+
+    def __init__(self, broken=()):
+        self.broken = set(broken)
+
+    def list_nodes(self, profile, full=False):
+        if profile in self.broken:
+            raise ConnectionError(f"listing {profile} timed out")
+        return [dict(n, profile=profile) for n in NODES.get(profile, [])]
+
+    def get_node(self, profile, node_id):
+        for n in self.list_nodes(profile):
+            if n["id"] == node_id:
+                return n
+        raise KeyError(node_id)
+
+
+@pytest.fixture(scope="module")
+def generator():
+    return Generator("class_diagrams_generator", "class_diagrams_generator").module
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    monkeypatch.chdir(REPO)
+    return lambda client: NodeCache(client, model=NodeModel.from_schemas(Path("schemas")))
+
+
+def test_resolver_labels_types_from_the_unit_index(generator, cache):
+    client = cache(FakeClient())
+    resolver = generator.UnitResolver(client, generator.unit_index(client))
+    unit = resolver.unit("u1")
+    # A data type that cannot be fetched is shown by its id
+    assert [(a["name"], a["type"]) for a in unit["attributes"]] == [("speed", "Rpm"), ("limit", "gone")]
+    assert [m["name"] for m in unit["methods"]] == ["start"]
+
+
+def test_unit_index_skips_a_profile_that_cannot_be_listed(generator, cache, capsys):
+    client = cache(FakeClient(broken={"sw_unit_method"}))
+    resolver = generator.UnitResolver(client, generator.unit_index(client))
+    unit = resolver.unit("u1")
+    assert [a["name"] for a in unit["attributes"]] == ["speed", "limit"]
+    assert unit["methods"] == []
+    assert "could not list sw_unit_method nodes, skipped: listing sw_unit_method timed out" in capsys.readouterr().err
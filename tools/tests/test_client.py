@@ -0,0 +1,47 @@
+import json
+
+import pytest
+import requests
+
+from hephora_common.client import HephoraClient
+
+UNITS = [f"u{i}" for i in range(6)]
+
+
+class FlakyServer(HephoraClient):
+    """Lists summaries only; fetching ``broken`` fails, alone or in any batch containing it."""
+
+    def __init__(self, broken, **kwargs):
+        super().__init__("http://hephora.invalid", **kwargs)
+        self.broken = set(broken)
+        self.sent = []
+
+    def _send(self, path, payload, headers=None):
+        self.sent.append((path, payload.get("id") or payload.get("ids")))
+        if path == "/nodes/list":
+            return self._reply(200, {"nodes": [{"id": i, "label": i} for i in UNITS]})
+        ids = payload["ids"] if path == "/nodes/batch" else [payload["id"]]
+        if self.broken & set(ids):
+            return self._reply(500, {"error": "backend timeout"})
+        nodes = [{"id": i, "label": i, "fields": {}} for i in ids]
+        return self._reply(200, {"nodes": nodes} if path == "/nodes/batch" else {"node": nodes[0]})
+
+    @staticmethod
+    def _reply(status, body):
+        r = requests.Response()
+        r.status_code = status
+        r._content = json.dumps(body).encode()
+        return r
+
+
+def test_failed_batch_drops_only_the_nodes_that_cannot_be_fetched():
+    client = FlakyServer(broken={"u3"}, batch_size=2)
+    assert [n["id"] for n in client.list_nodes("sw_unit", full=True)] == ["u0", "u1", "u2", "u4", "u5"]
+    # Only the batch holding u3 is fetched again, one node at a time
+    assert sorted(i for path, i in client.sent if path == "/nodes") == ["u2", "u3"]
+
+
+def test_get_nodes_still_raises_for_a_node_that_cannot_be_fetched():
+    client = FlakyServer(broken={"u3"}, batch_size=2)
+    with pytest.raises(requests.HTTPError):
+        client.get_nodes("sw_unit", ["u2", "u3"])
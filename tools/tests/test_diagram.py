@@ -0,0 +1,93 @@
+import itertools
+import xml.etree.ElementTree as ET
+
+from hephora_common.diagram import Diagram, SvgRenderer, block_diagram, class_diagram
+
+
+def overlaps(a, b):
+    return abs(a.x - b.x) * 2 < a.width + b.width and abs(a.y - b.y) * 2 < a.height + b.height
+
+
+def on_border(box, point):
+    x, y = point
+    return (abs(abs(x - box.x) - box.width / 2) < 0.5 and abs(y - box.y) <= box.height / 2 + 0.5) or \
+        (abs(abs(y - box.y) - box.height / 2) < 0.5 and abs(x - box.x) <= box.width / 2 + 0.5)
+
+
+def test_layers_run_from_sources_to_targets_with_supertypes_on_top():
+    d = Diagram("TB")
+    for name in ("Controller", "Motor", "Sensor", "Device"):
+        d.add_box(name, name, [["+int id"], ["+start()"]])
+    d.add_edge("Controller", "Motor", "association")
+    d.add_edge("Controller", "Sensor", "dependency")
+    d.add_edge("Motor", "Device", "generalization")
+    d.layout()
+    b = d.boxes
+    assert b["Controller"].y < b["Motor"].y
+    assert b["Controller"].y < b["Sensor"].y
+    assert b["Device"].y < b["Motor"].y
+    assert not any(overlaps(x, y) for x, y in itertools.combinations(b.values(), 2))
+
+
+def test_edges_end_on_box_borders_and_long_edges_bend():
+    d = Diagram("TB")
+    for name in "ABC":
+        d.add_box(name, name)
+    d.add_edge("A", "B", "association")
+    d.add_edge("B", "C", "association")
+    d.add_edge("A", "C", "dependency")
+    d.layout()
+    for e in d.edges:
+        assert on_border(d.boxes[e.source], e.points[0])
+        assert on_border(d.boxes[e.target], e.points[-1])
+    # A -> C spans two layers and bends through one point between them
+    assert [len(e.points) for e in d.edges] == [2, 2, 3]
+
+
+def test_cycles_self_loops_and_isolated_boxes_are_placed():
+    d = Diagram("TB")
+    for name in ("A", "B", "C", "Alone"):
+        d.add_box(name, name)
+    d.add_edge("A", "B", "association")
+    d.add_edge("B", "C", "association")
+    d.add_edge("C", "A", "association")
+    d.add_edge("C", "C", "dependency")
+    d.layout()
+    assert len({d.boxes[n].y for n in "ABC"}) == 3
+    assert len(d.edges[-1].points) > 2
+    # Boxes without edges go below the layered part
+    assert d.boxes["Alone"].y > max(d.boxes[n].y for n in "ABC")
+
+
+def test_block_diagram_runs_left_to_right():
+    d = block_diagram(
+        [{"id": "c1", "label": "Drive"}, {"id": "c2", "label": "Monitor"}],
+        [{"id": "i1", "label": "Torque", "provided_by": ["c1"], "required_by": ["c2"]}],
+    )
+    d.layout()
+    assert d.boxes["i1"].shape == "interface"
+    assert d.boxes["c1"].x < d.boxes["i1"].x
+    assert [e.kind for e in d.edges] == ["provides", "requires"]
+
+
+def test_class_diagram_draws_what_the_templates_draw():
+    d = class_diagram(
+        [{"id": "u1", "label": "Motor <T>", "attributes": [{"name": "rpm", "type": "int", "scope": "private"}],
+          "methods": [{"name": "start", "scope": "public", "parameters": [{"name": "ramp", "type": "float"}],
+                       "return_type": "bool"}]}],
+        [{"source": "u1", "target": "u2", "type": "composition", "target_multiplicity": "1..*"},
+         {"source": "u1", "target": "u3", "type": "uses"}],
+    )
+    assert d.boxes["u1"].compartments == [["-int rpm"], ["+start(float ramp) bool"]]
+    assert set(d.boxes) == {"u1", "u2"}
+    svg = ET.fromstring(d.to_svg())
+    texts = [t.text for t in svg.iter("{http://www.w3.org/2000/svg}text")]
+    assert "Motor <T>" in texts and "1..*" in texts
+
+
+def test_renderer_rewrites_only_changed_diagrams(tmp_path):
+    d = class_diagram([{"id": "u1", "label": "Motor"}], [])
+    renderer = SvgRenderer()
+    assert renderer.write(d, tmp_path / "u1.svg")
+    assert not renderer.write(d, tmp_path / "u1.svg")
+    assert (renderer.files.written, renderer.files.unchanged, renderer.rendered) == (1, 1, 2)
@@ -0,0 +1,74 @@
+import argparse
+from pathlib import Path
+
+import pytest
+import yaml
+
+from generate import Generator
+from hephora_common.cache import NodeCache
+from hephora_common.local_store import LocalStoreClient
+from hephora_common.model import NodeModel
+from hephora_common.source import add_source_args
+from hephora_common.watch import ChangeFeed
+
+REPO = Path(__file__).resolve().parents[2]
+
+# A design of three units: Unit B has an attribute typed with a data type owned by Unit A
+NODES = {
+    "v0000000-0000": ("v_model", "Project", "", {}),
+    "d0000000-0000": ("sw_design", "Design", "v0000000-0000", {"description": "Units"}),
+    "a0000000-0000": ("sw_unit", "Unit A", "d0000000-0000", {"description": "Owns the frame"}),
+    "b0000000-0000": ("sw_unit", "Unit B", "d0000000-0000", {"description": "Uses the frame"}),
+    "c0000000-0000": ("sw_unit", "Unit C", "d0000000-0000", {"description": "Unrelated"}),
+    "f0000000-0000": ("sw_unit_data_type", "Frame", "a0000000-0000", {"kind": "struct"}),
+    "e0000000-0000": ("sw_unit_attribute", "frame", "b0000000-0000", {"data_type": "f0000000-0000"}),
+}
+
+
+def write_node(data_dir: Path, nid: str, profile: str, label: str, parent: str, fields: dict) -> None:
+    doc = {"_profile": profile, "_id": nid, "_label": label, "_parent_id": parent, **fields}
+    path = data_dir / profile / f"{label}_{nid[:8]}.yaml"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(yaml.safe_dump(doc), encoding="utf-8")
+
+
+@pytest.fixture
+def workspace(tmp_path, monkeypatch):
+    """A checkout-like working directory: the tools read schemas and templates relative to it."""
+    (tmp_path / "tools" / "hephora_docgen").mkdir(parents=True)
+    (tmp_path / "schemas").symlink_to(REPO / "schemas")
+    (tmp_path / "tools" / "hephora_docgen" / "templates").symlink_to(REPO / "tools" / "hephora_docgen" / "templates")
+    data_dir = tmp_path / "data"
+    for nid, (profile, label, parent, fields) in NODES.items():
+        write_node(data_dir, nid, profile, label, parent, fields)
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+def test_renaming_a_unit_rerenders_pages_linking_to_its_data_types(workspace):
+    docgen = Generator("hephora_docgen", "docgen")
+    parser = argparse.ArgumentParser()
+    add_source_args(parser)
+    docgen.add_arguments(parser)
+    args = parser.parse_args(["--data-dir", "data", "--jobs", "1", "--attachment-jobs", "0"])
+    source = LocalStoreClient(args.data_dir)
+    model = NodeModel.from_schemas(Path("schemas"))
+    assert docgen.run(args, NodeCache(source, model=model)) == 0
+
+    items = Path("tools/hephora_docgen/docs/source/design/items")
+    assert "dt-Unit-A-Frame" in (items / "Unit-B.rst").read_text(encoding="utf-8")
+    unrelated = (items / "Unit-C.rst").stat().st_mtime_ns
+
+    # What watch mode does on the next poll
+    feed = ChangeFeed(source, ["v_model"])
+    unit_a = workspace / "data" / "sw_unit" / "Unit A_a0000000.yaml"
+    unit_a.write_text(unit_a.read_text(encoding="utf-8").replace("Unit A", "Unit Alpha"), encoding="utf-8")
+    changed, structural = feed.poll()
+    assert not structural
+    pages = docgen.module.affected_pages(changed)
+    assert pages == {"design/index.rst", "design/items/Unit-A.rst", "design/items/Unit-B.rst"}
+
+    assert docgen.run(args, NodeCache(source, model=model), pages=pages) == 0
+    unit_b = (items / "Unit-B.rst").read_text(encoding="utf-8")
+    assert "dt-Unit-Alpha-Frame" in unit_b and "dt-Unit-A-Frame" not in unit_b
+    assert (items / "Unit-C.rst").stat().st_mtime_ns == unrelated
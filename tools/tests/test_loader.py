@@ -0,0 +1,64 @@
+from pathlib import Path
+
+from hephora_common.cache import NodeCache
+from hephora_common.loader import ProfileGraph
+from hephora_common.model import NodeModel
+
+REPO = Path(__file__).resolve().parents[2]
+
+
+def ref(target):
+    return {"type": "reference", "target": target}
+
+
+# design -> unit -> method; methods refer to data types and, through them, to requirements
+SCHEMAS = {
+    "design": {"children": {"units": {"node": "unit"}}},
+    "unit": {"children": {"methods": {"node": "method"}}, "fields": {"peer": ref("unit")}},
+    "method": {"fields": {"parameters": {"type": "array", "items": {
+        "type": "object", "fields": {"data_type": ref("data_type")}}}}},
+    "data_type": {"fields": {"requirement": ref("requirement")}},
+    "requirement": {"children": {"notes": {"node": "note"}}},
+    "note": {},
+}
+
+
+def test_closure_follows_children_and_limits_reference_hops():
+    graph = ProfileGraph(SCHEMAS)
+    assert graph.closure(["design"], reference_hops=0) == ["design", "unit", "method"]
+    # Referenced profiles come before the profiles referring to them; their children are loaded too
+    assert graph.closure(["design"]) == ["design", "unit", "data_type", "method"]
+    assert graph.closure(["design"], reference_hops=2) == ["design", "unit", "requirement", "data_type", "method", "note"]
+
+
+def test_order_puts_referenced_profiles_first():
+    graph = ProfileGraph(SCHEMAS)
+    assert graph.order(["method", "data_type", "unit"]) == ["data_type", "method", "unit"]
+
+
+def test_docgen_plan_covers_what_the_unit_pages_look_up():
+    graph = ProfileGraph.from_schemas(REPO / "schemas")
+    plan = graph.closure(["sw_design"])
+    for profile in ("sw_unit", "sw_unit_method", "sw_unit_attribute", "sw_unit_data_type", "attachment"):
+        assert profile in plan
+    assert plan.index("sw_unit_data_type") < plan.index("sw_unit_method")
+
+
+class RecordingClient:
+    def __init__(self):
+        self.prefetched = []
+
+    def prefetch(self, profiles):
+        self.prefetched.append(list(profiles))
+        return {p: [] for p in profiles}
+
+
+def test_cache_loads_the_whole_plan_in_one_prefetch():
+    client = RecordingClient()
+    cache = NodeCache(client, model=NodeModel.from_schemas(REPO / "schemas"))
+    plan = cache.load(["sw_design"])
+    assert client.prefetched == [plan]
+    # Without a model only the roots are loaded
+    bare = RecordingClient()
+    assert NodeCache(bare).load(["sw_design"]) == ["sw_design"]
+    assert bare.prefetched == [["sw_design"]]
@@ -0,0 +1,115 @@
+import sys
+import threading
+
+import pytest
+import yaml
+
+from hephora_common.local_store import LocalStoreClient, node_from_yaml
+
+UNITS = 1000
+
+
+def write_unit(data_dir, i, description="Unit"):
+    path = data_dir / "sw_unit" / f"Unit {i}_u{i:07d}.yaml"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    doc = {"_profile": "sw_unit", "_id": f"u{i:07d}", "_label": f"Unit {i}", "_parent_id": "design",
+           "description": description}
+    path.write_text(yaml.safe_dump(doc), encoding="utf-8")
+
+
+def test_yaml_documents_take_the_server_shape():
+    doc = {"_profile": "sw_unit", "_id": "u1", "_label": "Motor", "_parent_id": "d1", "description": "Drives"}
+    assert node_from_yaml(doc) == {
+        "id": "u1", "label": "Motor", "parent": "d1", "profile": "sw_unit", "fields": {"description": "Drives"},
+    }
+    assert node_from_yaml({"_id": "v1", "_label": "Project"})["parent"] == ""
+
+
+def test_store_lists_and_fetches_like_the_server(tmp_path):
+    write_unit(tmp_path, 0)
+    # Older files without _profile take the profile of their directory
+    (tmp_path / "sw_unit_method").mkdir()
+    (tmp_path / "sw_unit_method" / "start_m0000000.yaml").write_text(
+        yaml.safe_dump({"_id": "m0000000", "_label": "start", "_parent_id": "u0000000"}), encoding="utf-8")
+    # Files that are not nodes are ignored
+    (tmp_path / "sw_unit" / "notes.yaml").write_text("- not a node\n", encoding="utf-8")
+    (tmp_path / "README.md").write_text("data", encoding="utf-8")
+    store = LocalStoreClient(tmp_path)
+
+    assert store.list_nodes("sw_unit") == [{"id": "u0000000", "label": "Unit 0", "parent": "design", "profile": "sw_unit"}]
+    assert store.list_nodes("sw_unit", full=True)[0]["fields"] == {"description": "Unit"}
+    assert [n["id"] for n in store.list_children("sw_unit", "u0000000")] == ["m0000000"]
+    assert store.list_children("sw_unit", "u0000000")[0]["profile"] == "sw_unit_method"
+    assert store.get_nodes("sw_unit_method", ["m0000000", "", "m0000000"]) == [store.get_node("sw_unit_method", "m0000000")]
+    with pytest.raises(KeyError):
+        store.get_node("sw_unit", "m0000000")
+
+
+def test_missing_data_dir_is_reported(tmp_path):
+    with pytest.raises(FileNotFoundError, match="Data directory not found"):
+        LocalStoreClient(tmp_path / "data")
+
+
+def test_refresh_reports_edited_and_added_nodes(tmp_path):
+    for i in range(3):
+        write_unit(tmp_path, i)
+    store = LocalStoreClient(tmp_path)
+    assert store.refresh() == (set(), False)
+
+    write_unit(tmp_path, 1, "Edited unit")
+    assert store.refresh() == ({"u0000001", "design"}, False)
+    assert store.get_node("sw_unit", "u0000001")["fields"]["description"] == "Edited unit"
+
+    write_unit(tmp_path, 3)
+    assert store.refresh() == ({"u0000003", "design"}, True)
+    assert [n["id"] for n in store.list_children("sw_unit", "u0000000")] == []
+    assert len(store.list_nodes("sw_unit")) == 4
+
+    (tmp_path / "sw_unit" / "Unit 0_u0000000.yaml").unlink()
+    assert store.refresh() == ({"u0000000", "design"}, True)
+    with pytest.raises(KeyError):
+        store.get_node("sw_unit", "u0000000")
+
+
+def test_half_written_file_leaves_the_store_as_it_was(tmp_path):
+    write_unit(tmp_path, 0)
+    store = LocalStoreClient(tmp_path)
+    path = tmp_path / "sw_unit" / "Unit 0_u0000000.yaml"
+    path.write_text("_id: u0000000\ndescription: [unterminated\n", encoding="utf-8")
+    with pytest.raises(yaml.YAMLError):
+        store.refresh()
+    assert store.get_node("sw_unit", "u0000000")["fields"]["description"] == "Unit"
+
+    write_unit(tmp_path, 0, "Saved")
+    assert store.refresh() == ({"u0000000", "design"}, False)
+
+
+def test_reads_during_refresh_see_a_whole_index(tmp_path):
+    for i in range(UNITS):
+        write_unit(tmp_path, i)
+    store = LocalStoreClient(tmp_path)
+    done = threading.Event()
+    partial = []
+
+    def read():
+        while not done.is_set():
+            n = len(store.list_nodes("sw_unit", full=True))
+            if n != UNITS:
+                partial.append(n)
+
+    readers = [threading.Thread(target=read) for _ in range(4)]
+    # Switch threads often, so readers run while the index is being rebuilt
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    for t in readers:
+        t.start()
+    try:
+        for round in range(10):
+            write_unit(tmp_path, round, f"Edit {round}")
+            store.refresh()
+    finally:
+        done.set()
+        for t in readers:
+            t.join()
+        sys.setswitchinterval(interval)
+    assert partial == []
@@ -0,0 +1,71 @@
+import pytest
+
+from generate import Generator
+
+
+@pytest.fixture(scope="module")
+def manifest():
+    return Generator("hephora_docgen", "manifest").module
+
+
+def build(manifest, root, pages):
+    """Record ``pages`` (path -> node ids) as written by a run, like docgen does, and save it."""
+    m = manifest.BuildManifest(root / ".manifest.json", root)
+    for page, nodes in pages.items():
+        (root / page).parent.mkdir(parents=True, exist_ok=True)
+        (root / page).write_text(page, encoding="utf-8")
+        m.record(root / page, nodes, manifest.context_digest(page, {"nodes": nodes}))
+    m.save()
+    return manifest.BuildManifest(root / ".manifest.json", root)
+
+
+def test_unchanged_pages_are_current(manifest, tmp_path):
+    m = build(manifest, tmp_path, {"index.rst": ["v1"]})
+    assert m.is_current(tmp_path / "index.rst", manifest.context_digest("index.rst", {"nodes": ["v1"]}))
+    assert not m.is_current(tmp_path / "index.rst", manifest.context_digest("index.rst", {"nodes": ["v2"]}))
+
+    (tmp_path / "index.rst").unlink()
+    assert not m.is_current(tmp_path / "index.rst", manifest.context_digest("index.rst", {"nodes": ["v1"]}))
+
+
+def test_pages_for_finds_every_page_built_from_a_node(manifest, tmp_path):
+    m = build(manifest, tmp_path, {
+        "design/index.rst": ["d1", "u1", "u2"],
+        "design/items/Unit-1.rst": ["u1"],
+        "design/items/Unit-2.rst": ["u2", "t1"],
+    })
+    assert m.pages_for(["u1"]) == {"design/index.rst", "design/items/Unit-1.rst"}
+    assert m.pages_for(["t1", "gone"]) == {"design/items/Unit-2.rst"}
+    assert m.pages_for([]) == set()
+
+
+def test_carry_over_keeps_pages_outside_the_changed_set(manifest, tmp_path):
+    m = build(manifest, tmp_path, {"a.rst": ["n1"], "b.rst": ["n2"], "c.rst": ["n3"]})
+    (tmp_path / "c.rst").unlink()
+
+    assert m.carry_over(tmp_path / "a.rst", {"b.rst"})
+    assert not m.carry_over(tmp_path / "b.rst", {"b.rst"})
+    # A page deleted since the last run is rendered again
+    assert not m.carry_over(tmp_path / "c.rst", {"b.rst"})
+    assert not m.carry_over(tmp_path / "new.rst", set())
+    assert m.current == {"a.rst": m.previous["a.rst"]}
+
+
+def test_remove_stale_deletes_pages_this_run_did_not_produce(manifest, tmp_path):
+    m = build(manifest, tmp_path, {"items/Kept.rst": ["n1"], "items/Removed.rst": ["n2"]})
+    m.carry_over(tmp_path / "items" / "Kept.rst", set())
+
+    assert m.remove_stale() == [tmp_path / "items" / "Removed.rst"]
+    assert (tmp_path / "items" / "Kept.rst").exists()
+    assert not (tmp_path / "items" / "Removed.rst").exists()
+
+    m.save()
+    assert manifest.BuildManifest(tmp_path / ".manifest.json", tmp_path).previous.keys() == {"items/Kept.rst"}
+
+
+def test_corrupt_manifest_means_a_full_rebuild(manifest, tmp_path):
+    (tmp_path / ".manifest.json").write_text("{not json", encoding="utf-8")
+    (tmp_path / "a.rst").write_text("a", encoding="utf-8")
+    m = manifest.BuildManifest(tmp_path / ".manifest.json", tmp_path)
+    assert m.previous == {}
+    assert not m.carry_over(tmp_path / "a.rst", set())
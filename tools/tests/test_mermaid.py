@@ -0,0 +1,45 @@
+import os
+import stat
+
+import pytest
+
+from hephora_common.mermaid import MermaidRenderer
+
+
+def fake_tool(bin_dir, name, script):
+    path = bin_dir / name
+    path.write_text("#!/bin/sh\n" + script, encoding="utf-8")
+    path.chmod(path.stat().st_mode | stat.S_IXUSR)
+
+
+@pytest.fixture
+def diagrams(tmp_path, monkeypatch):
+    """A directory with one diagram, rendered with only the fake tools of ``bin`` on PATH."""
+    (tmp_path / "bin").mkdir()
+    (tmp_path / "out").mkdir()
+    (tmp_path / "out" / "unit.mmd").write_text("classDiagram\n  class Unit\n", encoding="utf-8")
+    monkeypatch.setenv("PATH", str(tmp_path / "bin"))
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+def test_docker_that_cannot_start_the_container_is_reported(diagrams):
+    fake_tool(diagrams / "bin", "docker", "echo 'Cannot connect to the Docker daemon' >&2\nexit 1\n")
+    with pytest.raises(RuntimeError, match="status 1: Cannot connect to the Docker daemon"):
+        MermaidRenderer().render_dir(diagrams / "out")
+
+
+def test_failed_renders_are_flagged_and_retried(diagrams):
+    fake_tool(diagrams / "bin", "mmdc", "echo 'Parse error on line 2' >&2\nexit 1\n")
+    renderer = MermaidRenderer()
+    renderer.render_dir(diagrams / "out")
+    assert renderer.failed
+    assert renderer.results[0].error == "Parse error on line 2"
+
+    # Once mmdc works, it writes the svg named by -o
+    fake_tool(diagrams / "bin", "mmdc", 'while [ "$1" != "-o" ]; do shift; done\necho "<svg/>" > "$2"\n')
+    retry = MermaidRenderer()
+    retry.render_dir(diagrams / "out")
+    assert not retry.failed
+    assert [r.status for r in retry.results] == ["rendered"]
+    assert os.path.exists(diagrams / "out" / "unit.svg")
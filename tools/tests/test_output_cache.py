@@ -0,0 +1,52 @@
+import os
+
+from hephora_common.cache import NodeCache
+from hephora_common.output import OutputFiles
+
+
+class FakeClient:
+    """Answers get_node with a minimal body and records which nodes were fetched."""
+
+    def __init__(self):
+        self.fetched = []
+
+    def get_node(self, profile, node_id):
+        self.fetched.append(node_id)
+        return {"id": node_id, "label": node_id.upper(), "profile": profile, "fields": {}}
+
+
+def test_output_files_skips_unchanged_content(tmp_path):
+    files = OutputFiles()
+    page = tmp_path / "docs" / "index.rst"
+
+    assert files.write_text(page, "Title\n=====\n")
+    assert page.read_text(encoding="utf-8") == "Title\n=====\n"
+    os.utime(page, ns=(1_000_000_000, 1_000_000_000))
+
+    assert not files.write_text(page, "Title\n=====\n")
+    assert page.stat().st_mtime_ns == 1_000_000_000
+
+    assert files.write_text(page, "Other\n=====\n")
+    assert page.read_text(encoding="utf-8") == "Other\n=====\n"
+    assert (files.written, files.unchanged) == (2, 1)
+    assert files.bytes_written == 24
+    # Nothing is left behind by the atomic writes
+    assert [p.name for p in page.parent.iterdir()] == ["index.rst"]
+
+
+def test_node_cache_evicts_least_recently_used():
+    client = FakeClient()
+    cache = NodeCache(client, max_nodes=2)
+
+    cache.get_node("sw_unit", "a")
+    cache.get_node("sw_unit", "b")
+    # Reading a makes b the least recently used
+    assert cache.get_node("sw_unit", "a")["label"] == "A"
+    cache.get_node("sw_unit", "c")
+
+    assert cache.peek("sw_unit", "b") is None
+    assert cache.peek("sw_unit", "a") is not None
+    cache.get_node("sw_unit", "b")
+    assert client.fetched == ["a", "b", "c", "b"]
+    assert cache.stats()["nodes"] == 2
+    assert cache.evictions == 2
@@ -0,0 +1,82 @@
+import json
+
+import requests
+
+from hephora_common.client import HephoraClient
+from hephora_common.snapshot import SnapshotStore
+
+UNITS = [{"id": "u1", "label": "Motor", "parent": "d1", "fields": {}}]
+
+
+class Server(HephoraClient):
+    """Serves UNITS, with a change counter and/or ETags when given; records what it was sent."""
+
+    def __init__(self, snapshot, version=None, etag=None):
+        super().__init__("http://hephora.invalid", snapshot=snapshot)
+        self.version = version
+        self.etag = etag
+        self.sent = []
+
+    def _send(self, path, payload, headers=None):
+        self.sent.append((path, headers))
+        r = requests.Response()
+        if path == "/nodes/version":
+            r.status_code = 200 if self.version is not None else 404
+            r._content = json.dumps({"version": self.version}).encode()
+        elif self.etag is not None and headers and headers.get("If-None-Match") == self.etag:
+            r.status_code = 304
+            r._content = b""
+        else:
+            r.status_code = 200
+            r._content = json.dumps({"nodes": UNITS}).encode()
+            if self.etag is not None:
+                r.headers["ETag"] = self.etag
+        return r
+
+    def listings(self):
+        return [headers for path, headers in self.sent if path == "/nodes/list"]
+
+
+def _keys(snapshot):
+    return [row[0] for row in snapshot._db.execute("SELECT key FROM responses")]
+
+
+def test_responses_under_the_current_change_counter_are_served_without_requests(tmp_path):
+    snapshot = SnapshotStore(tmp_path / "nodes.sqlite")
+    assert Server(snapshot, version=7).list_nodes("sw_unit") == UNITS
+
+    again = Server(snapshot, version=7)
+    assert again.list_nodes("sw_unit") == UNITS
+    assert (again.listings(), again.snapshot_hits) == ([], 1)
+
+    changed = Server(snapshot, version=8)
+    changed.list_nodes("sw_unit")
+    assert (len(changed.listings()), changed.snapshot_hits) == (1, 0)
+
+
+def test_responses_with_an_etag_are_revalidated(tmp_path):
+    snapshot = SnapshotStore(tmp_path / "nodes.sqlite")
+    Server(snapshot, etag='"a1"').list_nodes("sw_unit")
+
+    again = Server(snapshot, etag='"a1"')
+    assert again.list_nodes("sw_unit") == UNITS
+    assert (again.listings(), again.snapshot_hits) == ([{"If-None-Match": '"a1"'}], 1)
+
+    changed = Server(snapshot, etag='"a2"')
+    changed.list_nodes("sw_unit")
+    assert changed.snapshot_hits == 0
+    assert snapshot.get(_keys(snapshot)[0]).etag == '"a2"'
+
+
+def test_responses_that_cannot_be_revalidated_are_not_kept(tmp_path):
+    snapshot = SnapshotStore(tmp_path / "nodes.sqlite")
+    Server(snapshot).list_nodes("sw_unit")
+    assert list(_keys(snapshot)) == []
+
+
+def test_snapshot_outlives_the_store(tmp_path):
+    store = SnapshotStore(tmp_path / "cache" / "nodes.sqlite")
+    store.put("k", '"e"', None, b"body")
+    store.touch("k", "3")
+    store.close()
+    assert SnapshotStore(tmp_path / "cache" / "nodes.sqlite").get("k") == ('"e"', "3", b"body")
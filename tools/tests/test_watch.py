@@ -0,0 +1,76 @@
+import json
+
+import requests
+
+from hephora_common.client import HephoraClient
+from hephora_common.watch import ChangeFeed
+
+
+def unit(nid, description="Unit", parent="d1"):
+    return {"id": nid, "label": nid, "parent": parent, "fields": {"description": description}}
+
+
+class FakeSource:
+    """A source that is neither a server nor a data/ tree: re-listed in full on every poll."""
+
+    def __init__(self, nodes):
+        self.nodes = {n["id"]: n for n in nodes}
+
+    def list_nodes(self, profile, full=False):
+        return list(self.nodes.values())
+
+    def prefetch(self, profiles):
+        return {p: self.list_nodes(p, True) for p in profiles}
+
+
+class VersionedServer(HephoraClient):
+    """A server with a change counter; counts the listings it serves."""
+
+    def __init__(self, nodes):
+        super().__init__("http://hephora.invalid")
+        self.nodes = nodes
+        self.version = 1
+        self.listings = 0
+
+    def _send(self, path, payload, headers=None):
+        if path == "/nodes/version":
+            body = {"version": self.version}
+        else:
+            self.listings += 1
+            body = {"nodes": self.nodes}
+        r = requests.Response()
+        r.status_code = 200
+        r._content = json.dumps(body).encode()
+        return r
+
+
+def test_re_listed_nodes_are_compared_by_content():
+    source = FakeSource([unit("u1"), unit("u2")])
+    feed = ChangeFeed(source, ["sw_unit"])
+    assert feed.poll() == ({"u1", "u2", "d1"}, True)
+    assert feed.poll() == (set(), False)
+
+    source.nodes["u1"] = unit("u1", "Edited")
+    assert feed.poll() == ({"u1", "d1"}, False)
+
+    # Moving a node changes its old and its new parent
+    source.nodes["u2"] = unit("u2", parent="d2")
+    assert feed.poll() == ({"u2", "d1", "d2"}, False)
+
+    del source.nodes["u1"]
+    source.nodes["u3"] = unit("u3", parent="d2")
+    assert feed.poll() == ({"u1", "u3", "d1", "d2"}, True)
+
+
+def test_server_is_only_re_listed_when_its_change_counter_moves():
+    server = VersionedServer([unit("u1"), unit("u2")])
+    feed = ChangeFeed(server, ["sw_unit"])
+    listed = server.listings
+    assert feed.poll() == (set(), False)
+    assert server.listings == listed
+
+    server.nodes = [unit("u1", "Edited"), unit("u2")]
+    assert feed.poll() == (set(), False)
+    server.version = 2
+    assert feed.poll() == ({"u1", "d1"}, False)
+    assert server.listings == listed + 1